@@ -22,6 +22,7 @@ from naturtag.app.controls import Toolbar, UserDirs
 from naturtag.app.settings_menu import SettingsMenu
 from naturtag.app.style import fa_icon, set_theme
 from naturtag.app.threadpool import ThreadPool
+from naturtag.client import IMG_SESSION, INAT_CLIENT
 from naturtag.constants import APP_DIR, APP_ICON, APP_LOGO, ASSETS_DIR, DOCS_URL, REPO_URL
 from naturtag.controllers import ImageController, ObservationController, TaxonController
 from naturtag.settings import Settings, setup
@@ -53,6 +54,8 @@ class MainWindow(QMainWindow):
         self.settings = settings
         self.user_dirs = UserDirs(settings)
         setup(settings)
+        IMG_SESSION.set_max_size(settings.image_cache_size)
+        INAT_CLIENT.set_expiration(settings.observation_expiration, settings.taxon_expiration)
 
         # Controllers
         self.settings_menu = SettingsMenu(self.settings)
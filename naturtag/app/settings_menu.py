@@ -13,6 +13,7 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from naturtag.client import IMG_SESSION, INAT_CLIENT
 from naturtag.controllers import BaseController
 from naturtag.settings import Settings
 from naturtag.widgets import FAIcon, HorizontalLayout, ToggleSwitch, VerticalLayout
@@ -40,6 +41,17 @@ class SettingsMenu(BaseController):
         inat.addLayout(
             ToggleSetting(settings, icon_str='mdi6.cat', setting_attr='casual_observations')
         )
+        inat.addLayout(
+            IntSetting(settings, icon_str='mdi.file-tree-outline', setting_attr='prefetch_taxa')
+        )
+        inat.addLayout(
+            IntSetting(
+                settings, icon_str='mdi.clock-outline', setting_attr='observation_expiration'
+            )
+        )
+        inat.addLayout(
+            IntSetting(settings, icon_str='mdi.clock-outline', setting_attr='taxon_expiration')
+        )
         self.all_ranks = ToggleSetting(
             settings, icon_str='fa.chevron-circle-up', setting_attr='all_ranks'
         )
@@ -89,6 +101,20 @@ class SettingsMenu(BaseController):
             dialog_parent=self,
         )
         user_data.addLayout(self.default_image_dir)
+        user_data.addLayout(
+            ToggleSetting(
+                settings,
+                icon_str='mdi.folder-eye',
+                setting_attr='watch_image_dirs',
+                setting_title='Watch image directories',
+            )
+        )
+
+        user_data.addLayout(
+            IntSetting(settings, icon_str='mdi.database-outline', setting_attr='image_cache_size')
+        )
+        self.image_cache_stats = QLabel()
+        user_data.addWidget(self.image_cache_stats)
 
         # Disable default_image_dir option when use_last_dir is enabled
         self.default_image_dir.setEnabled(not settings.use_last_dir)
@@ -129,9 +155,18 @@ class SettingsMenu(BaseController):
         group.box.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Minimum)
         return group
 
+    def showEvent(self, event):
+        """Update image cache stats when opening the window"""
+        self.image_cache_stats.setText(f'Image cache: {IMG_SESSION.image_cache.summary()}')
+        super().showEvent(event)
+
     def closeEvent(self, event):
-        """Save settings when closing the window"""
+        """Save settings when closing the window, and apply new cache settings"""
         self.settings.write()
+        IMG_SESSION.set_max_size(self.settings.image_cache_size)
+        INAT_CLIENT.set_expiration(
+            self.settings.observation_expiration, self.settings.taxon_expiration
+        )
         self.on_message.emit('Settings saved')
         event.accept()
 
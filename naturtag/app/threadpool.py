@@ -1,6 +1,8 @@
 """Adapted from examples in Python & Qt6 by Martin Fitzpatrick"""
+from collections import deque
+from concurrent.futures import Future
 from logging import getLogger
-from threading import RLock
+from threading import Event, Lock, RLock, local
 from typing import Callable
 
 from PySide6.QtCore import (
@@ -17,74 +19,229 @@ from PySide6.QtWidgets import QGraphicsOpacityEffect, QProgressBar
 
 logger = getLogger(__name__)
 
+# Interval (in milliseconds) at which completed job results are delivered to the main thread
+RESULT_INTERVAL = 16
+
+# Cancellation token for the task running in the current thread
+_local = local()
+
 
 # TODO: For loading taxa, set/increase progress bar max once up front, instead of once per taxon
 class ThreadPool(QThreadPool):
     """Thread pool that enqueues jobs to ber run from separate thread(s), and updates a progress
     bar.
+
+    Jobs can optionally be assigned to a group (e.g., all jobs for loading the selected taxon), so
+    they can be cancelled without affecting unrelated jobs. Queued jobs can also be reprioritized.
+
+    Instead of each job signaling the main thread separately, completed jobs are collected and
+    delivered in batches once per frame (every ``RESULT_INTERVAL`` ms), with a single progress bar
+    update per batch.
     """
 
+    on_batch_complete = Signal()  #: A batch of job results has been delivered
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.progress = ProgressBar()
+        self._jobs: set[Worker] = set()
+        self._lock = Lock()
+        self._results: deque[tuple[Worker, str, tuple]] = deque()
+        self.result_timer = QTimer(self)
+        self.result_timer.setInterval(RESULT_INTERVAL)
+        self.result_timer.timeout.connect(self.deliver_results)
 
     def schedule(
-        self, callback: Callable, priority: QThread.Priority = QThread.NormalPriority, **kwargs
+        self,
+        callback: Callable,
+        priority: QThread.Priority = QThread.NormalPriority,
+        group: str = None,
+        wait_for: Future = None,
+        **kwargs,
     ) -> 'WorkerSignals':
-        """Schedule a task to be run by the next available worker thread"""
+        """Schedule a task to be run by the next available worker thread
+
+        Args:
+            callback: Function to run
+            priority: Initial job priority
+            group: Optional job group name, which can be used to cancel multiple jobs at once
+            wait_for: Optional future (e.g., an image download) to wait for before queuing the task,
+                so it doesn't occupy a worker thread while waiting
+            kwargs: Keyword arguments for ``callback``
+        """
         self.progress.add()
-        worker = Worker(callback, **kwargs)
-        worker.signals.on_progress.connect(self.progress.advance)
-        self.start(worker, priority)
+        worker = self._create_worker(callback, group, **kwargs)
+        if wait_for is None:
+            self.start(worker, priority)
+        else:
+            self._add_job(worker, priority)
+            wait_for.add_done_callback(lambda _: QThreadPool.start(self, worker, priority))
         return worker.signals
 
-    def schedule_all(self, callbacks: list[Callable], **kwargs) -> list['WorkerSignals']:
+    def schedule_all(
+        self, callbacks: list[Callable], group: str = None, **kwargs
+    ) -> list['WorkerSignals']:
         """Schedule multiple tasks to be run by the next available worker thread"""
         self.progress.add(len(callbacks))
-        for callback in callbacks:
-            worker = Worker(callback, **kwargs)
-            worker.signals.on_progress.connect(self.progress.advance)
+        workers = [self._create_worker(callback, group, **kwargs) for callback in callbacks]
+        for worker in workers:
             self.start(worker)
-        return worker.signals
+        return [worker.signals for worker in workers]
 
-    def cancel(self):
-        """Cancel all queued tasks and reset progress bar. Currently running tasks will be allowed
-        to complete.
+    def cancel(self, group: str = None):
+        """Cancel queued tasks, either for a single group or all groups. Currently running tasks will
+        be allowed to complete, but will be notified via their cancellation token.
         """
-        if active_threads := self.activeThreadCount() > 0:
-            logger.debug(f'Cancelling {active_threads} active threads')
-        self.clear()
-        self.progress.reset()
+        with self._lock:
+            jobs = [job for job in self._jobs if group is None or job.group == group]
+        for job in jobs:
+            job.token.cancel()
+
+        n_dequeued = sum(self._dequeue(job) for job in jobs)
+        if n_running := len(jobs) - n_dequeued:
+            logger.debug(f'Cancelling {n_running} active jobs')
+        if group is None:
+            self.progress.reset()
+        elif n_dequeued:
+            self.progress.advance(n_dequeued)
+
+    def cancel_job(self, job: 'WorkerSignals') -> bool:
+        """Cancel a single task, and return ``True`` if it was removed from the queue"""
+        job.worker.token.cancel()
+        if dequeued := self._dequeue(job.worker):
+            self.progress.advance()
+        return dequeued
+
+    def set_priority(self, job: 'WorkerSignals', priority: QThread.Priority) -> bool:
+        """Change the priority of a queued task. Returns ``False`` if it has already started."""
+        if job.worker.priority == priority or not self._try_take(job.worker):
+            return False
+        job.worker.priority = priority
+        self.start(job.worker, priority)
+        return True
+
+    def start(self, worker: 'Worker', priority: QThread.Priority = QThread.NormalPriority):
+        self._add_job(worker, priority)
+        super().start(worker, priority)
+
+    def deliver_results(self):
+        """Send signals for all jobs completed since the last batch, from the main thread"""
+        n_completed = len(self._results)
+        for _ in range(n_completed):
+            worker, signal_name, args = self._results.popleft()
+            self._remove(worker)
+            getattr(worker.signals, signal_name).emit(*args)
+
+        if n_completed:
+            self.progress.advance(n_completed)
+            self.on_batch_complete.emit()
+        with self._lock:
+            if not self._jobs:
+                self.result_timer.stop()
+
+    def _add_job(self, worker: 'Worker', priority: QThread.Priority):
+        with self._lock:
+            self._jobs.add(worker)
+        worker.priority = priority
+        if not self.result_timer.isActive():
+            self.result_timer.start()
+
+    def _create_worker(self, callback: Callable, group: str = None, **kwargs) -> 'Worker':
+        return Worker(callback, group=group, results=self._results, **kwargs)
+
+    def _dequeue(self, worker: 'Worker') -> bool:
+        """Remove a job from the queue, if it hasn't already started"""
+        if dequeued := self._try_take(worker):
+            worker.signals.on_cancel.emit()
+            self._remove(worker)
+        return dequeued
+
+    def _try_take(self, worker: 'Worker') -> bool:
+        # Worker may have already finished and been deleted
+        try:
+            return self.tryTake(worker)
+        except RuntimeError:
+            return False
+
+    def _remove(self, worker: 'Worker'):
+        with self._lock:
+            self._jobs.discard(worker)
+
+
+class JobCancelled(Exception):
+    """Raised by a task to stop early after it has been cancelled"""
+
+
+class CancelToken:
+    """Cooperative cancellation token for a single task. Long-running tasks can check this via
+    :py:func:`get_cancel_token` and stop early.
+    """
+
+    def __init__(self):
+        self._event = Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        self._event.set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise JobCancelled
+
+
+def get_cancel_token() -> CancelToken:
+    """Get the cancellation token for the task running in the current thread"""
+    return getattr(_local, 'token', None) or CancelToken()
 
 
 class Worker(QRunnable):
-    """A worker thread that takes a callback (and optional args/kwargs), and updates progress when
-    done.
+    """A worker thread that takes a callback (and optional args/kwargs), and adds its result (or
+    error) to a queue to be delivered to the main thread.
     """
 
-    def __init__(self, callback: Callable, **kwargs):
+    def __init__(self, callback: Callable, group: str = None, results: deque = None, **kwargs):
         super().__init__()
         self.callback = callback
         self.kwargs = kwargs
+        self.group = group
+        self.results = results if results is not None else deque()
+        self.priority = QThread.NormalPriority
+        self.token = CancelToken()
         self.signals = WorkerSignals()
+        self.signals.worker = self
 
     def run(self):
+        """Run the callback, unless cancelled before starting. Once the callback has completed, its
+        result is always delivered, even if it was cancelled in the meantime.
+        """
+        _local.token = self.token
         try:
+            self.token.raise_if_cancelled()
             result = self.callback(**self.kwargs)
+        except JobCancelled:
+            self.results.append((self, 'on_cancel', ()))
         except Exception as e:
             logger.warning('Worker error:', exc_info=True)
-            self.signals.on_error.emit(e)
+            self.results.append((self, 'on_error', (e,)))
         else:
-            self.signals.on_result.emit(result)
-        self.signals.on_progress.emit()
+            self.results.append((self, 'on_result', (result,)))
+        finally:
+            _local.token = None
 
 
 class WorkerSignals(QObject):
-    """Signals used by a worker thread (can't be set directly on a QRunnable)"""
+    """Signals for a worker's result, emitted from the main thread (can't be set directly on a
+    QRunnable)
+    """
 
+    on_cancel = Signal()  #: The task was cancelled before completion
     on_error = Signal(Exception)  #: Return exception info on error
     on_result = Signal(object)  #: Return result on completion
-    on_progress = Signal()  #: Increment progress bar
+
+    worker: Worker
 
 
 class ProgressBar(QProgressBar):
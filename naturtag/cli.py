@@ -29,6 +29,15 @@ someone else identifies it for you.
 naturtag -r image.jpg
 ```
 
+\b
+### Watch Mode
+With (`-w, --watch`), naturtag will keep running after tagging or refreshing,
+and will tag or refresh any new or modified images in the given directories:
+```
+naturtag -t 48978 -w ~/observations/dirona-picta
+naturtag -r -w ~/observations
+```
+
 \b
 ### Species Search
 You may also search for species by name. If there are multiple results, you
@@ -44,6 +53,13 @@ Multiple paths are supported, as well as glob patterns, for example:
 
 If no images are specified, the generated keywords will be printed.
 
+\b
+To tag a large number of images, you can use (`-j, --jobs`) to process them
+with multiple worker processes:
+```
+naturtag -t 48978 -j 8 ~/observations/**.jpg
+```
+
 \b
 ### Shell Completion
 Shell tab-completion is available for bash and fish shells. To install, run:
@@ -82,6 +98,7 @@ from naturtag.metadata import refresh_tags, strip_url, tag_images
 from naturtag.metadata.keyword_metadata import KeywordMetadata
 from naturtag.metadata.meta_metadata import MetaMetadata
 from naturtag.settings import Settings, setup
+from naturtag.utils.watcher import ImageWatcher
 
 CODE_BLOCK = compile(r'```\n\s*(.+?)```\s*\n', DOTALL)
 CODE_INLINE = compile(r'`([^`]+?)`')
@@ -132,6 +149,19 @@ def _strip_url_or_name(ctx, param, value):
     type=TaxonParam(),
     callback=_strip_url_or_name,
 )
+@click.option(
+    '-j',
+    '--jobs',
+    type=click.IntRange(min=1),
+    default=1,
+    help='Number of parallel processes to use for tagging images',
+)
+@click.option(
+    '-w',
+    '--watch',
+    is_flag=True,
+    help='After tagging or refreshing, watch for new and modified images',
+)
 @click.option(
     '--install',
     type=click.Choice(['all', 'bash', 'fish']),
@@ -148,6 +178,8 @@ def tag(
     refresh,
     observation,
     taxon,
+    jobs,
+    watch,
     install,
     verbose,
     version,
@@ -165,9 +197,12 @@ def tag(
         click.secho('Specify either a taxon, observation, or refresh', fg='red')
         click.echo(ctx.get_help())
         ctx.exit()
-    elif (print_tags or refresh) and not image_paths:
+    elif (print_tags or refresh or watch) and not image_paths:
         click.secho('Specify images', fg='red')
         ctx.exit()
+    elif print_tags and watch:
+        click.secho('Watch mode can only be used for tagging or refreshing images', fg='red')
+        ctx.exit()
     elif isinstance(taxon, str):
         taxon = search_taxa_by_name(taxon, verbose)
         if not taxon:
@@ -182,6 +217,8 @@ def tag(
     if refresh:
         refresh_tags(image_paths, recursive=True)
         click.echo('Images refreshed')
+        if watch:
+            watch_images(image_paths, refresh=True)
         ctx.exit()
 
     metadata_objs = tag_images(
@@ -189,6 +226,7 @@ def tag(
         observation_id=observation,
         taxon_id=taxon,
         include_sidecars=True,
+        jobs=jobs,
     )
     if not metadata_objs:
         return
@@ -196,6 +234,38 @@ def tag(
     # Print keywords if specified
     if not image_paths or verbose or flickr_format:
         print_metadata(list(metadata_objs)[0].keyword_meta, flickr_format)
+    if watch:
+        watch_images(image_paths, observation_id=observation, taxon_id=taxon, jobs=jobs)
+
+
+def watch_images(
+    image_paths: list[str],
+    observation_id: int = None,
+    taxon_id: int = None,
+    refresh: bool = False,
+    jobs: int = 1,
+):
+    """Watch for new and modified images, and either tag or refresh them in batches"""
+    settings = Settings.read()
+    watcher = ImageWatcher(image_paths, recursive=refresh)
+    click.echo('Watching for new and modified images (press Ctrl+C to stop)')
+    try:
+        for batch in watcher.watch():
+            if refresh:
+                metadata_objs = refresh_tags(batch, settings=settings)
+            else:
+                metadata_objs = tag_images(
+                    batch,
+                    observation_id=observation_id,
+                    taxon_id=taxon_id,
+                    settings=settings,
+                    jobs=jobs,
+                )
+            # Ignore changes made by naturtag
+            watcher.update(batch)
+            click.echo(f'{len(metadata_objs)} images {"refreshed" if refresh else "tagged"}')
+    except KeyboardInterrupt:
+        click.echo('Stopped watching images')
 
 
 def print_all_metadata(
@@ -205,7 +275,7 @@ def print_all_metadata(
 ):
     """Print keyword metadata for all specified files"""
     for image_path in image_paths:
-        metadata = MetaMetadata(image_path)
+        metadata = MetaMetadata(image_path, lazy=True)
         click.secho(f'\n{image_path}', fg='white')
         print_metadata(metadata.keyword_meta, flickr_format, hierarchical)
 
@@ -1,33 +1,109 @@
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from hashlib import md5
 from itertools import chain
 from logging import getLogger
+from threading import Lock
 from time import time
-from typing import TYPE_CHECKING, Iterable, Iterator, List
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Iterable, Iterator, List, Optional
 
 from pyinaturalist import ClientSession, Observation, Photo, Taxon, WrapperPaginator, iNatClient
 from pyinaturalist.controllers import ObservationController, TaxonController
 from pyinaturalist.converters import format_file_size
-from pyinaturalist_convert.db import (
-    DbObservation,
-    DbUser,
-    get_db_taxa,
-    get_session,
-    save_observations,
-    save_taxa,
+from pyinaturalist_convert.db import DbObservation, DbTaxon, DbUser
+
+from naturtag.constants import (
+    DB_PATH,
+    IMAGE_CACHE_EXPIRATION,
+    OBSERVATION_EXPIRATION,
+    ROOT_TAXON_ID,
+    TAXON_EXPIRATION,
+    PathOrStr,
 )
+from naturtag.utils.db import get_fetched_times, get_session, save_observations, save_taxa
+from naturtag.utils.image_cache import ImageCache, MemoryImageCache
 
-# from pyinaturalist_convert.db import get_db_observations
-from requests_cache import SQLiteDict
+if TYPE_CHECKING:
+    from PySide6.QtGui import QImage, QPixmap
 
-from naturtag.constants import DB_PATH, IMAGE_CACHE, ROOT_TAXON_ID, PathOrStr
+# Max number of concurrent image downloads
+MAX_IMAGE_DOWNLOADS = 8
 
-if TYPE_CHECKING:
-    from PySide6.QtGui import QPixmap
+# Number of observations to fetch per request when syncing user observations (API max)
+OBS_SYNC_PAGE_SIZE = 200
+
+# Compact the image cache after this many new images have been downloaded
+COMPACT_INTERVAL = 100
+
+# Photo size from an iNat photo URL, e.g. 'original' in '.../photos/1234/original.jpg?5678'
+PHOTO_SIZE_PATTERN = re.compile(r'/([a-z]+)\.\w+(\?.*)?$')
 
 logger = getLogger(__name__)
 
 
+class SingleFlight:
+    """Shares in-flight work between threads, so concurrent requests for the same keys (like taxon
+    IDs) only result in a single lookup per key. Results are not stored after the lookup completes.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Call ``func``, or if there is already a call in progress for ``key``, wait for its result"""
+        return self.do_many([key], lambda _: {key: func()})[key]
+
+    def do_many(
+        self,
+        keys: Iterable[Hashable],
+        func: Callable[[list], dict[Hashable, Any]],
+        namespace: Hashable = None,
+    ) -> dict[Hashable, Any]:
+        """Get results for multiple keys. ``func`` is called once with any keys that aren't
+        already in progress, and should return a dict of results by key. Results for any other keys
+        are shared with the threads that are already fetching them.
+
+        Args:
+            keys: Keys to get results for
+            func: Function that takes a list of keys and returns results by key
+            namespace: Additional key prefix for any options that affect the results
+
+        Returns:
+            Results by key; ``None`` for any keys without a result
+        """
+        keys = list(dict.fromkeys(keys))
+        with self._lock:
+            pending = {
+                k: self._calls[(namespace, k)] for k in keys if (namespace, k) in self._calls
+            }
+            claimed = {k: Future() for k in keys if k not in pending}
+            self._calls.update({(namespace, k): future for k, future in claimed.items()})
+        if pending:
+            logger.debug(f'Waiting for {len(pending)} results already in progress')
+
+        # Get results for our own keys first, then wait for any others
+        try:
+            results = func(list(claimed)) if claimed else {}
+        except BaseException as e:
+            for future in claimed.values():
+                future.set_exception(e)
+            raise
+        else:
+            for k, future in claimed.items():
+                future.set_result(results.get(k))
+        finally:
+            with self._lock:
+                for k in claimed:
+                    self._calls.pop((namespace, k), None)
+
+        return {
+            **{k: results.get(k) for k in claimed},
+            **{k: f.result() for k, f in pending.items()},
+        }
+
+
 class iNatDbClient(iNatClient):
     """API client class that uses a local SQLite database to cache observations and taxa (when searched by ID)"""
 
@@ -36,21 +112,48 @@ class iNatDbClient(iNatClient):
         self.taxa = TaxonDbController(self)
         self.observations = ObservationDbController(self, taxon_controller=self.taxa)
 
+    def set_expiration(self, observation_hours: int, taxon_hours: int):
+        """Set the time after which saved observations and taxa are re-fetched when refreshing"""
+        self.observations.expire_after = observation_hours * 60 * 60
+        self.taxa.expire_after = taxon_hours * 60 * 60
+
 
-# TODO: Expiration?
 class ObservationDbController(ObservationController):
     def __init__(self, *args, taxon_controller: 'TaxonDbController', **kwargs):
         """Need a reference to taxon controller to get full taxon ancestry"""
         super().__init__(*args, **kwargs)
         self.taxon_controller = taxon_controller
+        self.expire_after = OBSERVATION_EXPIRATION
+        self._requests = SingleFlight()
 
     def from_ids(
         self, *observation_ids, refresh: bool = False, taxonomy: bool = False, **params
     ) -> WrapperPaginator[Observation]:
-        """Get observations by ID; first from the database, then from the API"""
-        # Get any observations saved in the database (unless refreshing)
+        """Get observations by ID; first from the database, then from the API. If any of the same
+        observations are already being fetched by another thread, those results will be shared.
+
+        Args:
+            refresh: Re-fetch any saved observations that are older than ``expire_after``
+            taxonomy: Add full taxonomy to observation taxa
+        """
+        results = self._requests.do_many(
+            observation_ids,
+            lambda ids: {
+                obs.id: obs
+                for obs in self._from_ids(ids, refresh=refresh, taxonomy=taxonomy, **params)
+            },
+            namespace=(refresh, taxonomy, repr(sorted(params.items()))),
+        )
+        return WrapperPaginator([obs for obs in results.values() if obs is not None])
+
+    def _from_ids(
+        self, observation_ids: list[int], refresh: bool = False, taxonomy: bool = False, **params
+    ) -> list[Observation]:
+        # Get any observations saved in the database (if refreshing, only unexpired ones)
         start = time()
-        observations = [] if refresh else list(get_db_observations(DB_PATH, ids=observation_ids))
+        observations = list(get_db_observations(DB_PATH, ids=observation_ids))
+        if refresh:
+            observations = _filter_expired(observations, 'observation', self.expire_after)
         logger.debug(f'{len(observations)} observations found in database')
 
         # Get remaining observations from the API and save to the database
@@ -59,42 +162,88 @@ class ObservationDbController(ObservationController):
             logger.debug(f'Fetching remaining {len(remaining_ids)} observations from API')
             api_results = super().from_ids(*remaining_ids, **params).all()
             observations.extend(api_results)
-            save_observations(api_results, DB_PATH)
+            save_observations(api_results, DB_PATH, fetched=True)
 
         # Add full taxonomy to observations, if specified
         if taxonomy:
             self.taxon_controller._get_taxonomy([obs.taxon for obs in observations])
 
         logger.debug(f'Finished in {time()-start:.2f} seconds')
-        return WrapperPaginator(observations)
+        return observations
 
     def search(self, **params) -> WrapperPaginator[Observation]:
         """Search observations, and save results to the database (for future reference by ID)"""
         results = super().search(**params).all()
-        save_observations(results, DB_PATH)
+        save_observations(results, DB_PATH, fetched=True)
         return WrapperPaginator(results)
 
     def get_user_observations(
-        self, username: str, updated_since: datetime = None, limit: int = 50
+        self, username: str, limit: int = 50, after: Observation = None
     ) -> List[Observation]:
-        # Fetch and save any new observations
-        new_observations = self.search(
+        """Get a page of a user's observations from the database, most recently observed first.
+        See :py:meth:`sync_user_observations` to fetch new and updated observations from the API.
+
+        Args:
+            username: iNaturalist username
+            limit: Max number of observations to return
+            after: Last observation from the previous page, if any
+        """
+        obs = get_db_observations(
+            DB_PATH,
+            username=username,
+            limit=limit,
+            order_by_date=True,
+            after=(after.observed_on, after.id) if after else None,
+        )
+        return list(obs)
+
+    def sync_user_observations(
+        self,
+        username: str,
+        updated_since: datetime = None,
+        id_above: int = None,
+        on_checkpoint: Callable[[int], None] = None,
+    ) -> int:
+        """Fetch all of a user's observations created or updated since the last sync, and save
+        each page of results to the database as it's received.
+
+        Pages are requested in order of observation ID, so an interrupted sync can be resumed from
+        the last saved page by passing the same ``updated_since`` value along with ``id_above``.
+
+        Args:
+            username: iNaturalist username
+            updated_since: Only fetch observations created or updated since this time
+            id_above: Only fetch observations with IDs above this value
+            on_checkpoint: Callback to run with the last saved observation ID after each page is
+                saved. It may raise an exception to stop syncing.
+
+        Returns:
+            Number of observations saved
+        """
+        paginator = super().search(
             user_login=username,
             updated_since=updated_since,
+            per_page=OBS_SYNC_PAGE_SIZE,
             refresh=True,
-        ).all()
-        if len(new_observations) >= limit:
-            new_observations = sorted(
-                new_observations, key=lambda obs: obs.created_at, reverse=True
-            )
-            return new_observations[:limit]
+        )
+        paginator.id_above = id_above or None
+        n_saved = 0
 
-        # Get up to `limit` most recent saved observations
-        obs = get_db_observations(username=username, limit=limit, order_by_date=True)
-        return list(obs)
+        while observations := paginator.next_page():
+            save_observations(observations, DB_PATH, fetched=True)
+            n_saved += len(observations)
+            logger.debug(f'Saved {n_saved}/{paginator.total_results} observations for {username}')
+            if on_checkpoint:
+                on_checkpoint(observations[-1].id)
+        return n_saved
 
 
 class TaxonDbController(TaxonController):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.expire_after = TAXON_EXPIRATION
+        self._requests = SingleFlight()
+
     def from_ids(
         self,
         *taxon_ids: int,
@@ -102,10 +251,35 @@ class TaxonDbController(TaxonController):
         refresh: bool = False,
         **params,
     ) -> WrapperPaginator[Taxon]:
-        """Get taxa by ID; first from the database, then from the API"""
-        # Get any taxa saved in the database (unless refreshing)
+        """Get taxa by ID; first from the database, then from the API. If any of the same taxa are
+        already being fetched by another thread, those results will be shared.
+
+        Args:
+            accept_partial: Accept partial taxon records from the database (without taxonomy)
+            refresh: Re-fetch any saved taxa that are older than ``expire_after``
+        """
+        results = self._requests.do_many(
+            taxon_ids,
+            lambda ids: {
+                taxon.id: taxon
+                for taxon in self._from_ids(
+                    ids, accept_partial=accept_partial, refresh=refresh, **params
+                )
+            },
+            namespace=(accept_partial, refresh, repr(sorted(params.items()))),
+        )
+        return WrapperPaginator([taxon for taxon in results.values() if taxon is not None])
+
+    def _from_ids(
+        self,
+        taxon_ids: list[int],
+        accept_partial: bool = False,
+        refresh: bool = False,
+        **params,
+    ) -> list[Taxon]:
+        # Get any taxa saved in the database (if refreshing, only unexpired ones)
         start = time()
-        taxa = [] if refresh else self._get_db_taxa(list(taxon_ids), accept_partial)
+        taxa = self._get_db_taxa(taxon_ids, accept_partial, refresh)
         logger.debug(f'{len(taxa)} taxa found in database')
 
         # Get remaining taxa from the API and save to the database
@@ -114,13 +288,17 @@ class TaxonDbController(TaxonController):
             logger.debug(f'Fetching remaining {len(remaining_ids)} taxa from API')
             api_results = super().from_ids(*remaining_ids, **params).all() if remaining_ids else []
             taxa.extend(api_results)
-            save_taxa(api_results, DB_PATH)
+            save_taxa(api_results, DB_PATH, fetched=True)
 
         logger.debug(f'Finished in {time()-start:.2f} seconds')
-        return WrapperPaginator(taxa)
+        return taxa
 
-    def _get_db_taxa(self, taxon_ids: list[int], accept_partial: bool = False):
+    def _get_db_taxa(
+        self, taxon_ids: list[int], accept_partial: bool = False, refresh: bool = False
+    ):
         db_results = list(get_db_taxa(DB_PATH, ids=taxon_ids, accept_partial=accept_partial))
+        if refresh:
+            db_results = _filter_expired(db_results, 'taxon', self.expire_after)
         if not accept_partial:
             db_results = self._get_taxonomy(db_results)
         return db_results
@@ -128,62 +306,158 @@ class TaxonDbController(TaxonController):
     def _get_taxonomy(self, taxa: list[Taxon]) -> list[Taxon]:
         """Add ancestor and descendant records to all the specified taxa.
 
-        DB records only contain ancestor/child IDs, so we need another query to fetch full records
-        This could be done in SQL, but a many-to-many relationship with ancestors would get messy.
-        Besides, some may be missing and need to be fetched from the API.
+        Ancestors and children of all taxa are fetched from the database in a single query (see
+        :py:func:`get_db_taxonomy`). Any that are missing from the database are fetched from the API.
         """
-        fetch_ids = chain.from_iterable([t.ancestor_ids + t.child_ids for t in taxa])
-        extended_taxa = {t.id: t for t in self.from_ids(*set(fetch_ids), accept_partial=True)}
+        extended_taxa = get_db_taxonomy(DB_PATH, [t.id for t in taxa])
+
+        # Depending on data source, the taxon itself may have already been added to ancestry
+        # TODO: Fix in pyinaturalist.Taxon and/or pyinaturalist_convert.db
+        ancestor_ids = {
+            taxon.id: [id for id in taxon.ancestor_ids if id not in [ROOT_TAXON_ID, taxon.id]]
+            or _get_parent_ids(taxon, extended_taxa)
+            for taxon in taxa
+        }
+        child_ids = {
+            taxon.id: taxon.child_ids or _get_child_ids(taxon, extended_taxa) for taxon in taxa
+        }
+
+        fetch_ids = set(chain.from_iterable([*ancestor_ids.values(), *child_ids.values()]))
+        if missing_ids := fetch_ids - set(extended_taxa):
+            logger.debug(f'{len(missing_ids)} ancestors and children not found in database')
+            extended_taxa.update(
+                {t.id: t for t in self.from_ids(*missing_ids, accept_partial=True)}
+            )
 
         for taxon in taxa:
-            # Depending on data source, the taxon itself may have already been added to ancestry
-            # TODO: Fix in pyinaturalist.Taxon and/or pyinaturalist_convert.db
             taxon.ancestors = [
-                extended_taxa[id]
-                for id in taxon.ancestor_ids
-                if id not in [ROOT_TAXON_ID, taxon.id]
+                extended_taxa[id] for id in ancestor_ids[taxon.id] if id in extended_taxa
+            ]
+            taxon.children = [
+                extended_taxa[id] for id in child_ids[taxon.id] if id in extended_taxa
             ]
-            taxon.children = [extended_taxa[id] for id in taxon.child_ids]
         return taxa
 
     # TODO: Don't use all
     def search(self, **params) -> WrapperPaginator[Taxon]:
         """Search taxa, and save results to the database (for future reference by ID)"""
         results = super().search(**params).all()
-        save_taxa(results)
+        save_taxa(results, DB_PATH, fetched=True)
         return WrapperPaginator(results)
 
 
-# TODO: Set expiration on 'original' and 'large' size images using URL patterns
 class ImageSession(ClientSession):
+    """Session for downloading and caching images.
+
+    Downloads run on a dedicated pool of I/O threads, so waiting on the network doesn't tie up
+    threads used for other work. Connections and rate limits are shared by all downloads, and
+    concurrent requests for the same image share a single download. Downloaded images are stored
+    as individual files, so cache reads and writes don't contend on a single database.
+
+    Larger photo sizes expire after a period set in ``IMAGE_CACHE_EXPIRATION``, and the cache is
+    periodically compacted in the background to stay under its max size.
+
+    Decoded images are also kept in memory, so the same image shown in multiple places (or shown
+    again later) doesn't need to be decoded again.
+    """
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.image_cache = SQLiteDict(IMAGE_CACHE, 'images', no_serializer=True)
+        self.image_cache = ImageCache()
+        self.decoded_images = MemoryImageCache()
+        self._decodes = SingleFlight()
+        self.executor = ThreadPoolExecutor(MAX_IMAGE_DOWNLOADS, thread_name_prefix='image_fetch')
+        self._downloads: dict[str, Future] = {}
+        self._n_downloads = 0
+        self._lock = Lock()
 
     def get_image(self, photo: Photo, url: str = None, size: str = None) -> bytes:
         """Get an image from the cache, if it exists; otherwise, download and cache a new one"""
-        if not url:
+        url, image_hash = self._get_url_hash(photo, url, size)
+        if (data := self.image_cache.get(image_hash, get_expiration(url))) is not None:
+            return data
+        return self._start_download(url, image_hash).result()
+
+    def prefetch_image(
+        self, photo: Photo = None, url: str = None, size: str = None
+    ) -> Optional[Future]:
+        """Start downloading an image in the background, if it's not already cached. If the same
+        image is already being downloaded, that download will be reused.
+
+        Returns:
+            A future that resolves to the image data, or ``None`` if the image is already cached
+        """
+        url, image_hash = self._get_url_hash(photo, url, size)
+        if image_hash in self.image_cache:
+            return None
+        return self._start_download(url, image_hash)
+
+    def set_max_size(self, max_size_mb: int):
+        """Set the max image cache size (in MB), and remove any images over that size in the
+        background
+        """
+        self.image_cache.max_size = max_size_mb * 1024 * 1024
+        self.compact_cache()
+
+    def compact_cache(self) -> Future:
+        """Remove expired and least recently used images in the background"""
+        return self.executor.submit(self.image_cache.compact)
+
+    def _get_url_hash(self, photo: Photo = None, url: str = None, size: str = None):
+        if not url and photo:
             url = photo.url_size(size) if size else photo.url
         if not url:
             raise ValueError('No URL or photo object specified')
-        image_hash = f'{get_url_hash(url)}.{photo.ext}'
-        try:
-            return self.image_cache[image_hash]
-        except KeyError:
-            pass
+        ext = photo.ext if photo else Photo(url=url).ext
+        return url, f'{get_url_hash(url)}.{ext}'
+
+    def _start_download(self, url: str, image_hash: str) -> Future:
+        with self._lock:
+            if not (future := self._downloads.get(image_hash)):
+                future = self.executor.submit(self._download_image, url, image_hash)
+                self._downloads[image_hash] = future
+        return future
 
-        data = self.get(url).content
-        self.image_cache[image_hash] = data
-        return data
+    def _download_image(self, url: str, image_hash: str) -> bytes:
+        try:
+            data = self.get(url).content
+            self.image_cache.save(image_hash, data, url, get_expiration(url))
+            with self._lock:
+                self._n_downloads += 1
+                compact = self._n_downloads % COMPACT_INTERVAL == 0
+            if compact:
+                self.image_cache.compact()
+            return data
+        finally:
+            with self._lock:
+                self._downloads.pop(image_hash, None)
+
+    def get_qimage(self, photo: Photo = None, url: str = None, size: str = None) -> 'QImage':
+        """Get a decoded image, either from memory, from the cache, or downloaded. This is safe to
+        call from any thread, and concurrent requests for the same image share a single decode.
+        """
+        url, image_hash = self._get_url_hash(photo, url, size)
+        if (image := self.decoded_images.get(url)) is not None:
+            return image
+        ext = photo.ext if photo else Photo(url=url).ext
+        return self._decodes.do(url, lambda: self._decode_image(url, image_hash, ext))
+
+    def _decode_image(self, url: str, image_hash: str, ext: str) -> 'QImage':
+        from PySide6.QtGui import QImage
+
+        # If cached, let Qt read the file directly instead of copying it through Python first
+        image = QImage()
+        path = self.image_cache.get_path(image_hash, get_expiration(url))
+        if not (path and image.load(str(path), ext)):
+            image.loadFromData(self._start_download(url, image_hash).result(), ext)
+        self.decoded_images.set(url, image)
+        return image
 
     def get_pixmap(self, photo: Photo = None, url: str = None, size: str = None) -> 'QPixmap':
+        """Get an image as a pixmap. This must be called from the main thread."""
         from PySide6.QtGui import QPixmap
 
-        if url and not photo:
-            photo = Photo(url=url)
-        pixmap = QPixmap()
-        pixmap.loadFromData(self.get_image(photo, url, size), format=photo.ext)  # type: ignore
-        return pixmap
+        return QPixmap.fromImage(self.get_qimage(photo, url, size))
 
     def cache_size(self) -> str:
         """Get the total cache size in bytes, and the number of cached files"""
@@ -198,9 +472,20 @@ def get_db_observations(
     username: str = None,
     limit: int = None,
     order_by_date: bool = False,
+    after: tuple[Optional[datetime], int] = None,
 ) -> Iterator[Observation]:
-    """Load observation records and associated taxa from SQLite"""
-    from sqlalchemy import select
+    """Load observation records and associated taxa from SQLite
+
+    Args:
+        db_path: Path to SQLite database
+        ids: Only load observations with these IDs
+        username: Only load observations by this user
+        limit: Max number of observations to load
+        order_by_date: Order by observation date (most recent first), then by ID
+        after: With ``order_by_date``, only load observations after this ``(observed_on, id)``
+            position, for keyset pagination
+    """
+    from sqlalchemy import and_, or_, select
 
     stmt = (
         select(DbObservation)
@@ -211,16 +496,109 @@ def get_db_observations(
         stmt = stmt.where(DbObservation.id.in_(list(ids)))  # type: ignore
     if username:
         stmt = stmt.where(DbUser.login == username)
+    if order_by_date:
+        stmt = stmt.order_by(
+            DbObservation.observed_on.desc(), DbObservation.id.desc()  # type: ignore
+        )
+    if order_by_date and after:
+        # Observations with no date are sorted last (SQLite sorts NULL as the lowest value)
+        observed_on, obs_id = after
+        if observed_on:
+            observed_on = observed_on.isoformat()
+            stmt = stmt.where(
+                or_(
+                    DbObservation.observed_on < observed_on,
+                    and_(DbObservation.observed_on == observed_on, DbObservation.id < obs_id),
+                    DbObservation.observed_on.is_(None),
+                )
+            )
+        else:
+            stmt = stmt.where(DbObservation.observed_on.is_(None), DbObservation.id < obs_id)
     if limit:
         stmt = stmt.limit(limit)
-    if order_by_date:
-        stmt = stmt.order_by(DbObservation.observed_on.desc())
 
     with get_session(db_path) as session:
         for obs in session.execute(stmt):
             yield obs[0].to_model()
 
 
+def get_db_taxa(
+    db_path: PathOrStr = DB_PATH, ids: Iterable[int] = None, accept_partial: bool = True
+) -> Iterator[Taxon]:
+    """Load taxon records from SQLite"""
+    from sqlalchemy import select
+
+    stmt = select(DbTaxon)
+    if ids:
+        stmt = stmt.where(DbTaxon.id.in_(list(ids)))  # type: ignore
+    if not accept_partial:
+        stmt = stmt.where(DbTaxon.partial == False)  # noqa: E712
+
+    with get_session(db_path) as session:
+        for taxon in session.execute(stmt):
+            yield taxon[0].to_model()
+
+
+def get_db_taxonomy(db_path: PathOrStr = DB_PATH, ids: Iterable[int] = None) -> dict[int, Taxon]:
+    """Load all ancestors and children of the specified taxa from SQLite, in a single query.
+    Ancestors are found by following parent links with a recursive CTE.
+
+    Returns:
+        Ancestors, children, and the specified taxa themselves, by taxon ID
+    """
+    from sqlalchemy import or_, select
+    from sqlalchemy.orm import aliased
+
+    ids = list(ids or [])
+    lineage = select(DbTaxon.id, DbTaxon.parent_id).where(DbTaxon.id.in_(ids)).cte(recursive=True)
+    parent = aliased(DbTaxon)
+    lineage = lineage.union(
+        select(parent.id, parent.parent_id).join(lineage, parent.id == lineage.c.parent_id)
+    )
+    stmt = select(DbTaxon).where(
+        or_(DbTaxon.id.in_(select(lineage.c.id)), DbTaxon.parent_id.in_(ids))  # type: ignore
+    )
+
+    with get_session(db_path) as session:
+        taxa = [row[0].to_model() for row in session.execute(stmt)]
+    return {taxon.id: taxon for taxon in taxa}
+
+
+def _get_parent_ids(taxon: Taxon, taxa: dict[int, Taxon]) -> list[int]:
+    """Get ancestor IDs (in order from highest rank to lowest) by following parent links"""
+    parent_ids = []
+    parent_id = taxon.parent_id
+    while parent_id and parent_id in taxa and parent_id not in parent_ids:
+        parent_ids.insert(0, parent_id)
+        parent_id = taxa[parent_id].parent_id
+    return [id for id in parent_ids if id != ROOT_TAXON_ID]
+
+
+def _get_child_ids(taxon: Taxon, taxa: dict[int, Taxon]) -> list[int]:
+    children = [t for t in taxa.values() if t.parent_id == taxon.id]
+    return [t.id for t in sorted(children, key=lambda t: t.name or '')]
+
+
+def _filter_expired(records: list, record_type: str, expire_after: float) -> list:
+    """Remove any records that were fetched more than ``expire_after`` seconds ago, or that don't
+    have a fetched time
+    """
+    if not records:
+        return records
+    fetched_times = get_fetched_times(DB_PATH, record_type, [r.id for r in records])
+    min_fetched = time() - expire_after
+    fresh = [r for r in records if fetched_times.get(r.id, 0) > min_fetched]
+    if n_expired := len(records) - len(fresh):
+        logger.debug(f'{n_expired} expired {record_type} records will be re-fetched')
+    return fresh
+
+
+def get_expiration(url: str) -> Optional[int]:
+    """Get the expiration time (in seconds) for a cached image, based on its photo size, if any"""
+    match = PHOTO_SIZE_PATTERN.search(url)
+    return IMAGE_CACHE_EXPIRATION.get(match.group(1)) if match else None
+
+
 def get_url_hash(url: str) -> str:
     """Generate a hash to use as a cache key from an image URL, appended with the file extension
 
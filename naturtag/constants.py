@@ -18,11 +18,18 @@ SPINNER = ICONS_DIR / 'spinner_250px.svg'
 # Local settings & data paths
 APP_DIR = Path(user_data_dir()) / 'Naturtag'
 DB_PATH = APP_DIR / 'naturtag.db'
-IMAGE_CACHE = APP_DIR / 'images.db'
+IMAGE_CACHE_DIR = APP_DIR / 'images'
+METADATA_INDEX_PATH = APP_DIR / 'metadata_index.db'
+THUMBNAIL_CACHE_DIR = APP_DIR / 'thumbnails'
 LOGFILE = APP_DIR / 'naturtag.log'
 CONFIG_PATH = APP_DIR / 'settings.yml'
 USER_TAXA_PATH = APP_DIR / 'stored_taxa.yml'
 
+# Local database settings
+DB_POOL_SIZE = 8  # Number of connections to keep open for reuse across threads
+DB_MMAP_SIZE = 256 * 1024 * 1024  # Max size of memory-mapped database I/O, in bytes
+DB_CACHE_SIZE = 64 * 1024 * 1024  # Max size of page cache per connection, in bytes
+
 # Project info
 DOCS_URL = 'https://naturtag.readthedocs.io/en/latest/app.html'
 REPO_URL = 'https://github.com/pyinat/naturtag'
@@ -36,8 +43,27 @@ SIZE_ICON = (32, 32)
 SIZE_SM = (75, 75)
 SIZE_DEFAULT = (250, 250)
 SIZE_LG = (500, 500)
+THUMBNAIL_CACHE_MAX_SIZE = 256 * 1024 * 1024  # Max total size of cached thumbnails, in bytes
+IMAGE_CACHE_MAX_SIZE = 1024 * 1024 * 1024  # Default max size of downloaded images, in bytes
+IMAGE_MEMORY_CACHE_MAX_SIZE = 256 * 1024 * 1024  # Max size of decoded images in memory, in bytes
+FULLSCREEN_PREFETCH = 2  # Number of images to preload on either side of a fullscreen image
+
+# Expiration times for downloaded images by photo size, in seconds; other sizes never expire
+IMAGE_CACHE_EXPIRATION = {
+    'large': 60 * 60 * 24 * 30,
+    'original': 60 * 60 * 24 * 7,
+}
+
+# Default time after which saved observations and taxa are re-fetched when refreshing, in seconds
+OBSERVATION_EXPIRATION = 60 * 60
+TAXON_EXPIRATION = 60 * 60 * 24 * 7
+
+# Watch mode settings
+WATCH_INTERVAL = 2  # Seconds between polling for changes (CLI only)
+WATCH_DEBOUNCE = 1  # Seconds to wait after the last change before processing new/modified images
 
 # Relevant groups of image metadata tags
+METADATA_FORMATS = ('exif', 'iptc', 'xmp')
 EXIF_HIDE_PREFIXES = [
     'Exif.Image.PrintImageMatching',
     'Exif.MakerNote',
@@ -77,6 +103,7 @@ MAX_LABEL_CHARS = 80
 QSS_PATH = ASSETS_DIR / 'style.qss'
 MAX_DISPLAY_HISTORY = 50  # Max number of history items to display at a time
 MAX_DISPLAY_OBSERVED = 100  # Max number of observed taxa to display at a time
+OBSERVATION_PAGE_SIZE = 50  # Number of user observations to load at a time when scrolling
 MAX_DIR_HISTORY = 10
 
 # Simplified tags without formatting variations
@@ -1,12 +1,11 @@
 from logging import getLogger
-from typing import TYPE_CHECKING
 
 from pyinaturalist import Observation, Taxon
 from PySide6.QtCore import Qt, Signal, Slot
 from PySide6.QtWidgets import QApplication, QGroupBox, QLabel, QSizePolicy
 
 from naturtag.controllers import BaseController, ImageGallery
-from naturtag.metadata import MetaMetadata, _refresh_tags, get_ids_from_url, tag_images
+from naturtag.metadata import MetaMetadata, get_ids_from_url, refresh_metadata, tag_images
 from naturtag.widgets import (
     HorizontalLayout,
     IdInput,
@@ -98,24 +97,30 @@ class ImageController(BaseController):
 
     @Slot(MetaMetadata)
     def update_metadata(self, metadata: MetaMetadata):
-        if TYPE_CHECKING:
-            assert metadata.image_path is not None
-        image = self.gallery.images[metadata.image_path]
-        image.update_metadata(metadata)
+        self.gallery.update_metadata(metadata)
+
+    @Slot(list)
+    def update_all_metadata(self, metadata_objs: list[MetaMetadata]):
+        for metadata in metadata_objs:
+            self.update_metadata(metadata)
+        self.info(f'{len(metadata_objs)} images updated')
 
     def refresh(self):
         """Refresh metadata for any previously tagged images"""
-        images = list(self.gallery.images.values())
-        if not images:
+        image_paths = list(self.gallery.images.keys())
+        if not image_paths:
             self.info('Select images to tag')
             return
 
-        for image in images:
-            future = self.threadpool.schedule(
-                lambda: _refresh_tags(image.metadata, self.settings),
-            )
-            future.on_result.connect(self.update_metadata)
-        self.info(f'{len(images)} images updated')
+        # Read separate metadata objects in the worker rather than modifying the ones displayed in
+        # the gallery; the updated copies are then passed back to the main thread
+        def refresh_images(image_paths):
+            metadata_objs = [MetaMetadata(path, lazy=True) for path in image_paths]
+            return refresh_metadata(metadata_objs, settings=self.settings)
+
+        future = self.threadpool.schedule(refresh_images, image_paths=image_paths)
+        future.on_result.connect(self.update_all_metadata)
+        self.info(f'Refreshing {len(image_paths)} images')
 
     def clear(self):
         """Clear all images and input"""
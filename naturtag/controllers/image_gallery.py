@@ -1,52 +1,82 @@
-# TODO: Placeholder "spinner" for loading images
+import os
 import re
 import webbrowser
+from itertools import chain
 from logging import getLogger
 from pathlib import Path
-from typing import Callable, Iterable, Optional
+from time import monotonic
+from typing import Any, Callable, Iterable, Optional
 
 from PySide6.QtCore import (
-    QEasingCurve,
-    QParallelAnimationGroup,
-    QPropertyAnimation,
+    QAbstractListModel,
+    QFileSystemWatcher,
+    QModelIndex,
+    QPoint,
+    QRect,
+    QSize,
     Qt,
+    QThread,
+    QTimer,
     QUrl,
     Signal,
     Slot,
 )
-from PySide6.QtGui import QAction, QDesktopServices, QDropEvent, QPixmap
+from PySide6.QtGui import (
+    QAction,
+    QBrush,
+    QColor,
+    QDesktopServices,
+    QDropEvent,
+    QFont,
+    QIcon,
+    QImage,
+    QPainter,
+    QPixmap,
+    QTransform,
+)
 from PySide6.QtWidgets import (
     QApplication,
     QFileDialog,
-    QGraphicsColorizeEffect,
-    QGraphicsOpacityEffect,
-    QLabel,
+    QListView,
     QMenu,
-    QScrollArea,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
     QWidget,
 )
 
 from naturtag.app.style import fa_icon
-from naturtag.app.threadpool import ThreadPool
-from naturtag.constants import IMAGE_FILETYPES, SIZE_DEFAULT, Dimensions, PathOrStr
+from naturtag.app.threadpool import WorkerSignals
+from naturtag.constants import IMAGE_FILETYPES, SIZE_DEFAULT, WATCH_DEBOUNCE, Dimensions, PathOrStr
 from naturtag.controllers import BaseController
 from naturtag.metadata import MetaMetadata
-from naturtag.utils import generate_thumbnail, get_valid_image_paths
-from naturtag.widgets import (
-    FAIcon,
-    FlowLayout,
-    HorizontalLayout,
-    ImageWindow,
-    StylableWidget,
-    VerticalLayout,
-)
-from naturtag.widgets.images import HoverMixin, PixmapLabel
+from naturtag.utils import get_thumbnail, iter_valid_image_paths
+from naturtag.utils.image_glob import iter_images_from_dir, uri_to_path
+from naturtag.widgets import ImageWindow, VerticalLayout
+
+# Number of extra pages of images to load ahead of the current scroll position
+PRELOAD_PAGES = 1
+# Number of pages of thumbnails to keep in memory above and below the current scroll position
+KEEP_PAGES = 3
+# Delay (in milliseconds) after scrolling or resizing before loading newly visible images
+LOAD_DELAY = 50
+# Duration (in seconds) of the highlight animation shown when an image is updated
+PULSE_DURATION = 1.0
+
+CARD_PADDING = 5
+LABEL_HEIGHT = 40
+ICON_SIZE = 20
 
 logger = getLogger(__name__)
 
 
 class ImageGallery(BaseController):
-    """Container for displaying local image thumbnails & info"""
+    """Container for displaying local image thumbnails & info.
+
+    Images are displayed in a virtualized list view: thumbnails and metadata are only loaded for
+    images that are visible (or about to be visible), in scroll order, and thumbnails far outside
+    the visible area are discarded.
+    """
 
     on_load_images = Signal(list)  #: New images have been loaded
     on_select_taxon = Signal(int)  #: A taxon was selected from context menu
@@ -55,27 +85,61 @@ class ImageGallery(BaseController):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.setAcceptDrops(True)
-        self.images: dict[Path, ThumbnailCard] = {}
-        self.image_window = ImageWindow()
+        self.image_window = ImageWindow(self.threadpool)
         self.image_window.on_remove.connect(self.remove_image)
         root = VerticalLayout(self)
         root.setContentsMargins(0, 0, 0, 0)
 
-        self.scroll_panel = StylableWidget()
-        self.scroll_panel.setObjectName('gallery_scroll_panel')
-        self.flow_layout = FlowLayout(self.scroll_panel)
-        self.flow_layout.setSpacing(0)
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        scroll_area.setWidget(self.scroll_panel)
-        root.addLayout(self.flow_layout)
-        root.addWidget(scroll_area)
+        self.model = ImageListModel(self)
+        self.view = ImageListView(self.model)
+        self.view.on_select.connect(self.select_image)
+        self.view.on_remove.connect(self.remove_image)
+        self.view.on_context_menu.connect(self.show_context_menu)
+        self.view.on_viewport_changed.connect(self.schedule_load)
+        root.addWidget(self.view)
+
+        self.context_menu = ThumbnailContextMenu(self)
+        self.context_menu.on_copy.connect(self.on_message)
+        self.context_menu.on_remove.connect(self.remove_image)
+        self.context_menu.on_select_taxon.connect(self.on_select_taxon)
+        self.context_menu.on_select_observation.connect(self.on_select_observation)
+
+        # Images currently being loaded from a separate thread; limited so that jobs for images
+        # that have since been scrolled out of view don't pile up
+        self.loading: dict[Path, WorkerSignals] = {}
+        self.loaded: list[tuple[Path, QImage, Optional[MetaMetadata]]] = []
+        self.threadpool.on_batch_complete.connect(self.flush_loaded_images)
+        self.load_timer = QTimer(self)
+        self.load_timer.setSingleShot(True)
+        self.load_timer.setInterval(LOAD_DELAY)
+        self.load_timer.timeout.connect(self.load_visible_images)
+
+        # Watch image directories for changes, and load changed images after a short delay
+        self.dir_watcher = QFileSystemWatcher(self)
+        self.dir_watcher.directoryChanged.connect(self.on_dir_changed)
+        self.changed_dirs: set[Path] = set()
+        self.watch_timer = QTimer(self)
+        self.watch_timer.setSingleShot(True)
+        self.watch_timer.setInterval(int(WATCH_DEBOUNCE * 1000))
+        self.watch_timer.timeout.connect(self.load_changed_images)
+
+    @property
+    def images(self) -> dict[Path, 'GalleryImage']:
+        """All images currently in the gallery, keyed by path"""
+        return self.model.images
+
+    @property
+    def max_loading(self) -> int:
+        return max(self.threadpool.maxThreadCount(), 1) * 2
 
     def clear(self):
         """Clear all images from the viewer"""
-        self.images = {}
-        self.flow_layout.clear()
+        self.model.clear()
+        self.threadpool.cancel(group='gallery')
+        self.loading = {}
+        self.loaded = []
+        if watched_dirs := self.dir_watcher.directories():
+            self.dir_watcher.removePaths(watched_dirs)
 
     def load_file_dialog(self, start_dir: PathOrStr = None):
         """Show a file chooser dialog"""
@@ -88,48 +152,146 @@ class ImageGallery(BaseController):
         self.load_images(image_paths)
 
     def load_images(self, image_paths: Iterable[PathOrStr]):
-        """Load multiple images, and ignore any duplicates"""
-        images = get_valid_image_paths(image_paths, recursive=True)
-        new_images = sorted(images - set(self.images.keys()))
-        if not new_images:
-            return
-
-        # Load blank placeholder cards first
-        logger.info(f'Loading {len(new_images)} ({len(images) - len(new_images)} already loaded)')
-        cards = [self.load_image(image_path, delayed_load=True) for image_path in new_images]
-
-        # Then load actual images
-        for thumbnail_card in filter(None, cards):
-            thumbnail_card.load_image_async(self.threadpool)
-
-        self.on_load_images.emit(new_images)
-
-    def load_image(self, image_path: Path, delayed_load: bool = False) -> Optional['ThumbnailCard']:
-        """Load an image"""
-        if not image_path.is_file():
-            logger.info(f'File does not exist: {image_path}')
-            return None
-        elif image_path in self.images:
-            logger.info(f'Image already loaded: {image_path}')
-            return None
+        """Load multiple images, and ignore any duplicates. Thumbnails and metadata will be loaded
+        when each image is first displayed.
+        """
+        image_paths = [uri_to_path(path) for path in image_paths if path]
+        new_images = [
+            image_path
+            for image_path in iter_valid_image_paths(image_paths, recursive=True)
+            if image_path not in self.images
+        ]
+        self.model.add_images(new_images)
+        self.schedule_load()
+
+        if new_images:
+            logger.info(f'Loaded {len(new_images)} new images')
+            self.on_load_images.emit(new_images)
+        if self.settings.watch_image_dirs:
+            self.watch_dirs(image_paths, new_images)
+
+    def watch_dirs(self, image_paths: list[Path], new_images: list[Path]):
+        """Watch any loaded directories, including subdirectories that contain images"""
+        dirs = [path for path in image_paths if path.is_dir()]
+        watch_dirs = set(dirs) | {
+            image_path.parent
+            for image_path in new_images
+            if any(image_path.is_relative_to(d) for d in dirs)
+        }
+        watch_dirs = {str(d) for d in watch_dirs} - set(self.dir_watcher.directories())
+        if watch_dirs:
+            logger.debug(f'Watching {len(watch_dirs)} directories for changes')
+            self.dir_watcher.addPaths(list(watch_dirs))
 
-        logger.info(f'Loading {image_path}')
-        thumbnail_card = ThumbnailCard(image_path)
-        thumbnail_card.on_loaded.connect(self._bind_image_actions)
-        self.flow_layout.addWidget(thumbnail_card)
-        self.images[thumbnail_card.image_path] = thumbnail_card
+    @Slot(str)
+    def on_dir_changed(self, path: str):
+        """Wait for any further changes before loading new or modified images"""
+        if self.settings.watch_image_dirs:
+            self.changed_dirs.add(Path(path))
+            self.watch_timer.start()
+
+    def load_changed_images(self):
+        """Load any new images, and reload any modified images, in the changed directories"""
+        changed_dirs, self.changed_dirs = self.changed_dirs, set()
+        new_images = []
+        for image_path in chain.from_iterable(iter_images_from_dir(d) for d in changed_dirs):
+            if not (image := self.images.get(image_path)):
+                new_images.append(image_path)
+            elif image.is_modified:
+                logger.debug(f'Reloading modified image: {image_path}')
+                self.model.unload_image(image_path)
+        if new_images:
+            self.load_images(new_images)
+        else:
+            self.schedule_load()
+
+    def schedule_load(self):
+        """Load newly visible images after a short delay, to handle bursts of scroll events"""
+        self.load_timer.start()
+
+    def load_visible_images(self):
+        """Load thumbnails and metadata for visible images, plus a page ahead, in display order.
+        Discard any thumbnails that are too far outside the visible area.
+        """
+        visible_rows = self.view.visible_rows()
+        page_size = len(visible_rows)
+        self.model.evict_thumbnails(
+            range(
+                visible_rows.start - page_size * KEEP_PAGES,
+                visible_rows.stop + page_size * KEEP_PAGES,
+            )
+        )
 
-        if not delayed_load:
-            thumbnail_card.load_image()
-        return thumbnail_card
+        # Cancel queued jobs for images that are no longer in range, and move visible images to the
+        # front of the queue
+        load_rows = range(
+            visible_rows.start,
+            min(visible_rows.stop + page_size * PRELOAD_PAGES, self.model.rowCount()),
+        )
+        for image_path, job in list(self.loading.items()):
+            row = self.model.index_of(image_path).row()
+            if row not in load_rows:
+                self.threadpool.cancel_job(job)
+            elif row in visible_rows:
+                self.threadpool.set_priority(job, QThread.HighPriority)
+
+        for row in load_rows:
+            if len(self.loading) >= self.max_loading:
+                break
+            image = self.model.image_at(row)
+            if image.pixmap is None and image.image_path not in self.loading:
+                priority = QThread.HighPriority if row in visible_rows else QThread.NormalPriority
+                self.load_image_async(image, priority)
+
+    def load_image_async(
+        self, image: 'GalleryImage', priority: QThread.Priority = QThread.NormalPriority
+    ):
+        """Load a thumbnail, plus metadata if needed, from a separate thread"""
+        image_path = image.image_path
+        future = self.threadpool.schedule(
+            _load_image,
+            priority=priority,
+            group='gallery',
+            image_path=image_path,
+            size=self.view.thumbnail_size,
+            load_metadata=image.metadata is None,
+        )
+        future.on_result.connect(self.on_image_loaded)
+        future.on_error.connect(lambda _: self.on_image_loaded((image_path, QImage(), None)))
+        future.on_cancel.connect(lambda: self._on_load_cancelled(image_path, future))
+        self.loading[image_path] = future
+
+    @Slot(object)
+    def on_image_loaded(self, result: tuple[Path, QImage, Optional[MetaMetadata]]):
+        """Collect a loaded image, to be added to the model with the rest of its batch"""
+        if self.loading.pop(result[0], None):
+            self.loaded.append(result)
+
+    def flush_loaded_images(self):
+        """Update the model with all images loaded in the last batch of results"""
+        if self.loaded:
+            loaded, self.loaded = self.loaded, []
+            self.model.set_images(loaded)
+            self.schedule_load()
+
+    def _on_load_cancelled(self, image_path: Path, job: WorkerSignals):
+        # The image may have already been rescheduled with a new job
+        if self.loading.get(image_path) is job:
+            del self.loading[image_path]
 
-    def _bind_image_actions(self, thumbnail: 'ThumbnailCard'):
-        """Bind actions to an image"""
-        thumbnail.on_remove.connect(self.remove_image)
-        thumbnail.on_select.connect(self.select_image)
-        thumbnail.on_copy.connect(self.on_message)
-        thumbnail.context_menu.on_select_taxon.connect(self.on_select_taxon)
-        thumbnail.context_menu.on_select_observation.connect(self.on_select_observation)
+    def update_metadata(self, metadata: MetaMetadata):
+        """Update an image with new metadata, and show a highlight animation"""
+        self.model.set_image(metadata.image_path, metadata=metadata, pulse=True)
+        self.view.pulse()
+
+    def show_context_menu(self, image_path: Path, pos: QPoint):
+        image = self.images[image_path]
+        if image.metadata is None:
+            image.metadata = MetaMetadata(image_path, lazy=True)
+        self.context_menu.refresh_actions(image)
+        # Don't keep image files open while the menu is shown; they will be reopened if needed
+        image.metadata.close()
+        self.context_menu.exec(pos)
 
     def dragEnterEvent(self, event):
         event.acceptProposedAction()
@@ -144,186 +306,382 @@ class ImageGallery(BaseController):
     @Slot(str)
     def remove_image(self, image_path: Path):
         logger.debug(f'Removing image {image_path}')
-        thumbnail = self.images.pop(image_path)
-        thumbnail.setParent(None)
-        thumbnail.deleteLater()
+        self.model.remove_image(image_path)
+        if job := self.loading.pop(image_path, None):
+            self.threadpool.cancel_job(job)
+        self.schedule_load()
 
     @Slot(str)
     def select_image(self, image_path: Path):
-        self.image_window.display_image_fullscreen(image_path, list(self.images.keys()))
-
-
-class ThumbnailCard(StylableWidget):
-    """A card that displays a thumbnail for a local image file, along with a title and icons
-    representing its metadata contents. Also adds the following mouse actions:
+        logger.debug(f'Selecting image {image_path}')
+        self.image_window.display_image_fullscreen(image_path, list(self.model.image_paths))
 
-    * Left click: Show full image
-    * Middle click: Remove image
-    * Right click: Show context menu
-    """
 
-    on_loaded = Signal(object)  #: Image and metadata have been loaded
-    on_copy = Signal(str)  #: Tags were copied to the clipboard
-    on_remove = Signal(Path)  #: Request for the image to be removed from the gallery
-    on_select = Signal(Path)  #: The image was clicked
+class GalleryImage:
+    """A local image file in the gallery, with its thumbnail and metadata (if loaded)"""
 
-    def __init__(self, image_path: Path, size: Dimensions = SIZE_DEFAULT):
-        super().__init__()
+    def __init__(self, image_path: Path):
         self.image_path = image_path
-        self.metadata: MetaMetadata = None  # type: ignore
-        layout = VerticalLayout(self)
-
-        # Image
-        self.image = MetaThumbnail(self, size=size)
-        layout.addWidget(self.image)
-
-        self.context_menu = ThumbnailContextMenu(self)
-        self.icons = ThumbnailMetaIcons(self)
-        self.icons.setObjectName('metadata_icons')
-
-        # Filename label
-        text = re.sub('([_-])', '\\1\u200b', self.image_path.name)  # To allow word wrapping
-        self.label = QLabel(text)
-        self.label.setMaximumWidth(SIZE_DEFAULT[0])
-        self.label.setMinimumHeight(40)
-        self.label.setAlignment(Qt.AlignLeft)
-        self.label.setWordWrap(True)
-        layout.addWidget(self.label)
-
-        # Icon shown when an image is tagged or updated
-        self.check = FAIcon('fa5s.check', self.image, secondary=True, size=SIZE_DEFAULT[0])
-        self.check.setVisible(False)
-
-    def load_image(self):
-        """Load thumbnail + metadata in the main thread"""
-        pixmap, metadata = self.image.get_pixmap_meta()
-        self.image.setPixmap(pixmap)
-        self.set_metadata(metadata)
-
-    def load_image_async(self, threadpool: ThreadPool):
-        """Load thumbnail + metadata in a separate thread"""
-        self.image.set_pixmap_meta_async(threadpool, self.image_path)
-        self.image.on_load_metadata.connect(self.set_metadata)
+        self.metadata: Optional[MetaMetadata] = None
+        self.mtime: Optional[int] = None
+        self.pixmap: Optional[QPixmap] = None
+        self.updated: float = 0
+        # Allow word wrapping on separator characters
+        self.label = re.sub('([_-])', '\\1\u200b', image_path.name)
+
+    @property
+    def is_modified(self) -> bool:
+        """Indicates that the image file has been modified since its metadata was last loaded"""
+        return self.mtime is not None and _get_mtime(self.image_path) != self.mtime
+
+    @property
+    def pulse_progress(self) -> Optional[float]:
+        """Progress (from 0 to 1) of the highlight animation, if it's currently running"""
+        progress = (monotonic() - self.updated) / PULSE_DURATION
+        return progress if progress < 1 else None
 
     def set_metadata(self, metadata: MetaMetadata):
-        """Update UI based on new metadata"""
-        logger.debug(f'New metadata: {metadata}')
         self.metadata = metadata
-        self.context_menu.refresh_actions(self)
-        self.icons.refresh_icons(metadata)
-        self.setToolTip(metadata.summary)
-        self.on_loaded.emit(self)
+        self.mtime = _get_mtime(self.image_path)
 
-    def contextMenuEvent(self, e):
-        self.context_menu.exec(e.globalPos())
 
-    def mousePressEvent(self, _):
-        """Placeholder to accept mouse press events"""
+class ImageListModel(QAbstractListModel):
+    """Model containing local image paths, plus thumbnails and metadata that are loaded on demand"""
 
-    def mouseReleaseEvent(self, event):
-        if event.button() == Qt.LeftButton:
-            self.select()
-        elif event.button() == Qt.MiddleButton:
-            self.remove()
+    ImageRole = Qt.UserRole + 1  #: Role for the GalleryImage object for an index
 
-    def copy_flickr_tags(self):
-        QApplication.clipboard().setText(self.metadata.keyword_meta.flickr_tags)
-        id_str = (
-            f'observation {self.metadata.observation_id}'
-            if self.metadata.has_observation
-            else f'taxon {self.metadata.taxon_id}'
-        )
-        self.pulse()
-        self.on_copy.emit(f'Tags for {id_str} copied to clipboard')
+    def __init__(self, parent: QWidget = None):
+        super().__init__(parent)
+        self.images: dict[Path, GalleryImage] = {}
+        self.image_paths: list[Path] = []
+        self._rows: dict[Path, int] = {}
+        self._thumbnails: set[Path] = set()
 
-    def open_directory(self):
-        QDesktopServices.openUrl(QUrl(self.image_path.parent.as_uri()))
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.image_paths)
 
-    def pulse(self):
-        """Show a highlight animation to indicate the image has been updated"""
-        # Color pulse
-        self.color_effect = QGraphicsColorizeEffect()
-        self.color_effect.setColor(self.palette().highlight().color())
-        self.label.setGraphicsEffect(self.color_effect)
-        color_anim = QPropertyAnimation(self.color_effect, b'strength')
-        color_anim.setStartValue(1)
-        color_anim.setEndValue(0)
-        color_anim.setDuration(1000)
-        color_anim.setEasingCurve(QEasingCurve.OutQuad)
-
-        # Check mark icon
-        self.op_effect = QGraphicsOpacityEffect()
-        self.check.setGraphicsEffect(self.op_effect)
-        self.check.setVisible(True)
-        op_anim = QPropertyAnimation(self.op_effect, b'opacity')
-        op_anim.setStartValue(1)
-        op_anim.setEndValue(0)
-        op_anim.setDuration(1000)
-        op_anim.setEasingCurve(QEasingCurve.InQuad)
-
-        # Group animations and start all
-        self.anim_group = QParallelAnimationGroup()
-        self.anim_group.addAnimation(color_anim)
-        self.anim_group.addAnimation(op_anim)
-        self.anim_group.finished.connect(lambda: self.label.setGraphicsEffect(None))
-        self.anim_group.start()
-
-    def remove(self):
-        self.on_remove.emit(self.image_path)
-
-    def select(self):
-        logger.debug(f'Selecting image {self.image_path}')
-        self.on_select.emit(self.image_path)
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        image = self.image_at(index.row())
+        if role == Qt.DisplayRole:
+            return image.image_path.name
+        elif role == Qt.DecorationRole:
+            return image.pixmap
+        # Summary requires all metadata, so wait until it's needed (on hover)
+        elif role == Qt.ToolTipRole and image.metadata:
+            return image.metadata.summary
+        elif role == self.ImageRole:
+            return image
+        return None
+
+    def image_at(self, row: int) -> GalleryImage:
+        return self.images[self.image_paths[row]]
+
+    def index_of(self, image_path: Path) -> QModelIndex:
+        row = self._rows.get(image_path)
+        return self.index(row) if row is not None else QModelIndex()
+
+    def add_images(self, image_paths: list[Path]):
+        if not image_paths:
+            return
+        start = len(self.image_paths)
+        self.beginInsertRows(QModelIndex(), start, start + len(image_paths) - 1)
+        for row, image_path in enumerate(image_paths, start=start):
+            self.images[image_path] = GalleryImage(image_path)
+            self.image_paths.append(image_path)
+            self._rows[image_path] = row
+        self.endInsertRows()
 
-    def update_metadata(self, metadata: MetaMetadata):
-        """Update UI based on new metadata, and show a highlight animation"""
-        self.pulse()
-        self.set_metadata(metadata)
+    def remove_image(self, image_path: Path):
+        if (row := self._rows.get(image_path)) is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.images[image_path]
+        del self.image_paths[row]
+        self._thumbnails.discard(image_path)
+        self._rows = {path: i for i, path in enumerate(self.image_paths)}
+        self.endRemoveRows()
 
+    def clear(self):
+        self.beginResetModel()
+        self.images = {}
+        self.image_paths = []
+        self._rows = {}
+        self._thumbnails = set()
+        self.endResetModel()
 
-class MetaThumbnail(HoverMixin, PixmapLabel):
-    """Thumbnail for a local image plus metadata"""
+    def set_image(
+        self,
+        image_path: Path,
+        thumbnail: QImage = None,
+        metadata: MetaMetadata = None,
+        pulse: bool = False,
+    ):
+        """Update an image with a new thumbnail and/or metadata"""
+        self.set_images([(image_path, thumbnail, metadata)], pulse=pulse)
 
-    on_load_metadata = Signal(MetaMetadata)  #: Finished reading image metadata
+    def set_images(
+        self,
+        images: list[tuple[Path, Optional[QImage], Optional[MetaMetadata]]],
+        pulse: bool = False,
+    ):
+        """Update multiple images with new thumbnails and/or metadata, and notify views once for
+        all changed rows. Thumbnails are loaded as images from worker threads, and converted to
+        pixmaps here on the main thread.
+        """
+        rows = []
+        for image_path, thumbnail, metadata in images:
+            if not (image := self.images.get(image_path)):
+                continue
+            if thumbnail is not None:
+                image.pixmap = QPixmap.fromImage(thumbnail)
+                self._thumbnails.add(image_path)
+            if metadata is not None:
+                logger.debug(f'New metadata: {metadata}')
+                image.set_metadata(metadata)
+            if pulse:
+                image.updated = monotonic()
+            rows.append(self._rows[image_path])
+        if rows:
+            self.dataChanged.emit(self.index(min(rows)), self.index(max(rows)))
+
+    def unload_image(self, image_path: Path):
+        """Discard an image's thumbnail and metadata, so they will be reloaded when next displayed"""
+        if image := self.images.get(image_path):
+            image.pixmap = None
+            image.metadata = None
+            image.mtime = None
+            self._thumbnails.discard(image_path)
+            index = self.index_of(image_path)
+            self.dataChanged.emit(index, index)
+
+    def evict_thumbnails(self, keep_rows: range):
+        """Discard thumbnails for any images outside the given rows"""
+        evict = [path for path in self._thumbnails if self._rows.get(path, -1) not in keep_rows]
+        for image_path in evict:
+            self.images[image_path].pixmap = None
+            self._thumbnails.discard(image_path)
+        if evict:
+            logger.debug(f'Discarded {len(evict)} thumbnails')
+
+
+class ImageListView(QListView):
+    """Virtualized list view that displays images as a grid of thumbnail cards. Also adds the
+    following mouse actions:
 
-    def __init__(self, parent: QWidget, size: Dimensions = SIZE_DEFAULT):
-        # We will generate a thumbnail of final size; no scaling needed
-        super().__init__(parent, rounded=True, scale=False)
+    * Left click: Show full image
+    * Middle click: Remove image
+    * Right click: Show context menu
+    """
+
+    on_context_menu = Signal(Path, QPoint)  #: Context menu requested for an image
+    on_remove = Signal(Path)  #: Request for an image to be removed from the gallery
+    on_select = Signal(Path)  #: An image was clicked
+    on_viewport_changed = Signal()  #: The view was scrolled or resized
+
+    def __init__(self, model: ImageListModel, size: Dimensions = SIZE_DEFAULT):
+        super().__init__()
         self.thumbnail_size = size
-        self.setFixedSize(*size)
+        self.delegate = ThumbnailDelegate(self, size=size)
+        self.setItemDelegate(self.delegate)
+        self.setModel(model)
+        self.setViewMode(QListView.IconMode)
+        self.setMovement(QListView.Static)
+        self.setResizeMode(QListView.Adjust)
+        self.setDragEnabled(False)
+        self.setAcceptDrops(False)
+        self.setUniformItemSizes(True)
+        self.setGridSize(self.delegate.card_size)
+        self.setSpacing(0)
+        self.setSelectionMode(QListView.NoSelection)
+        self.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setMouseTracking(True)
+        self.setObjectName('gallery_list_view')
+        model.rowsInserted.connect(self.on_viewport_changed)
+        model.rowsRemoved.connect(self.on_viewport_changed)
+
+        # Repaint while any highlight animations are running
+        self.pulse_timer = QTimer(self)
+        self.pulse_timer.setInterval(30)
+        self.pulse_timer.timeout.connect(self.viewport().update)
+        self.pulse_stop_timer = QTimer(self)
+        self.pulse_stop_timer.setSingleShot(True)
+        self.pulse_stop_timer.setInterval(int(PULSE_DURATION * 1000))
+        self.pulse_stop_timer.timeout.connect(self.pulse_timer.stop)
+        self.pulse_stop_timer.timeout.connect(self.viewport().update)
+
+    def visible_rows(self) -> range:
+        """Get the range of rows that are currently visible (including partially visible)"""
+        card_size = self.gridSize()
+        n_columns = max(self.viewport().width() // card_size.width(), 1)
+        top = self.verticalScrollBar().value()
+        first_line = top // card_size.height()
+        last_line = (top + self.viewport().height()) // card_size.height()
+        return range(
+            first_line * n_columns,
+            min((last_line + 1) * n_columns, self.model().rowCount()),
+        )
 
-    def get_pixmap_meta(self, path: PathOrStr) -> tuple[QPixmap, MetaMetadata]:
-        """All I/O for loading an image preview (reading metadata, generating thumbnail),
-        to be run from a separate thread
-        """
-        return generate_thumbnail(path, self.thumbnail_size), MetaMetadata(path)
+    def pulse(self):
+        """Start or extend highlight animations for updated images"""
+        self.pulse_timer.start()
+        self.pulse_stop_timer.start()
 
-    def set_pixmap_meta_async(self, threadpool: ThreadPool, path: PathOrStr = None):
-        """Generate a photo thumbnail and read its metadata from a separate thread, and render it
-        in the main thread when complete
-        """
-        future = threadpool.schedule(self.get_pixmap_meta, path=path)
-        future.on_result.connect(self.set_pixmap_meta)
+    def contextMenuEvent(self, event):
+        if image_path := self._path_at(event.pos()):
+            self.on_context_menu.emit(image_path, event.globalPos())
+
+    def mouseReleaseEvent(self, event):
+        if image_path := self._path_at(event.pos()):
+            if event.button() == Qt.LeftButton:
+                self.on_select.emit(image_path)
+            elif event.button() == Qt.MiddleButton:
+                self.on_remove.emit(image_path)
+        super().mouseReleaseEvent(event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.on_viewport_changed.emit()
+
+    def scrollContentsBy(self, dx: int, dy: int):
+        super().scrollContentsBy(dx, dy)
+        self.on_viewport_changed.emit()
+
+    def _path_at(self, pos: QPoint) -> Optional[Path]:
+        index = self.indexAt(pos)
+        if index.isValid():
+            return index.data(ImageListModel.ImageRole).image_path
+        return None
+
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    """Draws a card for a local image, with a thumbnail, filename, and icons representing its
+    metadata contents
+    """
+
+    # Icons to indicate what types of metadata are available
+    METADATA_ICONS = [
+        ('mdi.bird', lambda meta: meta.has_taxon),
+        ('fa.binoculars', lambda meta: meta.has_observation),
+        ('mdi.map-marker', lambda meta: meta.has_coordinates),
+        ('fa.tags', lambda meta: meta.has_any_tags),
+        ('mdi.xml', lambda meta: meta.has_sidecar),
+    ]
+
+    def __init__(self, parent: QWidget = None, size: Dimensions = SIZE_DEFAULT):
+        super().__init__(parent)
+        self.thumbnail_size = QSize(*size)
+        self.card_size = QSize(
+            size[0] + CARD_PADDING * 2, size[1] + LABEL_HEIGHT + CARD_PADDING * 2
+        )
+        self._icons: dict[tuple[str, bool], QPixmap] = {}
+        self._check_icon: Optional[QPixmap] = None
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        return self.card_size
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        image: GalleryImage = index.data(ImageListModel.ImageRole)
+        palette = option.palette
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        rect = option.rect.adjusted(CARD_PADDING, CARD_PADDING, -CARD_PADDING, -CARD_PADDING)
+        thumbnail_rect = QRect(rect.topLeft(), self.thumbnail_size)
+        label_rect = QRect(
+            thumbnail_rect.left(), thumbnail_rect.bottom() + 1, rect.width(), LABEL_HEIGHT
+        )
+        hover = bool(option.state & QStyle.State_MouseOver)
+
+        # Thumbnail with rounded corners, or a placeholder if not yet loaded
+        painter.setPen(Qt.NoPen)
+        if image.pixmap and not image.pixmap.isNull():
+            brush = QBrush(image.pixmap)
+            brush.setTransform(QTransform.fromTranslate(thumbnail_rect.x(), thumbnail_rect.y()))
+            painter.setBrush(brush)
+            painter.drawRoundedRect(
+                QRect(thumbnail_rect.topLeft(), image.pixmap.size()).intersected(thumbnail_rect),
+                6,
+                6,
+            )
+        else:
+            painter.setBrush(palette.alternateBase())
+            painter.drawRoundedRect(thumbnail_rect, 6, 6)
+        if hover:
+            painter.setBrush(QColor(0, 0, 0, 76))
+            painter.drawRoundedRect(thumbnail_rect, 6, 6)
+
+        if image.metadata:
+            self._paint_metadata_icons(painter, thumbnail_rect, image.metadata)
+
+        # Filename label, highlighted if recently updated
+        pulse_progress = image.pulse_progress
+        painter.fillRect(label_rect, QColor(0, 0, 0, 76))
+        if pulse_progress is not None:
+            highlight = QColor(palette.highlight().color())
+            highlight.setAlphaF((1 - pulse_progress) ** 2)
+            painter.fillRect(label_rect, highlight)
+        font = QFont(option.font)
+        font.setPointSize(11)
+        painter.setFont(font)
+        painter.setPen(palette.text().color())
+        painter.drawText(
+            label_rect.adjusted(2, 0, -2, 0),
+            Qt.AlignLeft | Qt.AlignTop | Qt.TextWordWrap,
+            image.label,
+        )
 
-    def set_pixmap_meta(self, pixmap_meta: tuple[QPixmap, MetaMetadata]):
-        pixmap, metadata = pixmap_meta
-        self.setPixmap(pixmap)
-        self.on_load_metadata.emit(metadata)
+        # Check mark shown when an image is tagged or updated
+        if pulse_progress is not None:
+            painter.setOpacity(1 - pulse_progress**2)
+            painter.drawPixmap(thumbnail_rect.topLeft(), self.check_icon)
+        painter.restore()
+
+    @property
+    def check_icon(self) -> QPixmap:
+        if self._check_icon is None:
+            self._check_icon = fa_icon('fa5s.check', secondary=True).pixmap(self.thumbnail_size)
+        return self._check_icon
+
+    def _paint_metadata_icons(self, painter: QPainter, rect: QRect, metadata: MetaMetadata):
+        icons_rect = QRect(
+            rect.left() + 4,
+            rect.bottom() - ICON_SIZE - 6,
+            len(self.METADATA_ICONS) * (ICON_SIZE + 4) + 4,
+            ICON_SIZE + 4,
+        )
+        painter.fillRect(icons_rect, QColor(0, 0, 0, 128))
+        for i, (icon_str, is_enabled) in enumerate(self.METADATA_ICONS):
+            painter.drawPixmap(
+                icons_rect.left() + 4 + i * (ICON_SIZE + 4),
+                icons_rect.top() + 2,
+                self._get_icon(icon_str, is_enabled(metadata)),
+            )
+
+    def _get_icon(self, icon_str: str, enabled: bool) -> QPixmap:
+        if (icon_str, enabled) not in self._icons:
+            self._icons[(icon_str, enabled)] = fa_icon(icon_str, secondary=True).pixmap(
+                ICON_SIZE, ICON_SIZE, mode=QIcon.Mode.Normal if enabled else QIcon.Mode.Disabled
+            )
+        return self._icons[(icon_str, enabled)]
 
 
 class ThumbnailContextMenu(QMenu):
     """Context menu for local image thumbnails"""
 
+    on_copy = Signal(str)  #: Tags were copied to the clipboard
+    on_remove = Signal(Path)  #: Request for the image to be removed from the gallery
     on_select_taxon = Signal(int)  #: A taxon was selected from context menu
     on_select_observation = Signal(int)  #: An observation was selected from context menu
 
-    def refresh_actions(self, thumbnail_card: ThumbnailCard):
+    def refresh_actions(self, image: GalleryImage):
         """Update menu actions based on the available metadata"""
         self.clear()
-        meta = thumbnail_card.metadata
+        meta = image.metadata
+        assert meta is not None
 
         self._add_action(
-            parent=thumbnail_card,
             icon='fa5s.spider',
             text='View Taxon',
             tooltip=f'View taxon {meta.taxon_id} in naturtag',
@@ -331,7 +689,6 @@ class ThumbnailContextMenu(QMenu):
             callback=lambda: self.on_select_taxon.emit(meta.taxon_id),
         )
         self._add_action(
-            parent=thumbnail_card,
             icon='fa5s.spider',
             text='View Taxon on iNat',
             tooltip=f'View taxon {meta.taxon_id} on inaturalist.org',
@@ -339,7 +696,6 @@ class ThumbnailContextMenu(QMenu):
             callback=lambda: webbrowser.open(meta.taxon_url),
         )
         self._add_action(
-            parent=thumbnail_card,
             icon='fa.binoculars',
             text='View Observation',
             tooltip=f'View observation {meta.observation_id} in naturtag',
@@ -347,7 +703,6 @@ class ThumbnailContextMenu(QMenu):
             callback=lambda: self.on_select_observation.emit(meta.observation_id),
         )
         self._add_action(
-            parent=thumbnail_card,
             icon='fa.binoculars',
             text='View Observation on iNat',
             tooltip=f'View observation {meta.observation_id} on inaturalist.org',
@@ -355,38 +710,43 @@ class ThumbnailContextMenu(QMenu):
             callback=lambda: webbrowser.open(meta.observation_url),
         )
         self._add_action(
-            parent=thumbnail_card,
             icon='fa5.copy',
             text='Copy Flickr tags',
             tooltip='Copy Flickr-compatible taxon tags to clipboard',
             enabled=meta.has_taxon,
-            callback=thumbnail_card.copy_flickr_tags,
+            callback=lambda: self.copy_flickr_tags(meta),
         )
         self._add_action(
-            parent=thumbnail_card,
             icon='fa5s.folder-open',
             text='Open containing folder',
-            tooltip=f'Open containing folder: {thumbnail_card.image_path.parent}',
-            callback=thumbnail_card.open_directory,
+            tooltip=f'Open containing folder: {image.image_path.parent}',
+            callback=lambda: QDesktopServices.openUrl(QUrl(image.image_path.parent.as_uri())),
         )
         self._add_action(
-            parent=thumbnail_card,
             icon='fa.remove',
             text='Remove image',
             tooltip='Remove this image from the selection',
-            callback=thumbnail_card.remove,
+            callback=lambda: self.on_remove.emit(image.image_path),
+        )
+
+    def copy_flickr_tags(self, metadata: MetaMetadata):
+        QApplication.clipboard().setText(metadata.keyword_meta.flickr_tags)
+        id_str = (
+            f'observation {metadata.observation_id}'
+            if metadata.has_observation
+            else f'taxon {metadata.taxon_id}'
         )
+        self.on_copy.emit(f'Tags for {id_str} copied to clipboard')
 
     def _add_action(
         self,
-        parent: QWidget,
         icon: str,
         text: str,
         tooltip: str,
         enabled: bool = True,
         callback: Callable = None,
     ):
-        action = QAction(fa_icon(icon), text, parent)
+        action = QAction(fa_icon(icon), text, self)
         action.setStatusTip(tooltip)
         action.setEnabled(enabled)
         if callback:
@@ -394,33 +754,24 @@ class ThumbnailContextMenu(QMenu):
         self.addAction(action)
 
 
-class ThumbnailMetaIcons(QLabel):
-    """Icons overlaid on top of a thumbnail to indicate what types of metadata are available"""
-
-    def __init__(self, parent: ThumbnailCard):
-        super().__init__(parent)
-        img_size = SIZE_DEFAULT
-
-        self.icon_layout = HorizontalLayout(self)
-        self.icon_layout.setAlignment(Qt.AlignLeft)
-        self.icon_layout.setContentsMargins(0, 0, 0, 0)
-        self.setGeometry(9, img_size[0] - 11, 130, 20)
-
-        self.taxon_icon = FAIcon('mdi.bird', secondary=True, size=20)
-        self.observation_icon = FAIcon('fa.binoculars', secondary=True, size=20)
-        self.geo_icon = FAIcon('mdi.map-marker', secondary=True, size=20)
-        self.tag_icon = FAIcon('fa.tags', secondary=True, size=20)
-        self.sidecar_icon = FAIcon('mdi.xml', secondary=True, size=20)
-        self.icon_layout.addWidget(self.taxon_icon)
-        self.icon_layout.addWidget(self.observation_icon)
-        self.icon_layout.addWidget(self.geo_icon)
-        self.icon_layout.addWidget(self.tag_icon)
-        self.icon_layout.addWidget(self.sidecar_icon)
-
-    def refresh_icons(self, metadata: MetaMetadata):
-        """Update icons based on the available metadata"""
-        self.taxon_icon.set_enabled(metadata.has_taxon)
-        self.observation_icon.set_enabled(metadata.has_observation)
-        self.geo_icon.set_enabled(metadata.has_coordinates)
-        self.tag_icon.set_enabled(metadata.has_any_tags)
-        self.sidecar_icon.set_enabled(metadata.has_sidecar)
+def _load_image(
+    image_path: Path, size: Dimensions, load_metadata: bool = True
+) -> tuple[Path, QImage, Optional[MetaMetadata]]:
+    """All I/O for loading an image preview (reading metadata, generating thumbnail), to be run
+    from a separate thread
+    """
+    metadata = None
+    if load_metadata:
+        # Only read the metadata needed for thumbnail icons; the rest will be loaded on demand
+        metadata = MetaMetadata(image_path, lazy=True)
+        metadata.inaturalist_ids
+        metadata.coordinates
+        metadata.close()
+    return image_path, get_thumbnail(image_path, size) or QImage(), metadata
+
+
+def _get_mtime(path: Path) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
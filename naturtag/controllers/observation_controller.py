@@ -1,10 +1,13 @@
+from datetime import datetime
 from logging import getLogger
 from typing import Iterable, List
 
 from pyinaturalist import Observation
 from PySide6.QtCore import Qt, QThread, QTimer, Signal, Slot
 
+from naturtag.app.threadpool import get_cancel_token
 from naturtag.client import INAT_CLIENT
+from naturtag.constants import OBSERVATION_PAGE_SIZE
 from naturtag.controllers import BaseController, ObservationInfoSection
 from naturtag.widgets import HorizontalLayout, ObservationInfoCard, ObservationList, VerticalLayout
 
@@ -14,6 +17,7 @@ logger = getLogger(__name__)
 class ObservationController(BaseController):
 
     on_select = Signal(Observation)  #: An observation was selected
+    on_sync_progress = Signal(int)  #: A page of user observations was synced (with its last ID)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -30,6 +34,11 @@ class ObservationController(BaseController):
 
         # User observations
         self.user_observations = ObservationList(self.threadpool)
+        self.user_observations.on_load_more.connect(self.load_more_observations)
+        self.last_observation: Observation = None  # Last loaded user observation
+        self.all_loaded = False  # All user observations have been loaded
+        self.loading_page = False
+        self.on_sync_progress.connect(self.save_sync_progress)
         user_obs_group_box = self.add_group(
             'My Observations',
             self.root,
@@ -69,26 +78,100 @@ class ObservationController(BaseController):
         logger.debug(f'Loaded observation {observation.id}')
 
     def load_user_observations(self):
-        logger.info('Fetching user observations')
+        """Show saved user observations, then sync new and updated observations in the background,
+        and show them when complete
+        """
+        if not self.settings.username:
+            return
+        logger.info('Loading user observations')
         future = self.threadpool.schedule(self.get_user_observations, priority=QThread.LowPriority)
         future.on_result.connect(self.display_user_observations)
 
-    # TODO: Paginate results
-    def get_user_observations(self) -> List[Observation]:
-        if not self.settings.username:
-            return []
-        observations = INAT_CLIENT.observations.get_user_observations(
-            username=self.settings.username,
+        sync_start = datetime.utcnow()
+        future = self.threadpool.schedule(
+            self.sync_user_observations, priority=QThread.LowPriority, group='obs_sync'
+        )
+        future.on_result.connect(lambda n_saved: self.on_sync_complete(n_saved, sync_start))
+
+    def get_user_observations(self, after: Observation = None) -> List[Observation]:
+        """Get a page of user observations from the database"""
+        return INAT_CLIENT.observations.get_user_observations(
+            self.settings.username, limit=OBSERVATION_PAGE_SIZE, after=after
+        )
+
+    def load_more_observations(self):
+        """Load the next page of user observations, if there are any more"""
+        if self.loading_page or self.all_loaded or not self.last_observation:
+            return
+        self.loading_page = True
+        after = self.last_observation
+        future = self.threadpool.schedule(self.get_user_observations, group='obs_page', after=after)
+        future.on_result.connect(lambda obs: self.append_user_observations(obs, after))
+        future.on_error.connect(lambda _: self._on_page_failed(after))
+        future.on_cancel.connect(lambda: self._on_page_failed(after))
+
+    def _on_page_failed(self, after: Observation):
+        if after is self.last_observation:
+            self.loading_page = False
+
+    def sync_user_observations(self) -> int:
+        """Fetch new and updated user observations, resuming a previous sync if it was interrupted.
+        Progress is sent to the main thread after each page, to be saved to settings.
+        """
+        token = get_cancel_token()
+        if self.settings.obs_sync_id_above:
+            logger.info(f'Resuming observation sync from ID {self.settings.obs_sync_id_above}')
+
+        def checkpoint(id_above: int):
+            self.on_sync_progress.emit(id_above)
+            token.raise_if_cancelled()
+
+        n_saved = INAT_CLIENT.observations.sync_user_observations(
+            self.settings.username,
             updated_since=self.settings.last_obs_check,
-            limit=50,
+            id_above=self.settings.obs_sync_id_above,
+            on_checkpoint=checkpoint,
         )
-        self.settings.set_obs_checkpoint()
-        return observations
+        logger.info(f'{n_saved} new or updated observations saved')
+        return n_saved
+
+    @Slot(int)
+    def save_sync_progress(self, id_above: int):
+        """Save progress of an incomplete sync, so it can be resumed if interrupted"""
+        self.settings.set_obs_sync_progress(id_above)
+
+    def on_sync_complete(self, n_saved: int, sync_start: datetime):
+        """Mark the sync as complete, and reload user observations if any were added or updated"""
+        self.settings.set_obs_checkpoint(sync_start)
+        if n_saved:
+            future = self.threadpool.schedule(self.get_user_observations)
+            future.on_result.connect(self.display_user_observations)
 
     @Slot(list)
     def display_user_observations(self, observations: List[Observation]):
+        """Replace displayed user observations with the first page"""
+        self.threadpool.cancel(group='obs_page')
         self.user_observations.set_observations(observations)
         self.bind_selection(self.user_observations.cards)
+        self.last_observation = None
+        self._update_page_state(observations)
+
+    def append_user_observations(self, observations: List[Observation], after: Observation):
+        """Add the next page of user observations to the end of the list. Results are ignored if
+        the list has changed since the page was requested (e.g., a finished page job delivered
+        after the list was reloaded).
+        """
+        if after is not self.last_observation:
+            logger.debug('Discarding stale page of user observations')
+            return
+        self.bind_selection(self.user_observations.add_observations(observations))
+        self._update_page_state(observations)
+
+    def _update_page_state(self, observations: List[Observation]):
+        self.loading_page = False
+        self.all_loaded = len(observations) < OBSERVATION_PAGE_SIZE
+        if observations:
+            self.last_observation = observations[-1]
 
     def bind_selection(self, obs_cards: Iterable[ObservationInfoCard]):
         """Connect click signal from each observation card"""
@@ -98,7 +98,7 @@ class ObservationInfoSection(HorizontalLayout):
         button_layout.addWidget(self.link_button)
 
         # Fullscreen image viewer
-        self.image_window = ObservationImageWindow()
+        self.image_window = ObservationImageWindow(self.threadpool)
         self.image.on_click.connect(self.image_window.display_observation_fullscreen)
 
     def load(self, obs: Observation):
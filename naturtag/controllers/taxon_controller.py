@@ -7,7 +7,7 @@ from PySide6.QtWidgets import QTabWidget, QWidget
 
 from naturtag.app.style import fa_icon
 from naturtag.app.threadpool import ThreadPool
-from naturtag.client import INAT_CLIENT
+from naturtag.client import IMG_SESSION, INAT_CLIENT
 from naturtag.constants import MAX_DISPLAY_OBSERVED
 from naturtag.controllers import BaseController, TaxonInfoSection, TaxonomySection, TaxonSearch
 from naturtag.settings import Settings, UserTaxa
@@ -28,6 +28,7 @@ class TaxonController(BaseController):
         self.root = HorizontalLayout(self)
         self.root.setAlignment(Qt.AlignLeft)
         self.selected_taxon: Taxon = None
+        self._requested_taxon_id: int = None  # Most recently requested taxon, if still loading
 
         # Search inputs
         self.search = TaxonSearch(self.settings)
@@ -52,6 +53,7 @@ class TaxonController(BaseController):
         taxon_layout.addLayout(self.taxon_info)
         taxon_layout.addLayout(self.taxonomy)
         self.root.addLayout(taxon_layout)
+        self.prefetcher = TaxonPrefetcher(self.settings, self.threadpool)
 
         # Navigation keyboard shortcuts
         self.add_shortcut('Alt+Left', self.taxon_info.prev)
@@ -69,24 +71,33 @@ class TaxonController(BaseController):
         if self.selected_taxon and self.selected_taxon.id == taxon_id:
             return
 
-        # Fetch taxon record
+        # Fetch taxon record, and cancel any unfinished jobs for the previously selected taxon
         logger.info(f'Selecting taxon {taxon_id}')
         if self.tabs._init_complete:
-            self.threadpool.cancel()
+            self.threadpool.cancel(group='taxon')
+            self.prefetcher.cancel()
+        self._requested_taxon_id = taxon_id
         future = self.threadpool.schedule(
-            lambda: INAT_CLIENT.taxa(taxon_id), priority=QThread.HighPriority
+            lambda: INAT_CLIENT.taxa(taxon_id), priority=QThread.HighPriority, group='taxon'
         )
-        future.on_result.connect(lambda taxon: self.display_taxon(taxon))
+        future.on_result.connect(lambda taxon: self._on_taxon_loaded(taxon_id, taxon))
+
+    def _on_taxon_loaded(self, taxon_id: int, taxon: Taxon):
+        """Display a loaded taxon, unless a different taxon has been requested since then"""
+        if taxon_id == self._requested_taxon_id:
+            self.display_taxon(taxon)
 
     @Slot(Taxon)
     def display_taxon(self, taxon: Taxon, notify: bool = True):
         self.selected_taxon = taxon
+        self._requested_taxon_id = None
         if notify:
             self.on_select.emit(taxon)
         self.taxon_info.load(taxon)
         self.taxonomy.load(taxon)
         self.bind_selection(self.taxonomy.ancestors_list.cards)
         self.bind_selection(self.taxonomy.children_list.cards)
+        self.prefetcher.prefetch(taxon)
         logger.debug(f'Loaded taxon {taxon.id}')
 
     def set_search_results(self, taxa: list[Taxon]):
@@ -103,6 +114,57 @@ class TaxonController(BaseController):
             taxon_card.on_click.connect(self.select_taxon)
 
 
+class TaxonPrefetcher:
+    """Loads taxa that are likely to be selected next (the parent and first few children of the
+    selected taxon) in the background, so navigating to them doesn't need to wait for the API.
+    Taxon records are saved to the local database, and their default photos are downloaded and
+    decoded.
+
+    Jobs run at low priority, and are cancelled whenever a different taxon is selected.
+    """
+
+    def __init__(self, settings: Settings, threadpool: ThreadPool):
+        self.settings = settings
+        self.threadpool = threadpool
+
+    def prefetch(self, taxon: Taxon):
+        """Start loading taxa related to the given taxon"""
+        self.cancel()
+        if not (max_children := self.settings.prefetch_taxa):
+            return
+        taxon_ids = [t.id for t in (taxon.children or [])[:max_children]]
+        if taxon.parent_id:
+            taxon_ids.insert(0, taxon.parent_id)
+        if not taxon_ids:
+            return
+
+        logger.debug(f'Prefetching {len(taxon_ids)} taxa related to taxon {taxon.id}')
+        future = self.threadpool.schedule(
+            lambda: INAT_CLIENT.taxa.from_ids(*taxon_ids).all(),
+            priority=QThread.LowPriority,
+            group='prefetch',
+        )
+        future.on_result.connect(self.prefetch_photos)
+
+    def prefetch_photos(self, taxa: list[Taxon]):
+        """Download and decode default photos for prefetched taxa"""
+        for taxon in taxa:
+            if not taxon.default_photo:
+                continue
+            self.threadpool.schedule(
+                IMG_SESSION.get_qimage,
+                priority=QThread.LowPriority,
+                group='prefetch',
+                wait_for=IMG_SESSION.prefetch_image(taxon.default_photo, size='medium'),
+                photo=taxon.default_photo,
+                size='medium',
+            )
+
+    def cancel(self):
+        """Cancel any unfinished prefetch jobs"""
+        self.threadpool.cancel(group='prefetch')
+
+
 class TaxonTabs(QTabWidget):
     """Tabbed view for search results and user taxa"""
 
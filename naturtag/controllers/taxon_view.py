@@ -88,7 +88,7 @@ class TaxonInfoSection(HorizontalLayout):
         button_layout.addWidget(self.link_button)
 
         # Fullscreen image viewer
-        self.image_window = TaxonImageWindow()
+        self.image_window = TaxonImageWindow(self.threadpool)
         self.image.on_click.connect(self.image_window.display_taxon_fullscreen)
 
     def load(self, taxon: Taxon):
@@ -115,6 +115,7 @@ class TaxonInfoSection(HorizontalLayout):
             self.threadpool,
             photo=taxon.default_photo,
             priority=QThread.HighPriority,
+            group='taxon',
         )
         self._update_nav_buttons()
 
@@ -124,7 +125,7 @@ class TaxonInfoSection(HorizontalLayout):
             thumb = TaxonPhoto(taxon=taxon, idx=i + 1, rounded=True)
             thumb.setFixedSize(*SIZE_SM)
             thumb.on_click.connect(self.image_window.display_taxon_fullscreen)
-            thumb.set_pixmap_async(self.threadpool, photo=photo, size='thumbnail')
+            thumb.set_pixmap_async(self.threadpool, photo=photo, size='thumbnail', group='taxon')
             self.thumbnails.addWidget(thumb)
 
     def prev(self):
@@ -171,13 +172,13 @@ class TaxonomySection(HorizontalLayout):
         self.ancestors_group = self.add_group(
             'Ancestors', min_width=400, max_width=500, policy_min_height=False
         )
-        self.ancestors_list = TaxonList(threadpool, user_taxa)
+        self.ancestors_list = TaxonList(threadpool, user_taxa, group='taxon')
         self.ancestors_group.addWidget(self.ancestors_list.scroller)
 
         self.children_group = self.add_group(
             'Children', min_width=400, max_width=500, policy_min_height=False
         )
-        self.children_list = TaxonList(threadpool, user_taxa)
+        self.children_list = TaxonList(threadpool, user_taxa, group='taxon')
         self.children_group.addWidget(self.children_list.scroller)
 
     def load(self, taxon: Taxon):
@@ -2,14 +2,17 @@
 # flake8: noqa: F401
 # isort:skip_file
 
-from naturtag.metadata.image_metadata import ImageMetadata
+from naturtag.metadata.metadata_index import METADATA_INDEX, IndexRecord, MetadataIndex
+from naturtag.metadata.image_metadata import ImageMetadata, MetadataSession
 from naturtag.metadata.gps_metadata import *
 from naturtag.metadata.keyword_metadata import KeywordMetadata
 from naturtag.metadata.meta_metadata import MetaMetadata
 from naturtag.metadata.inat_metadata import (
     get_ids_from_url,
     get_inat_metadata,
+    iter_tag_images,
     _refresh_tags,
+    refresh_metadata,
     refresh_tags,
     strip_url,
     tag_images,
@@ -1,11 +1,14 @@
 import re
+from collections import OrderedDict
+from contextlib import contextmanager
 from logging import getLogger
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, Optional
 
 from pyexiv2 import Image
 
-from naturtag.constants import EXIF_HIDE_PREFIXES, PathOrStr
+from naturtag.constants import EXIF_HIDE_PREFIXES, METADATA_FORMATS, PathOrStr
+from naturtag.metadata.metadata_index import METADATA_INDEX
 
 # Minimal XML content needed to create a new XMP file; exiv2 can handle the rest
 NEW_XMP_CONTENTS = """
@@ -20,19 +23,73 @@ logger = getLogger().getChild(__name__)
 
 
 class ImageMetadata:
-    """Class for reading & writing basic image metadata"""
+    """Class for reading & writing basic image metadata
 
-    def __init__(self, image_path: PathOrStr = ''):
+    Args:
+        image_path: Path to an image or sidecar file
+        lazy: Read each metadata format only when it is first accessed, instead of all at once.
+            Files are only opened and parsed once, and kept open until all formats have been read
+            or :py:meth:`close` is called.
+        session: Session used to keep files open between reads and writes
+    """
+
+    def __init__(
+        self, image_path: PathOrStr = '', lazy: bool = False, session: 'MetadataSession' = None
+    ):
         self.image_path = Path(image_path)
-        self.exif, self.iptc, self.xmp = self.read_metadata()
+        self.session = session
+        # Files kept open between lazy reads, if there's no external session
+        self._lazy_session = MetadataSession(max_open=2) if lazy and not session else None
+        self._exif: dict[str, Any] = None  # type: ignore
+        self._iptc: dict[str, Any] = None  # type: ignore
+        self._xmp: dict[str, Any] = None  # type: ignore
+        self._modified = False
+        # Tags as originally read from each source file, used to write only changed tags
+        self._loaded_tags: dict[str, dict[str, dict[str, Any]]] = {'image': {}, 'sidecar': {}}
+        if not lazy:
+            self._exif, self._iptc, self._xmp = self.read_metadata()
+
+    @property
+    def exif(self) -> dict[str, Any]:
+        return self._get_format('exif')
+
+    @exif.setter
+    def exif(self, value: dict[str, Any]):
+        self._exif = value
+        self._modified = True
+
+    @property
+    def iptc(self) -> dict[str, Any]:
+        return self._get_format('iptc')
+
+    @iptc.setter
+    def iptc(self, value: dict[str, Any]):
+        self._iptc = value
+        self._modified = True
+
+    @property
+    def xmp(self) -> dict[str, Any]:
+        return self._get_format('xmp')
+
+    @xmp.setter
+    def xmp(self, value: dict[str, Any]):
+        self._xmp = value
+        self._modified = True
+
+    @property
+    def is_loaded(self) -> bool:
+        """Indicates that all metadata formats have been read"""
+        return all(getattr(self, f'_{fmt}') is not None for fmt in METADATA_FORMATS)
 
     def read_metadata(self):
         """Read all formats of metadata from image + sidecar file"""
         if not self.image_path.is_file():
             return {}, {}, {}
         exif, iptc, xmp = self._safe_read_metadata(self.image_path)
+        self._set_loaded_tags('image', METADATA_FORMATS, (exif, iptc, xmp))
         if self.has_sidecar:
             s_exif, s_iptc, s_xmp = self._safe_read_metadata(self.sidecar_path)
+            self._set_loaded_tags('sidecar', METADATA_FORMATS, (s_exif, s_iptc, s_xmp))
             exif.update(s_exif)
             iptc.update(s_iptc)
             xmp.update(s_xmp)
@@ -43,36 +100,71 @@ class ImageMetadata:
 
         return exif, iptc, xmp
 
-    def _safe_read_metadata(self, path, encoding='utf-8'):
+    def close(self):
+        """Close any files kept open for lazy reads. They will be reopened if needed."""
+        if self._lazy_session:
+            self._lazy_session.close()
+
+    def _get_format(self, fmt: str) -> dict[str, Any]:
+        """Get a single metadata format, and read it first if it hasn't been loaded yet"""
+        if getattr(self, f'_{fmt}') is None:
+            setattr(self, f'_{fmt}', self._read_format(fmt))
+            if self.is_loaded:
+                self.close()
+                self._lazy_session = None
+            self._on_read_format(fmt)
+        return getattr(self, f'_{fmt}')
+
+    def _read_format(self, fmt: str) -> dict[str, Any]:
+        """Read a single metadata format from image + sidecar file"""
+        if not self.image_path.is_file():
+            return {}
+        metadata = self._safe_read_metadata(self.image_path, formats=[fmt])[0]
+        self._set_loaded_tags('image', [fmt], [metadata])
+        if self.has_sidecar:
+            sidecar_metadata = self._safe_read_metadata(self.sidecar_path, formats=[fmt])[0]
+            self._set_loaded_tags('sidecar', [fmt], [sidecar_metadata])
+            metadata.update(sidecar_metadata)
+        logger.debug(f'{fmt.upper()} tags found in {self.image_path}: {len(metadata)}')
+        return metadata
+
+    def _set_loaded_tags(self, source: str, formats: Iterable[str], tags: Iterable[dict]):
+        """Keep a copy of tags as read from either the image or sidecar file"""
+        for fmt, fmt_tags in zip(formats, tags):
+            self._loaded_tags[source][fmt] = dict(fmt_tags)
+
+    def _on_read_format(self, fmt: str):
+        """Called after a metadata format has been lazy-loaded"""
+
+    def _safe_read_metadata(self, path, formats=METADATA_FORMATS):
         """Attempt to read metadata, with error handling"""
-        logger.debug(f'Reading metadata from: {path} ({encoding})')
-        img = self._read_exiv2_image(path)
-        if not img:
-            return {}, {}, {}
+        logger.debug(f'Reading metadata from: {path}')
+        with self._open_image(path) as img:
+            if not img:
+                return tuple({} for _ in formats)
 
-        try:
-            exif = img.read_exif(encoding=encoding)
-            iptc = img.read_iptc(encoding=encoding)
-            xmp = img.read_xmp(encoding=encoding)
-        except UnicodeDecodeError:
-            logger.warning(f'Non-UTF-encoded metadata in {path}')
-            return self._safe_read_metadata(path, encoding='unicode_escape')
-        finally:
-            img.close()
+            # Metadata has already been parsed, so we can retry with a different encoding
+            try:
+                return tuple(getattr(img, f'read_{fmt}')(encoding='utf-8') for fmt in formats)
+            except UnicodeDecodeError:
+                logger.warning(f'Non-UTF-encoded metadata in {path}')
+                return tuple(
+                    getattr(img, f'read_{fmt}')(encoding='unicode_escape') for fmt in formats
+                )
 
-        return exif, iptc, xmp
+    @contextmanager
+    def _open_image(self, path: PathOrStr) -> Iterator[Optional[Image]]:
+        """Open an image, or get an already open image from the current session"""
+        if session := self.session or self._lazy_session:
+            yield session.open(path)
+            return
 
-    @staticmethod
-    def _read_exiv2_image(path: PathOrStr) -> Image:
-        """
-        Read an image with basic error handling. Note: Exiv2 ``RuntimeError`` usually means
-        corrupted metadata. See: https://dev.exiv2.org/issues/637#note-1
-        """
+        img = _read_exiv2_image(path)
         try:
-            return Image(str(path))
-        except RuntimeError:
-            logger.exception(f'Failed to read corrupted metadata from {path}')
-            return None
+            yield img
+        finally:
+            if img:
+                img.close()
 
     @property
     def sidecar_path(self) -> Path:
@@ -104,7 +196,7 @@ class ImageMetadata:
     @property
     def simple_exif(self) -> dict[str, str]:
         """Convert all EXIF tags with list values into strings"""
-        return {k: ','.join(v) if isinstance(v, list) else v for k, v in self.exif.items()}
+        return _simplify_exif(self.exif)
 
     def update(self, new_metadata: dict):
         """Update arbitrary EXIF, IPTC, and/or XMP metadata"""
@@ -117,6 +209,7 @@ class ImageMetadata:
         self.exif.update(_filter_tags('Exif.'))
         self.iptc.update(_filter_tags('Iptc.'))
         self.xmp.update(_filter_tags('Xmp.'))
+        self._modified = True
 
     def write(
         self,
@@ -124,55 +217,177 @@ class ImageMetadata:
         write_iptc: bool = True,
         write_xmp: bool = True,
         write_sidecar: bool = True,
-    ):
-        """Write current metadata to image and sidecar"""
+    ) -> bool:
+        """Write current metadata to image and sidecar. Only tags that have changed since they were
+        read will be written, and files with no changes will not be opened.
+
+        Returns:
+            Whether any changes were written
+        """
         fixed_xmp = self._fix_xmp()
 
         # Write embedded metadata
-        if any([write_exif, write_iptc, write_xmp]):
-            logger.info(f'Writing metadata to {self.image_path}')
-            img = self._read_exiv2_image(self.image_path)
+        new_tags = {}
         if write_exif:
-            img.modify_exif(self.simple_exif)
+            new_tags['exif'] = _simplify_exif(self.exif)
         if write_iptc:
-            img.modify_iptc(self.iptc)
+            new_tags['iptc'] = self.iptc
         if write_xmp:
-            img.modify_xmp(fixed_xmp)
-        if any([write_exif, write_iptc, write_xmp]):
-            img.close()
+            new_tags['xmp'] = fixed_xmp
+        image_changed = self._write_changes(self.image_path, 'image', new_tags)
+
+        # Write sidecar metadata
+        sidecar_changed = False
         if write_sidecar and not self.is_sidecar:
-            self._write_sidecar(fixed_xmp)
+            sidecar_changed = self._write_sidecar(fixed_xmp)
+        if image_changed or sidecar_changed:
+            METADATA_INDEX.delete(self.image_path)
+        self.close()
+        return image_changed or sidecar_changed
 
-    def _write_sidecar(self, fixed_xmp: dict):
+    def _write_sidecar(self, fixed_xmp: dict) -> bool:
         # Create new sidecar file stub, if needed
         if not self.sidecar_path.is_file():
             with open(self.sidecar_path, 'w') as f:
                 f.write(NEW_XMP_CONTENTS.strip())
+            self._loaded_tags['sidecar'] = {}
+        return self._write_changes(self.sidecar_path, 'sidecar', {'xmp': fixed_xmp})
 
-        # Write sidecar metadata
-        logger.info(f'Writing metadata to {self.sidecar_path}')
-        sidecar_img = self._read_exiv2_image(self.sidecar_path)
-        sidecar_img.modify_xmp(fixed_xmp)
-        sidecar_img.close()
+    def _write_changes(self, path: Path, source: str, new_tags: dict[str, dict]) -> bool:
+        """Write any tags that differ from the tags originally read from the image or sidecar.
+
+        Returns:
+            Whether any changes were written
+        """
+        loaded_tags = self._loaded_tags[source]
+        changes = {
+            fmt: _get_changed_tags(loaded_tags.get(fmt, {}), tags, fmt)
+            for fmt, tags in new_tags.items()
+        }
+        changes = {fmt: fmt_changes for fmt, fmt_changes in changes.items() if fmt_changes}
+        if not changes:
+            logger.debug(f'No metadata changes to write to {path}')
+            return False
+
+        counts = ' | '.join([f'{fmt.upper()}: {len(v)}' for fmt, v in changes.items()])
+        logger.info(f'Writing metadata to {path} ({counts})')
+        with self._open_image(path) as img:
+            for fmt, fmt_changes in changes.items():
+                # Note: pyexiv2 may modify some values in place (e.g., encoding EXIF XP* tags)
+                getattr(img, f'modify_{fmt}')(dict(fmt_changes))
+
+        # Written tags are now the current state of the file
+        for fmt, fmt_changes in changes.items():
+            loaded_tags.setdefault(fmt, {}).update(fmt_changes)
+        return True
 
     def _fix_xmp(self):
         """Fix some invalid/incompatible XMP tags"""
-        for k, v in self.xmp.items():
-            # Flatten dict values, like {'lang="x-default"': value} -> value
-            if isinstance(v, dict):
-                self.xmp[k] = list(v.values())[0]
-
-            # exiv2 can't modify XMP Media Management History (or even write existing values??)
-            if k.startswith('Xmp.xmpMM.History'):
-                self.xmp[k] = None
-
-            # XMP won't accept both a single value and an array with the same key
-            # TODO: This fixes some edge cases, with errors like:
-            #   "XMP Toolkit error 102: Composite nodes can't have values"
-            # But in other cases, it causes a different error:
-            #   "XMP Toolkit error 102: Indexing applied to non-array"
-            # elif k.endswith(']') and (nonarray_key := ARRAY_IDX_PATTERN.sub('', k)) in self.xmp:
-            #     self.xmp[nonarray_key] = None
-
-        self.xmp = {k: v for k, v in self.xmp.items() if v is not None}
+        self.xmp = _fix_xmp_tags(self.xmp)
         return self.xmp
+
+
+class MetadataSession:
+    """Keeps image and sidecar files open, so each file only needs to be opened and parsed once
+    while reading and then writing its metadata. Files will be closed at the end of the session, or
+    when the max number of open files is reached (least recently used first).
+
+    Example:
+
+        >>> with MetadataSession() as session:
+        ...     metadata = MetaMetadata('image.jpg', session=session)
+        ...     metadata.update_keywords(['keyword'])
+        ...     metadata.write()
+    """
+
+    def __init__(self, max_open: int = 16):
+        self.max_open = max_open
+        self._images: OrderedDict[str, Optional[Image]] = OrderedDict()
+
+    def open(self, path: PathOrStr) -> Optional[Image]:
+        """Get an open image, or open it if not already open"""
+        key = str(path)
+        if key in self._images:
+            self._images.move_to_end(key)
+            return self._images[key]
+
+        while len(self._images) >= self.max_open:
+            _, img = self._images.popitem(last=False)
+            if img:
+                img.close()
+        img = self._images[key] = _read_exiv2_image(path)
+        return img
+
+    def close(self):
+        """Close all open images"""
+        for img in filter(None, self._images.values()):
+            img.close()
+        self._images.clear()
+
+    def __enter__(self) -> 'MetadataSession':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _read_exiv2_image(path: PathOrStr) -> Optional[Image]:
+    """
+    Read an image with basic error handling. Note: Exiv2 ``RuntimeError`` usually means
+    corrupted metadata. See: https://dev.exiv2.org/issues/637#note-1
+    """
+    try:
+        return Image(str(path))
+    except RuntimeError:
+        logger.exception(f'Failed to read corrupted metadata from {path}')
+        return None
+
+
+def _fix_xmp_tags(xmp: dict[str, Any]) -> dict[str, Any]:
+    """Fix some invalid/incompatible XMP tags"""
+    fixed_xmp = {}
+    for k, v in xmp.items():
+        # Flatten dict values, like {'lang="x-default"': value} -> value
+        if isinstance(v, dict):
+            v = list(v.values())[0]
+
+        # exiv2 can't modify XMP Media Management History (or even write existing values??)
+        if k.startswith('Xmp.xmpMM.History'):
+            v = None
+
+        # XMP won't accept both a single value and an array with the same key
+        # TODO: This fixes some edge cases, with errors like:
+        #   "XMP Toolkit error 102: Composite nodes can't have values"
+        # But in other cases, it causes a different error:
+        #   "XMP Toolkit error 102: Indexing applied to non-array"
+        # elif k.endswith(']') and (nonarray_key := ARRAY_IDX_PATTERN.sub('', k)) in xmp:
+        #     fixed_xmp[nonarray_key] = None
+
+        if v is not None:
+            fixed_xmp[k] = v
+    return fixed_xmp
+
+
+def _simplify_exif(exif: dict[str, Any]) -> dict[str, Any]:
+    """Convert all EXIF tags with list values into strings"""
+    return {k: ','.join(v) if isinstance(v, list) else v for k, v in exif.items()}
+
+
+def _get_changed_tags(old_tags: dict, new_tags: dict, fmt: str) -> dict[str, Any]:
+    """Get tags that have been added or modified, compared in the same form they will be written"""
+    if fmt == 'exif':
+        old_tags = _simplify_exif(old_tags)
+    elif fmt == 'xmp':
+        old_tags = _fix_xmp_tags(old_tags)
+    return {
+        k: v
+        for k, v in new_tags.items()
+        if _normalize_value(old_tags.get(k)) != _normalize_value(v)
+    }
+
+
+def _normalize_value(value: Any) -> Any:
+    """Convert a tag value to strings for comparison, with empty values treated as missing"""
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value if v not in (None, '')] or None
+    return str(value) if value not in (None, '') else None
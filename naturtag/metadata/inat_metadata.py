@@ -3,8 +3,10 @@
 # TODO: Get common names for specified locale (requires using different endpoints)
 # TODO: Handle observation with no taxon ID?
 # TODO: Include eol:dataObject info (metadata for an individual observation photo)
+from collections import defaultdict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from logging import getLogger
-from typing import Iterable, Optional
+from typing import Iterable, Iterator, Optional, Union
 from urllib.parse import urlparse
 
 from pyinaturalist import Observation, Taxon
@@ -12,11 +14,12 @@ from pyinaturalist_convert import to_dwc
 
 from naturtag.client import INAT_CLIENT
 from naturtag.constants import COMMON_NAME_IGNORE_TERMS, COMMON_RANKS, IntTuple, PathOrStr
-from naturtag.metadata import MetaMetadata
+from naturtag.metadata import MetadataSession, MetaMetadata
 from naturtag.settings import Settings
-from naturtag.utils.image_glob import get_valid_image_paths
+from naturtag.utils.image_glob import iter_valid_image_paths
 
 DWC_NAMESPACES = ['dcterms', 'dwc']
+MAX_PENDING_PER_WORKER = 4  # Max number of images queued per worker process at any given time
 logger = getLogger().getChild(__name__)
 
 
@@ -27,6 +30,7 @@ def tag_images(
     recursive: bool = False,
     include_sidecars: bool = False,
     settings: Settings = None,
+    jobs: int = 1,
 ) -> list[MetaMetadata]:
     """
     Get taxonomy tags from an iNaturalist observation or taxon, and write them to local image
@@ -44,18 +48,23 @@ def tag_images(
         >>> # Glob patterns are also supported
         >>> tag_images(['~/observations/*.jpg'], taxon_id=1234)
 
+        >>> # Tag a large number of images using 8 worker processes
+        >>> tag_images(['~/observations/'], taxon_id=1234, recursive=True, jobs=8)
+
     Args:
         image_paths: Paths to images to tag
         observation_id: ID of an iNaturalist observation
         taxon_id: ID of an iNaturalist species or other taxon
         recursive: Recursively search subdirectories for valid image files
         include_sidecars: Allow loading a sidecar file without an associated image
-        settings: Settings for metadata types to generate
+        settings: Settings for metadata types to generate, and when to re-fetch saved records
+        jobs: Number of worker processes to use for reading and writing image metadata
 
     Returns:
         Updated image metadata for each image
     """
     settings = settings or Settings.read()
+    INAT_CLIENT.set_expiration(settings.observation_expiration, settings.taxon_expiration)
     inat_metadata = get_inat_metadata(
         observation_id=observation_id,
         taxon_id=taxon_id,
@@ -68,26 +77,89 @@ def tag_images(
     elif not image_paths:
         return [inat_metadata]
 
-    def _tag_image(
-        image_path,
-    ):
-        img_metadata = MetaMetadata(image_path).merge(inat_metadata)
+    image_paths = iter_valid_image_paths(
+        image_paths,
+        recursive=recursive,
+        include_sidecars=include_sidecars,
+    )
+    results = []
+    for image_path, result in iter_tag_images(image_paths, inat_metadata, settings, jobs=jobs):
+        if isinstance(result, Exception):
+            logger.error(f'Failed to tag {image_path}: {result!r}')
+        else:
+            results.append(result)
+    return results
+
+
+def iter_tag_images(
+    image_paths: Iterable[PathOrStr],
+    inat_metadata: MetaMetadata,
+    settings: Settings,
+    jobs: int = 1,
+) -> Iterator[tuple[PathOrStr, Union[MetaMetadata, Exception]]]:
+    """Write previously generated iNaturalist metadata to local images, optionally using a pool of
+    worker processes.
+
+    Results are yielded in the same order as the input paths, as soon as they are available. If an
+    image can't be tagged, its exception is yielded in place of its metadata.
+
+    Args:
+        image_paths: Paths to images to tag
+        inat_metadata: Metadata from :py:func:`get_inat_metadata`
+        settings: Settings for metadata types to write
+        jobs: Number of worker processes to use; if ``1``, images will be tagged in the current
+            process
+
+    Yields:
+        ``(image_path, metadata_or_exception)``
+    """
+    if jobs <= 1:
+        for image_path in image_paths:
+            try:
+                yield image_path, _tag_image(image_path, inat_metadata, settings)
+            except Exception as e:
+                yield image_path, e
+        return
+
+    # Only keep a limited number of images queued, so input paths can be consumed lazily and
+    # results can be returned while later images are still being processed
+    logger.info(f'Tagging images with {jobs} worker processes')
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending: deque[tuple[PathOrStr, Future]] = deque()
+        for image_path in image_paths:
+            future = executor.submit(_tag_image, image_path, inat_metadata, settings)
+            pending.append((image_path, future))
+            if len(pending) >= jobs * MAX_PENDING_PER_WORKER:
+                yield _get_future_result(*pending.popleft())
+        while pending:
+            yield _get_future_result(*pending.popleft())
+
+
+def _tag_image(
+    image_path: PathOrStr, inat_metadata: MetaMetadata, settings: Settings
+) -> MetaMetadata:
+    """Read, merge, and write metadata for a single image. This is a module-level function so it
+    can be sent to worker processes.
+    """
+    with MetadataSession() as session:
+        img_metadata = MetaMetadata(image_path, session=session).merge(inat_metadata)
         img_metadata.write(
             write_exif=settings.exif,
             write_iptc=settings.iptc,
             write_xmp=settings.xmp,
             write_sidecar=settings.sidecar,
         )
-        return img_metadata
-
-    return [
-        _tag_image(image_path)
-        for image_path in get_valid_image_paths(
-            image_paths,
-            recursive=recursive,
-            include_sidecars=include_sidecars,
-        )
-    ]
+    img_metadata.session = None
+    return img_metadata
+
+
+def _get_future_result(
+    image_path: PathOrStr, future: Future
+) -> tuple[PathOrStr, Union[MetaMetadata, Exception]]:
+    try:
+        return image_path, future.result()
+    except Exception as e:
+        return image_path, e
 
 
 def get_inat_metadata(
@@ -98,10 +170,10 @@ def get_inat_metadata(
     metadata: MetaMetadata = None,
 ) -> Optional[MetaMetadata]:
     """Create or update image metadata based on an iNaturalist observation and/or taxon"""
-    metadata = metadata or MetaMetadata()
     observation, taxon = None, None
 
-    # Get observation and/or taxon records
+    # Get observation and/or taxon records. With refresh=True, saved records are only re-fetched
+    # if they're older than the configured expiration time.
     if observation_id:
         observation = INAT_CLIENT.observations(observation_id, refresh=True)
         taxon_id = observation.taxon.id
@@ -113,12 +185,25 @@ def get_inat_metadata(
         return None
 
     # If there's a taxon only (no observation), check for any taxonomy changes
-    if (
-        not observation_id
-        and not taxon.is_active
-        and len(taxon.current_synonymous_taxon_ids or []) == 1
-    ):
-        taxon = INAT_CLIENT.taxa(taxon.current_synonymous_taxon_ids[0], refresh=True)
+    if not observation_id and (synonym_id := _get_synonym_id(taxon)):
+        taxon = INAT_CLIENT.taxa(synonym_id, refresh=True)
+
+    return _build_inat_metadata(
+        observation, taxon, observation_id, taxon_id, common_names, hierarchical, metadata
+    )
+
+
+def _build_inat_metadata(
+    observation: Optional[Observation],
+    taxon: Taxon,
+    observation_id: int = None,
+    taxon_id: int = None,
+    common_names: bool = False,
+    hierarchical: bool = False,
+    metadata: MetaMetadata = None,
+) -> MetaMetadata:
+    """Create or update image metadata from previously fetched observation and taxon records"""
+    metadata = metadata or MetaMetadata()
 
     # Get all specified keyword categories
     keywords = _get_taxonomy_keywords(taxon)
@@ -143,6 +228,15 @@ def get_inat_metadata(
     return metadata
 
 
+def _get_synonym_id(taxon: Taxon) -> Optional[int]:
+    """If a taxon is inactive and has been replaced by a single other taxon (1:1 change only),
+    get the ID of its replacement
+    """
+    if not taxon.is_active and len(taxon.current_synonymous_taxon_ids or []) == 1:
+        return taxon.current_synonymous_taxon_ids[0]
+    return None
+
+
 def _get_taxonomy_keywords(taxon: Taxon) -> list[str]:
     """Format a list of taxa into rank keywords"""
     return [_quote(f'taxonomy:{t.rank}={t.name}') for t in taxon.ancestors + [taxon]]
@@ -222,7 +316,7 @@ def refresh_tags(
     image_paths: Iterable[PathOrStr],
     recursive: bool = False,
     settings: Settings = None,
-):
+) -> list[MetaMetadata]:
     """Refresh metadata for previously tagged images
 
     Example:
@@ -234,35 +328,115 @@ def refresh_tags(
     Args:
         image_paths: Paths to images to tag
         recursive: Recursively search subdirectories for valid image files
-        settings: Settings for metadata types to generate
+        settings: Settings for metadata types to generate, and when to re-fetch saved records
+
+    Returns:
+        Updated image metadata for each previously tagged image
     """
-    for image_path in get_valid_image_paths(image_paths, recursive):
-        _refresh_tags(MetaMetadata(image_path), settings)
+    return refresh_metadata(
+        [MetaMetadata(image_path) for image_path in iter_valid_image_paths(image_paths, recursive)],
+        settings,
+    )
 
 
-def _refresh_tags(metadata: MetaMetadata, settings: Settings = None) -> MetaMetadata:
-    """Refresh existing metadata for a single image with latest observation and/or taxon data"""
-    if not metadata.has_observation and not metadata.has_taxon:
-        return metadata
+def refresh_metadata(
+    metadata_objs: Iterable[MetaMetadata], settings: Settings = None
+) -> list[MetaMetadata]:
+    """Refresh existing metadata for multiple images with latest observation and/or taxon data.
+
+    Records are fetched in bulk for all unique observation and taxon IDs, and metadata is generated
+    once per ID and then applied to each image that shares it.
+
+    Args:
+        metadata_objs: Metadata for previously tagged images
+        settings: Settings for metadata types to generate, and when to re-fetch saved records
 
-    logger.info(f'Refreshing tags for {metadata.image_path}')
+    Returns:
+        Updated image metadata for each previously tagged image
+    """
     settings = settings or Settings.read()
-    metadata = get_inat_metadata(  # type: ignore
-        observation_id=metadata.observation_id,
-        taxon_id=metadata.taxon_id,
-        common_names=settings.common_names,
-        hierarchical=settings.hierarchical,
-        metadata=metadata,
-    )
-    metadata.write(
-        write_exif=settings.exif,
-        write_iptc=settings.iptc,
-        write_xmp=settings.xmp,
-        write_sidecar=settings.sidecar,
+    INAT_CLIENT.set_expiration(settings.observation_expiration, settings.taxon_expiration)
+
+    # Group images by observation ID, or by taxon ID if there's no observation
+    grouped_metadata: dict[IntTuple, list[MetaMetadata]] = defaultdict(list)
+    for metadata in metadata_objs:
+        if metadata.has_observation:
+            grouped_metadata[(metadata.observation_id, None)].append(metadata)
+        elif metadata.has_taxon:
+            grouped_metadata[(None, metadata.taxon_id)].append(metadata)
+    if not grouped_metadata:
+        return []
+
+    # Fetch all observations, then all taxa (including observed taxa), then any taxonomy changes
+    observation_ids = {obs_id for obs_id, _ in grouped_metadata if obs_id}
+    observations = _get_observations_by_id(observation_ids)
+    taxon_ids = {taxon_id for _, taxon_id in grouped_metadata if taxon_id}
+    taxon_ids |= {obs.taxon.id for obs in observations.values() if obs.taxon}
+    taxa = _get_taxa_by_id(taxon_ids)
+    synonym_ids = {
+        taxon_id: _get_synonym_id(taxa[taxon_id])
+        for _, taxon_id in grouped_metadata
+        if taxon_id in taxa
+    }
+    taxa.update(_get_taxa_by_id(set(filter(None, synonym_ids.values())) - set(taxa)))
+    logger.info(
+        f'Refreshing tags for {sum(len(group) for group in grouped_metadata.values())} images '
+        f'({len(observations)} observations, {len(taxa)} taxa)'
     )
+
+    results = []
+    for (observation_id, taxon_id), group in grouped_metadata.items():
+        # Taxonomy changes are only followed for taxon-only groups (no observation)
+        observation = observations.get(observation_id) if observation_id else None
+        if observation_id:
+            taxon_id = observation.taxon.id if observation and observation.taxon else None
+            taxon = taxa.get(taxon_id)
+        else:
+            taxon = taxa.get(synonym_ids.get(taxon_id) or taxon_id)
+        if not taxon:
+            logger.warning(f'No taxon found: {taxon_id}')
+            continue
+
+        inat_metadata = _build_inat_metadata(
+            observation,
+            taxon,
+            observation_id,
+            taxon_id,
+            common_names=settings.common_names,
+            hierarchical=settings.hierarchical,
+        )
+        for metadata in group:
+            logger.debug(f'Refreshing tags for {metadata.image_path}')
+            metadata.merge(inat_metadata)
+            metadata.write(
+                write_exif=settings.exif,
+                write_iptc=settings.iptc,
+                write_xmp=settings.xmp,
+                write_sidecar=settings.sidecar,
+            )
+            results.append(metadata)
+    return results
+
+
+def _refresh_tags(metadata: MetaMetadata, settings: Settings = None) -> MetaMetadata:
+    """Refresh existing metadata for a single image with latest observation and/or taxon data"""
+    refresh_metadata([metadata], settings)
     return metadata
 
 
+def _get_observations_by_id(observation_ids: set[int]) -> dict[int, Observation]:
+    if not observation_ids:
+        return {}
+    observations = INAT_CLIENT.observations.from_ids(*observation_ids, refresh=True).all()
+    return {obs.id: obs for obs in observations}
+
+
+def _get_taxa_by_id(taxon_ids: set[int]) -> dict[int, Taxon]:
+    if not taxon_ids:
+        return {}
+    return {taxon.id: taxon for taxon in INAT_CLIENT.taxa.from_ids(*taxon_ids, refresh=True).all()}
+
+
 def strip_url(value: str) -> Optional[int]:
     """If a URL is provided containing an ID, return just the ID"""
     try:
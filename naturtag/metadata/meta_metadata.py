@@ -1,3 +1,4 @@
+import re
 from logging import getLogger
 from typing import Any, Optional
 
@@ -8,13 +9,16 @@ from naturtag.constants import (
     DATE_TAGS,
     HIER_KEYWORD_TAGS,
     KEYWORD_TAGS,
+    METADATA_FORMATS,
     OBSERVATION_KEYS,
     TAXON_KEYS,
     IntTuple,
     StrTuple,
 )
 from naturtag.metadata import (
+    METADATA_INDEX,
     ImageMetadata,
+    IndexRecord,
     KeywordMetadata,
     convert_dwc_coords,
     convert_exif_coords,
@@ -24,6 +28,7 @@ from naturtag.metadata import (
 )
 
 NULL_COORDS = (0, 0)
+NAMESPACE_PATTERN = re.compile(r'[:.]')
 logger = getLogger().getChild(__name__)
 
 
@@ -38,30 +43,103 @@ class MetaMetadata(ImageMetadata):
         >>> meta = MetaMetadata('/path/to/image.jpg')
         >>> print(meta.summary)
         >>> print(meta.to_observation())
+
+        >>> # Only read metadata as needed; e.g., to quickly check for an observation ID
+        >>> meta = MetaMetadata('/path/to/image.jpg', lazy=True)
+        >>> print(meta.observation_id)
     """
 
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+        self._index_record: Optional[IndexRecord] = None
+        self._saving_index = False
         # Define lazy-loaded properties
         self._coordinates = None
         self._inaturalist_ids = None
+        self._keyword_meta: KeywordMetadata = None  # type: ignore
         self._min_rank = None
         self._simplified = None
         self._summary = None
         self._observation: Observation = None
-        self.keyword_meta = None
+        super().__init__(*args, **kwargs)
+
+        # In lazy mode, metadata formats will only be read on demand unless already indexed. The
+        # index may contain only some formats, if the image was previously lazy-loaded.
+        if not self.is_loaded and (record := self._get_index_record()):
+            self._exif, self._iptc, self._xmp = self._load_index_record(record)
+        self._update_derived_properties(self._index_record)
+        if self.is_loaded and not self._index_record:
+            self._save_index_record()
+
+    def read_metadata(self):
+        """Read metadata from the local metadata index if the image hasn't changed since it was
+        last read; otherwise, read from image + sidecar file
+        """
+        if (record := self._get_index_record()) and record.is_complete:
+            return self._load_index_record(record)
+        self._index_record = None
+        return super().read_metadata()
+
+    def _load_index_record(self, record: IndexRecord):
+        """Load tags from an index record; any formats not in the record will be ``None``"""
+        self._set_loaded_tags('image', record.image_tags.keys(), record.image_tags.values())
+        self._set_loaded_tags('sidecar', record.sidecar_tags.keys(), record.sidecar_tags.values())
+        formats = record.formats
+        return tuple(getattr(record, fmt) if fmt in formats else None for fmt in METADATA_FORMATS)
+
+    def _get_index_record(self) -> Optional[IndexRecord]:
+        if self.image_path.is_file():
+            sidecar_path = self.sidecar_path if self.has_sidecar else None
+            self._index_record = METADATA_INDEX.get(self.image_path, sidecar_path)
+        if self._index_record:
+            logger.debug(f'Loaded indexed metadata for {self.image_path}')
+        return self._index_record
+
+    def _save_index_record(self):
+        """Save metadata as read from disk, along with derived properties, to the metadata index.
+        Getting derived properties may read additional formats (e.g., EXIF coordinates), which will
+        also be included.
+        """
+        if not self.image_path.is_file():
+            return
+        self._saving_index = True
+        try:
+            record = IndexRecord(
+                image_tags=self._loaded_tags['image'],
+                sidecar_tags=self._loaded_tags['sidecar'],
+                taxon_id=self.taxon_id,
+                observation_id=self.observation_id,
+                coordinates=self.coordinates,
+                has_sidecar=self.has_sidecar,
+                keywords=self.keyword_meta.keywords,
+            )
+        finally:
+            self._saving_index = False
+        sidecar_path = self.sidecar_path if self.has_sidecar else None
+        METADATA_INDEX.save(self.image_path, record, sidecar_path)
+
+    def _on_read_format(self, fmt: str):
+        """After lazy-loading a metadata format, reset derived properties, and update the index
+        with all formats read so far (if not modified)
+        """
         self._update_derived_properties()
+        if not (self._modified or self._saving_index):
+            self._save_index_record()
 
-    def _update_derived_properties(self):
-        """Reset/ update all secondary properties derived from base metadata formats"""
+    def _update_derived_properties(self, index_record: IndexRecord = None):
+        """Reset/ update all secondary properties derived from base metadata formats, or load them
+        from a previously indexed record
+        """
         self._coordinates = None
         self._inaturalist_ids = None
+        self._keyword_meta = None
         self._min_rank = None
         self._simplified = None
         self._summary = None
         self._observation = None
-        self.keyword_meta = KeywordMetadata(self.combined)
-        self.inaturalist_ids  # for side effect
+        if index_record:
+            self._coordinates = index_record.coordinates
+            self._inaturalist_ids = (index_record.taxon_id, index_record.observation_id)
+            self._keyword_meta = KeywordMetadata(keywords=index_record.keywords)
 
     @property
     def combined(self) -> dict[str, Any]:
@@ -90,7 +168,8 @@ class MetaMetadata(ImageMetadata):
 
     @property
     def has_any_tags(self) -> bool:
-        return bool(self.exif or self.iptc or self.xmp)
+        # Check formats in order of how cheap they are to read
+        return bool(self.xmp or self.iptc or self.exif)
 
     @property
     def has_coordinates(self) -> bool:
@@ -106,11 +185,34 @@ class MetaMetadata(ImageMetadata):
 
     @property
     def inaturalist_ids(self) -> IntTuple:
-        """Get taxon and/or observation IDs from metadata if available"""
+        """Get taxon and/or observation IDs from metadata if available. If not all metadata formats
+        have been loaded, IPTC and XMP tags (including DwC tags and keywords) will be checked first,
+        and EXIF will only be read if no IDs are found there.
+        """
         if self._inaturalist_ids is None:
-            self._inaturalist_ids = get_inaturalist_ids(self.simplified)
+            if self.is_loaded:
+                ids = get_inaturalist_ids(self.simplified)
+            else:
+                ids = get_inaturalist_ids(
+                    simplify_keys({**self.iptc, **self.xmp, **self.keyword_meta.kv_keywords})
+                )
+                if not any(ids):
+                    ids = get_inaturalist_ids(self.simplified)
+            self._inaturalist_ids = ids
         return self._inaturalist_ids
 
+    @property
+    def keyword_meta(self) -> KeywordMetadata:
+        """Get keyword metadata. If not all metadata formats have been loaded, only IPTC and XMP will
+        be read, which includes keywords written by naturtag and most other applications.
+        """
+        if self._keyword_meta is None:
+            keyword_tags = {**self.iptc, **self.xmp}
+            if self._exif is not None:
+                keyword_tags.update(self._exif)
+            self._keyword_meta = KeywordMetadata(keyword_tags)
+        return self._keyword_meta
+
     @property
     def observation_id(self) -> Optional[int]:
         return self.inaturalist_ids[1]
@@ -179,6 +281,7 @@ class MetaMetadata(ImageMetadata):
         self.exif.update(other.exif)
         self.xmp.update(other.xmp)
         self.iptc.update(other.iptc)
+        self._modified = True
         self._update_derived_properties()
         return self
 
@@ -192,9 +295,10 @@ class MetaMetadata(ImageMetadata):
     def update_coordinates(self, coordinates: Coordinates):
         if not coordinates:
             return
-        self._coordinates = coordinates
         self.exif.update(to_exif_coords(coordinates))
         self.xmp.update(to_xmp_coords(coordinates))
+        self._modified = True
+        self._coordinates = coordinates
 
     def update_keywords(self, keywords):
         """
@@ -226,16 +330,19 @@ def get_inaturalist_ids(metadata: dict) -> IntTuple:
 
 def simplify_keys(mapping: dict[str, str]) -> dict[str, str]:
     """
-    Simplify/deduplicate dict keys, to reduce variations in similarly-named keys
+    Simplify/deduplicate dict keys, to reduce variations in similarly-named keys. Namespaces are
+    removed from both keyword keys and metadata tag names.
 
     Example::
         >>> simplify_keys({'my_namepace:Sub_Family': 'Panorpinae'})
         {'subfamily': 'Panorpinae'}
+        >>> simplify_keys({'Xmp.dwc.taxonID': '12345'})
+        {'taxonid': '12345'}
 
     Returns:
         dict with simplified/deduplicated keys
     """
-    return {k.lower().replace('_', '').split(':')[-1]: v for k, v in mapping.items()}
+    return {NAMESPACE_PATTERN.split(k.lower().replace('_', ''))[-1]: v for k, v in mapping.items()}
 
 
 def _first_match(d: dict, tags: list[str]) -> Optional[str]:
@@ -244,5 +351,10 @@ def _first_match(d: dict, tags: list[str]) -> Optional[str]:
 
 
 def _first_match_int(d: dict, tags: list[str]) -> Optional[int]:
-    match = _first_match(d, tags)
-    return int(match) if match else None
+    """Get first valid integer value from specified keys, if any; otherwise return None"""
+    for match in filter(None, map(d.get, tags)):
+        try:
+            return int(match)
+        except (TypeError, ValueError):
+            logger.debug(f'Skipping non-numeric ID: {match}')
+    return None
@@ -0,0 +1,153 @@
+"""Local SQLite index of previously read image metadata, to avoid re-parsing unchanged files"""
+import os
+import pickle
+import sqlite3
+from logging import getLogger
+from pathlib import Path
+from threading import local
+from typing import Any, NamedTuple, Optional
+
+from pyinaturalist import Coordinates
+
+from naturtag.constants import METADATA_FORMATS, METADATA_INDEX_PATH, PathOrStr
+
+logger = getLogger().getChild(__name__)
+
+# (image mtime, image size, sidecar mtime); mtimes are in nanoseconds, and 0 if missing
+Signature = tuple[int, int, int]
+
+
+class IndexRecord(NamedTuple):
+    """Parsed metadata and derived details for a single image, as of the last time it was read.
+    Tags are stored separately for the image and sidecar file, keyed by metadata format. If the
+    image was lazy-loaded, this may only contain some metadata formats.
+    """
+
+    image_tags: dict[str, dict[str, Any]]
+    sidecar_tags: dict[str, dict[str, Any]]
+    taxon_id: Optional[int] = None
+    observation_id: Optional[int] = None
+    coordinates: Optional[Coordinates] = None
+    has_sidecar: bool = False
+    keywords: Optional[list[str]] = None
+
+    @property
+    def formats(self) -> list[str]:
+        """Metadata formats that were read before the image was indexed"""
+        return [fmt for fmt in METADATA_FORMATS if fmt in self.image_tags]
+
+    @property
+    def is_complete(self) -> bool:
+        """Indicates that all metadata formats were read"""
+        return len(self.formats) == len(METADATA_FORMATS)
+
+    @property
+    def exif(self) -> dict[str, Any]:
+        return self._combine('exif')
+
+    @property
+    def iptc(self) -> dict[str, Any]:
+        return self._combine('iptc')
+
+    @property
+    def xmp(self) -> dict[str, Any]:
+        return self._combine('xmp')
+
+    def _combine(self, fmt: str) -> dict[str, Any]:
+        return {**self.image_tags.get(fmt, {}), **self.sidecar_tags.get(fmt, {})}
+
+
+class MetadataIndex:
+    """Index of image metadata, keyed by absolute image path, and valid only as long as the image's
+    modification time, size, and sidecar modification time are unchanged.
+
+    Connections are created per thread (and per process), so this can be shared by worker threads
+    and process pools. Any database errors are logged and treated as cache misses.
+    """
+
+    def __init__(self, db_path: PathOrStr = METADATA_INDEX_PATH):
+        self.db_path = Path(db_path)
+        self._local = local()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Connections can't be shared across threads, or with a process forked from this one
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS metadata ('
+                'path TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, sidecar_mtime INTEGER, '
+                'taxon_id INTEGER, observation_id INTEGER, has_sidecar INTEGER, data BLOB)'
+            )
+            self._local.connection = conn
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def get(self, image_path: PathOrStr, sidecar_path: PathOrStr = None) -> Optional[IndexRecord]:
+        """Get indexed metadata for an image, if it hasn't been modified since it was indexed"""
+        if not (signature := get_signature(image_path, sidecar_path)):
+            return None
+        try:
+            row = self.connection.execute(
+                'SELECT data FROM metadata '
+                'WHERE path = ? AND mtime = ? AND size = ? AND sidecar_mtime = ?',
+                (_get_key(image_path), *signature),
+            ).fetchone()
+            return IndexRecord(**pickle.loads(row[0])) if row else None
+        except (sqlite3.Error, pickle.PickleError, TypeError) as e:
+            logger.warning(f'Failed to read metadata index for {image_path}: {e}')
+            return None
+
+    def save(self, image_path: PathOrStr, record: IndexRecord, sidecar_path: PathOrStr = None):
+        """Add or replace indexed metadata for an image"""
+        if not (signature := get_signature(image_path, sidecar_path)):
+            return
+        try:
+            with self.connection as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (
+                        _get_key(image_path),
+                        *signature,
+                        record.taxon_id,
+                        record.observation_id,
+                        record.has_sidecar,
+                        pickle.dumps(record._asdict(), protocol=pickle.HIGHEST_PROTOCOL),
+                    ),
+                )
+        except (sqlite3.Error, pickle.PickleError) as e:
+            logger.warning(f'Failed to update metadata index for {image_path}: {e}')
+
+    def delete(self, image_path: PathOrStr):
+        """Remove indexed metadata for an image, e.g. after its metadata has been modified"""
+        try:
+            with self.connection as conn:
+                conn.execute('DELETE FROM metadata WHERE path = ?', (_get_key(image_path),))
+        except sqlite3.Error as e:
+            logger.warning(f'Failed to update metadata index for {image_path}: {e}')
+
+    def clear(self):
+        """Remove all indexed metadata"""
+        with self.connection as conn:
+            conn.execute('DELETE FROM metadata')
+
+
+def get_signature(image_path: PathOrStr, sidecar_path: PathOrStr = None) -> Optional[Signature]:
+    """Get file info used to check if an image (or its sidecar) has changed since it was indexed"""
+    try:
+        stat = os.stat(image_path)
+    except OSError:
+        return None
+    try:
+        sidecar_mtime = os.stat(sidecar_path).st_mtime_ns if sidecar_path else 0
+    except OSError:
+        sidecar_mtime = 0
+    return stat.st_mtime_ns, stat.st_size, sidecar_mtime
+
+
+def _get_key(image_path: PathOrStr) -> str:
+    return os.path.abspath(image_path)
+
+
+METADATA_INDEX = MetadataIndex()
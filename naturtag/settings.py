@@ -1,5 +1,4 @@
 """Basic utilities for reading and writing settings from config files"""
-import sqlite3
 from collections import Counter, OrderedDict
 from datetime import datetime
 from itertools import chain
@@ -17,20 +16,25 @@ from cattr.preconf import pyyaml
 from pyinaturalist import TaxonCounts
 from pyinaturalist_convert import create_tables, load_table
 from pyinaturalist_convert.fts import create_fts5_table, vacuum_analyze
+from sqlalchemy import text
 
 from naturtag.constants import (
     CONFIG_PATH,
     DB_PATH,
     DEFAULT_WINDOW_SIZE,
+    IMAGE_CACHE_MAX_SIZE,
     LOGFILE,
     MAX_DIR_HISTORY,
     MAX_DISPLAY_HISTORY,
     MAX_DISPLAY_OBSERVED,
+    OBSERVATION_EXPIRATION,
     PACKAGED_TAXON_DB,
     TAXON_DB_URL,
+    TAXON_EXPIRATION,
     USER_TAXA_PATH,
     PathOrStr,
 )
+from naturtag.utils.db import get_engine
 
 logger = getLogger().getChild(__name__)
 
@@ -113,6 +117,21 @@ class Settings(YamlMixin):
     preferred_place_id: int = doc_field(
         default=1, converter=int, doc='Place preference for regional species common names'
     )
+    observation_expiration: int = doc_field(
+        default=OBSERVATION_EXPIRATION // (60 * 60),
+        converter=int,
+        doc='Hours before saved observations are re-fetched when refreshing metadata',
+    )
+    taxon_expiration: int = doc_field(
+        default=TAXON_EXPIRATION // (60 * 60),
+        converter=int,
+        doc='Hours before saved taxa are re-fetched when refreshing metadata',
+    )
+    prefetch_taxa: int = doc_field(
+        default=5,
+        converter=int,
+        doc='Number of child taxa to preload in the background when viewing a taxon (0 to disable)',
+    )
     username: str = doc_field(default='', doc='Your iNaturalist username')
 
     # Metadata
@@ -130,13 +149,22 @@ class Settings(YamlMixin):
     use_last_dir: bool = doc_field(
         default=True, doc='Open file chooser in the previously used directory'
     )
+    watch_image_dirs: bool = doc_field(
+        default=False, doc='Watch image directories for new and modified images'
+    )
     recent_image_dirs: list[Path] = field(factory=list)
+    image_cache_size: int = doc_field(
+        default=IMAGE_CACHE_MAX_SIZE // (1024 * 1024),
+        converter=int,
+        doc='Max size of downloaded images from iNaturalist, in MB',
+    )
     favorite_image_dirs: list[Path] = field(factory=list)
     # data_dir: Path = field(default=DATA_DIR, converter=Path)
 
     debug: bool = field(default=False)
     setup_complete: bool = field(default=False)
     last_obs_check: datetime = field(default=None)
+    obs_sync_id_above: int = field(default=0)
 
     @classmethod
     def read(cls) -> 'Settings':
@@ -150,8 +178,17 @@ class Settings(YamlMixin):
         else:
             return self.default_image_dir
 
-    def set_obs_checkpoint(self):
-        self.last_obs_check = datetime.utcnow().replace(microsecond=0)
+    def set_obs_checkpoint(self, sync_start: datetime = None):
+        """Mark a user observation sync as complete. The next sync will only fetch observations
+        created or updated since the start of this one.
+        """
+        self.last_obs_check = (sync_start or datetime.utcnow()).replace(microsecond=0)
+        self.obs_sync_id_above = 0
+        self.write()
+
+    def set_obs_sync_progress(self, id_above: int):
+        """Save progress of an incomplete user observation sync, so it can be resumed later"""
+        self.obs_sync_id_above = id_above
         self.write()
 
     def add_favorite_dir(self, image_dir: Path):
@@ -272,9 +309,9 @@ def setup(settings: Settings = None, overwrite: bool = False, download: bool = F
     if DB_PATH.is_file():
         if overwrite:
             logger.info('Overwriting exiting taxon tables')
-            with sqlite3.connect(DB_PATH) as conn:
-                conn.execute('DROP TABLE taxon')
-                conn.execute('DROP TABLE taxon_fts')
+            with get_engine(DB_PATH).begin() as conn:
+                conn.execute(text('DROP TABLE taxon'))
+                conn.execute(text('DROP TABLE taxon_fts'))
         else:
             logger.warning('Taxon database already exists; attempting to update')
 
@@ -284,8 +321,8 @@ def setup(settings: Settings = None, overwrite: bool = False, download: bool = F
     _load_taxon_db(download)
 
     # Indicate some columns are missing and need to be filled in from API
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.execute('UPDATE taxon SET partial=1')
+    with get_engine(DB_PATH).begin() as conn:
+        conn.execute(text('UPDATE taxon SET partial=1'))
 
     vacuum_analyze(['taxon', 'taxon_fts'], DB_PATH)
 
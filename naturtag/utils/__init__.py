@@ -1,3 +1,4 @@
 # flake8: noqa: F401
-from naturtag.utils.image_glob import get_valid_image_paths
-from naturtag.utils.thumbnails import generate_thumbnail
+from naturtag.utils.image_glob import get_valid_image_paths, iter_valid_image_paths
+from naturtag.utils.thumbnails import THUMBNAIL_CACHE, generate_thumbnail, get_thumbnail
+from naturtag.utils.watcher import ImageWatcher
@@ -0,0 +1,188 @@
+"""Shared connections and batched writes for the local observation and taxon database"""
+from itertools import chain
+from logging import getLogger
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Iterable, Iterator
+
+from pyinaturalist import Observation, Taxon
+from pyinaturalist_convert.db import DbObservation, DbPhoto, DbTaxon, DbUser
+from sqlalchemy import create_engine, event, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from naturtag.constants import DB_CACHE_SIZE, DB_MMAP_SIZE, DB_PATH, DB_POOL_SIZE, PathOrStr
+
+# Max number of IDs per query, to stay under SQLite's limit on bound parameters
+MAX_IDS_PER_QUERY = 500
+
+logger = getLogger().getChild(__name__)
+
+_engines: dict[str, Engine] = {}
+_lock = Lock()
+
+
+def get_engine(db_path: PathOrStr = DB_PATH) -> Engine:
+    """Get a shared engine for a SQLite database, which keeps a pool of connections for reuse
+    across threads.
+
+    Connections use WAL mode, so reads don't block on writes from other threads (and vice versa),
+    with ``synchronous=NORMAL``, memory-mapped I/O, and a larger page cache.
+    """
+    db_path = str(Path(db_path).expanduser().absolute())
+    with _lock:
+        if db_path not in _engines:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            engine = create_engine(
+                f'sqlite:///{db_path}',
+                poolclass=QueuePool,
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_POOL_SIZE,
+                connect_args={'check_same_thread': False, 'timeout': 30},
+                future=True,
+            )
+            event.listen(engine, 'connect', _set_pragmas)
+            # Databases created by an older version may be missing some tables
+            _migrate(engine)
+            _engines[db_path] = engine
+        return _engines[db_path]
+
+
+def get_session(db_path: PathOrStr = DB_PATH) -> Session:
+    """Get a SQLAlchemy session using a pooled connection"""
+    return Session(get_engine(db_path), future=True)
+
+
+def migrate_db(db_path: PathOrStr = DB_PATH):
+    """Create any tables that were added after first-time setup. This is run automatically the
+    first time a database is used, and is safe to run repeatedly.
+    """
+    _migrate(get_engine(db_path))
+
+
+def _migrate(engine: Engine):
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                'CREATE TABLE IF NOT EXISTS record_fetched ('
+                'type TEXT, id INTEGER, fetched_at REAL, PRIMARY KEY (type, id))'
+            )
+        )
+
+
+def _set_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode = WAL')
+    cursor.execute('PRAGMA synchronous = NORMAL')
+    cursor.execute(f'PRAGMA mmap_size = {DB_MMAP_SIZE}')
+    cursor.execute(f'PRAGMA cache_size = -{DB_CACHE_SIZE // 1024}')  # Negative value = KiB
+    cursor.close()
+
+
+def get_fetched_times(db_path: PathOrStr, record_type: str, ids: Iterable[int]) -> dict[int, float]:
+    """Get the times that records were last fetched from the API, as UNIX timestamps. Records
+    without a fetched time (e.g., saved by an older version) are omitted.
+
+    Args:
+        db_path: Path to SQLite database
+        record_type: Record type, e.g. ``'observation'`` or ``'taxon'``
+        ids: Record IDs
+    """
+    fetched_times: dict[int, float] = {}
+    with get_engine(db_path).connect() as conn:
+        for chunk in _chunkify(ids):
+            stmt = text(
+                'SELECT id, fetched_at FROM record_fetched WHERE type = :type '
+                f'AND id IN ({",".join(f":id_{i}" for i in range(len(chunk)))})'
+            )
+            params = {'type': record_type, **{f'id_{i}': id for i, id in enumerate(chunk)}}
+            fetched_times.update(conn.execute(stmt, params).fetchall())
+    return fetched_times
+
+
+def save_fetched_times(db_path: PathOrStr, record_type: str, ids: Iterable[int]):
+    """Record that the specified records were just fetched from the API"""
+    with get_session(db_path) as session:
+        _save_fetched_times(session, record_type, ids)
+        session.commit()
+
+
+def save_observations(
+    observations: Iterable[Observation], db_path: PathOrStr = DB_PATH, fetched: bool = False
+):
+    """Save observations (and associated users, photos, and taxa) to SQLite in a single transaction
+
+    Args:
+        observations: Observations to save
+        db_path: Path to SQLite database
+        fetched: Record that these observations were just fetched from the API
+    """
+    observations = list(observations)
+    obs_ids = [obs.id for obs in observations]
+    user_ids = {obs.user.id for obs in observations if obs.user}
+    photo_ids = {photo.id for obs in observations for photo in obs.photos}
+
+    with get_session(db_path) as session:
+        # Load any existing records in bulk, so merges don't need to query them individually
+        for model, ids in [(DbObservation, obs_ids), (DbUser, user_ids), (DbPhoto, photo_ids)]:
+            for chunk in _chunkify(ids):
+                session.execute(select(model).where(model.id.in_(chunk))).all()
+
+        for obs in observations:
+            session.merge(DbObservation.from_model(obs, skip_taxon=True))
+        _save_taxa(session, [obs.taxon for obs in observations if obs.taxon])
+        if fetched:
+            _save_fetched_times(session, 'observation', obs_ids)
+        session.commit()
+
+
+def save_taxa(taxa: Iterable[Taxon], db_path: PathOrStr = DB_PATH, fetched: bool = False):
+    """Save taxa (plus ancestors and children, if available) to SQLite in a single transaction
+
+    Args:
+        taxa: Taxa to save
+        db_path: Path to SQLite database
+        fetched: Record that these taxa were just fetched from the API
+    """
+    taxa = list(taxa)
+    with get_session(db_path) as session:
+        _save_taxa(session, taxa)
+        if fetched:
+            _save_fetched_times(session, 'taxon', [taxon.id for taxon in taxa])
+        session.commit()
+
+
+def _save_taxa(session: Session, taxa: list[Taxon]):
+    # Combined list of taxa plus all their unique ancestors + children
+    taxa_by_id = {t.id: t for t in chain.from_iterable([t.ancestors + t.children for t in taxa])}
+    taxa_by_id.update({t.id: t for t in taxa})
+
+    # Merge (instead of overwriting) any existing taxa with new data
+    existing_taxa = {}
+    for chunk in _chunkify(taxa_by_id):
+        stmt = select(DbTaxon).where(DbTaxon.id.in_(chunk))  # type: ignore
+        existing_taxa.update({t[0].id: t[0] for t in session.execute(stmt)})
+    for taxon in taxa_by_id.values():
+        if db_taxon := existing_taxa.get(taxon.id):
+            db_taxon.update(taxon)
+        else:
+            session.add(DbTaxon.from_model(taxon))
+
+
+def _save_fetched_times(session: Session, record_type: str, ids: Iterable[int]):
+    now = time()
+    session.execute(
+        text(
+            'INSERT OR REPLACE INTO record_fetched (type, id, fetched_at) '
+            'VALUES (:type, :id, :fetched_at)'
+        ),
+        [{'type': record_type, 'id': id, 'fetched_at': now} for id in ids],
+    )
+
+
+def _chunkify(ids: Iterable[int], max_size: int = MAX_IDS_PER_QUERY) -> Iterator[list[int]]:
+    ids = list(ids)
+    for i in range(0, len(ids), max_size):
+        yield ids[i : i + max_size]
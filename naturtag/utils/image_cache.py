@@ -0,0 +1,262 @@
+"""Filesystem storage for downloaded images"""
+import os
+import sqlite3
+from collections import Counter, OrderedDict
+from logging import getLogger
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock, local
+from time import time
+from typing import Iterator, Optional
+
+from pyinaturalist.converters import format_file_size
+from PySide6.QtGui import QImage
+
+from naturtag.constants import (
+    IMAGE_CACHE_DIR,
+    IMAGE_CACHE_MAX_SIZE,
+    IMAGE_MEMORY_CACHE_MAX_SIZE,
+    PathOrStr,
+)
+
+logger = getLogger().getChild(__name__)
+
+
+class ImageCache:
+    """Cache of downloaded images, stored as individual files in sharded subdirectories, with a
+    small SQLite index of file sizes, source URLs, access times, and expiration times.
+
+    Files are written atomically, so they can be read by any thread without locking. To avoid
+    writing to the index on every read, access times are kept in memory until the next call to
+    :py:meth:`compact`, which removes expired images, and then least recently used images until
+    the cache is under ``max_size`` bytes. Index connections are created per thread.
+    """
+
+    def __init__(
+        self, cache_dir: PathOrStr = IMAGE_CACHE_DIR, max_size: int = IMAGE_CACHE_MAX_SIZE
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.index_path = self.cache_dir / 'index.db'
+        self.max_size = max_size
+        self.stats: Counter[str] = Counter()
+        self._accessed: dict[str, float] = {}
+        self._lock = Lock()
+        self._local = local()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if not hasattr(self._local, 'connection'):
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.index_path, timeout=30)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS images ('
+                'key TEXT PRIMARY KEY, url TEXT, size INTEGER, created REAL, accessed REAL, '
+                'expires REAL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_accessed ON images (accessed)')
+            self._local.connection = conn
+        return self._local.connection
+
+    def __contains__(self, key: str) -> bool:
+        return self._get_path(key).is_file()
+
+    def __len__(self) -> int:
+        return self._fetch_one('SELECT COUNT(*) FROM images')
+
+    def get(self, key: str, expire_after: float = None) -> Optional[bytes]:
+        """Get image data, if it exists in the cache and hasn't expired"""
+        if not (path := self.get_path(key, expire_after)):
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def get_path(self, key: str, expire_after: float = None) -> Optional[Path]:
+        """Get the path to a cached image, if it exists and hasn't expired
+
+        Args:
+            key: Cache key
+            expire_after: Number of seconds after an image is saved that it expires
+        """
+        path = self._get_path(key)
+        try:
+            saved = path.stat().st_mtime
+        except OSError:
+            self._count('misses')
+            return None
+
+        now = time()
+        if expire_after is not None and saved + expire_after < now:
+            self._count('misses', 'expired')
+            self.delete(key)
+            return None
+
+        with self._lock:
+            self.stats['hits'] += 1
+            self._accessed[key] = now
+        return path
+
+    def save(self, key: str, data: bytes, url: str = None, expire_after: float = None):
+        """Save image data to the cache. Errors are logged and otherwise ignored."""
+        path = self._get_path(key)
+        now = time()
+        expires = now + expire_after if expire_after is not None else None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with NamedTemporaryFile(dir=path.parent, suffix='.tmp', delete=False) as f:
+                f.write(data)
+            os.replace(f.name, path)
+            with self.connection as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?)',
+                    (key, url, len(data), now, now, expires),
+                )
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f'Failed to cache image {url or key}: {e}')
+
+    def delete(self, key: str):
+        """Remove an image from the cache"""
+        self._get_path(key).unlink(missing_ok=True)
+        with self._lock:
+            self._accessed.pop(key, None)
+        try:
+            with self.connection as conn:
+                conn.execute('DELETE FROM images WHERE key = ?', (key,))
+        except sqlite3.Error as e:
+            logger.warning(f'Failed to update image cache index: {e}')
+
+    def clear(self):
+        """Remove all cached images"""
+        for path in self.cache_dir.glob('*/*'):
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._accessed.clear()
+        with self.connection as conn:
+            conn.execute('DELETE FROM images')
+
+    def compact(self):
+        """Save access times, remove expired images, and then remove least recently used images
+        until the cache is under its max size
+        """
+        with self._lock:
+            accessed, self._accessed = self._accessed, {}
+        try:
+            with self.connection as conn:
+                conn.executemany(
+                    'UPDATE images SET accessed = ? WHERE key = ?',
+                    [(t, key) for key, t in accessed.items()],
+                )
+            expired = [
+                row[0]
+                for row in self.connection.execute(
+                    'SELECT key FROM images WHERE expires < ?', (time(),)
+                )
+            ]
+            self._delete_many(expired)
+            self._count(*['expired'] * len(expired))
+
+            total_size = self.size
+            evicted = []
+            if total_size > self.max_size:
+                for key, size in self.connection.execute(
+                    'SELECT key, size FROM images ORDER BY accessed'
+                ):
+                    if total_size <= self.max_size:
+                        break
+                    evicted.append(key)
+                    total_size -= size
+                self._delete_many(evicted)
+                self._count(*['evictions'] * len(evicted))
+        except sqlite3.Error as e:
+            logger.warning(f'Failed to compact image cache: {e}')
+            return
+        if expired or evicted:
+            logger.debug(
+                f'Removed {len(expired)} expired and {len(evicted)} least recently used images'
+            )
+
+    def keys(self) -> Iterator[str]:
+        """Get keys of all indexed images"""
+        for row in self.connection.execute('SELECT key FROM images'):
+            yield row[0]
+
+    @property
+    def size(self) -> int:
+        """Get the total size of cached images, in bytes"""
+        return self._fetch_one('SELECT SUM(size) FROM images')
+
+    def summary(self) -> str:
+        """Get a summary of cache size and stats for the current session"""
+        size = format_file_size(self.size)
+        max_size = format_file_size(self.max_size)
+        stats = ', '.join(
+            f'{self.stats[k]} {k}' for k in ['hits', 'misses', 'expired', 'evictions']
+        )
+        return f'{size} of {max_size} ({len(self)} files)\n{stats}'
+
+    def _count(self, *stats: str):
+        with self._lock:
+            self.stats.update(stats)
+
+    def _delete_many(self, keys: list[str]):
+        for key in keys:
+            self._get_path(key).unlink(missing_ok=True)
+        with self.connection as conn:
+            conn.executemany('DELETE FROM images WHERE key = ?', [(key,) for key in keys])
+
+    def _fetch_one(self, query: str) -> int:
+        try:
+            return self.connection.execute(query).fetchone()[0] or 0
+        except sqlite3.Error as e:
+            logger.warning(f'Failed to read image cache index: {e}')
+            return 0
+
+    def _get_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+
+class MemoryImageCache:
+    """In-memory cache of decoded images, with least recently used images removed first when over
+    ``max_size`` bytes.
+
+    This stores ``QImage`` objects rather than ``QPixmap``, so it can be safely populated from
+    worker threads. Pixmaps should be created from these in the main thread.
+    """
+
+    def __init__(self, max_size: int = IMAGE_MEMORY_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self.size = 0
+        self._images: OrderedDict[str, QImage] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    def get(self, key: str) -> Optional[QImage]:
+        """Get a decoded image, if it exists in the cache"""
+        with self._lock:
+            if (image := self._images.get(key)) is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def set(self, key: str, image: QImage):
+        """Add a decoded image to the cache, unless it's larger than the entire cache"""
+        image_size = image.sizeInBytes()
+        if image.isNull() or image_size > self.max_size:
+            return
+        with self._lock:
+            if (prev_image := self._images.pop(key, None)) is not None:
+                self.size -= prev_image.sizeInBytes()
+            self._images[key] = image
+            self.size += image_size
+            while self.size > self.max_size:
+                _, evicted = self._images.popitem(last=False)
+                self.size -= evicted.sizeInBytes()
+
+    def clear(self):
+        """Remove all decoded images"""
+        with self._lock:
+            self._images.clear()
+            self.size = 0
@@ -1,15 +1,15 @@
 """Utilities for finding and resolving image paths from directories, URIs, and/or glob patterns"""
-from fnmatch import fnmatch
+import os
 from glob import glob
 from itertools import chain
 from logging import getLogger
 from pathlib import Path, PosixPath, PureWindowsPath
+from typing import Iterable, Iterator
 from urllib.parse import unquote_plus, urlparse
 
-from pyinaturalist import Iterable
-
 from naturtag.constants import IMAGE_FILETYPES, PathOrStr
 
+IMAGE_EXTENSIONS = {ext.lstrip('*').lower() for ext in IMAGE_FILETYPES}
 logger = getLogger().getChild(__name__)
 
 
@@ -29,25 +29,40 @@ def get_valid_image_paths(
     Returns:
          Combined list of image file paths
     """
+    image_paths = set(iter_valid_image_paths(paths_or_uris, recursive, include_sidecars))
+    logger.info(f'{len(image_paths)} total images found in paths')
+    return image_paths
+
+
+def iter_valid_image_paths(
+    paths_or_uris: Iterable[PathOrStr],
+    recursive: bool = False,
+    include_sidecars: bool = False,
+) -> Iterator[Path]:
+    """Same as :py:func:`get_valid_image_paths`, but yields unique image paths as they are found,
+    instead of waiting for all directories to be scanned
+    """
     if not paths_or_uris:
-        return set()
+        return
 
-    image_paths = []
     logger.info(f'Getting images from paths: {paths_or_uris}')
-
+    unique_paths = set()
     for path in paths_or_uris:
         if not path:
             continue
         path = uri_to_path(path)
         if path.is_dir():
-            image_paths.extend(get_images_from_dir(path, recursive=recursive))
+            image_paths: Iterable[Path] = iter_images_from_dir(path, recursive=recursive)
         elif is_image_path(path, include_sidecars=include_sidecars):
-            image_paths.append(path)
+            image_paths = [path]
         else:
             logger.warning(f'Not a valid path: {path}')
+            continue
 
-    logger.info(f'{len(image_paths)} total images found in paths')
-    return set(image_paths)
+        for image_path in image_paths:
+            if image_path not in unique_paths:
+                unique_paths.add(image_path)
+                yield image_path
 
 
 def get_images_from_dir(path: Path, recursive: bool = False) -> list[Path]:
@@ -61,12 +76,47 @@ def get_images_from_dir(path: Path, recursive: bool = False) -> list[Path]:
     Returns:
         Paths of supported image files in the directory
     """
-    patterns = {f'**/{ext}' for ext in IMAGE_FILETYPES} if recursive else IMAGE_FILETYPES
-    paths = glob_paths([path / pattern for pattern in patterns])
+    paths = list(iter_images_from_dir(path, recursive=recursive))
     logger.info(f'{len(paths)} images found in directory: {path}')
     return paths
 
 
+def iter_images_from_dir(path: Path, recursive: bool = False) -> Iterator[Path]:
+    """
+    Get all images of supported filetypes from the selected directory, using a single directory
+    walk. Images are yielded as they are found, in sorted order within each directory. File
+    extensions are case-insensitive, and hidden files and directories are skipped.
+
+    Args:
+        dir: Path to image directory
+        recursive: Recursively get images from subdirectories
+    """
+    dirs = [path]
+    while dirs:
+        current_dir = dirs.pop()
+        try:
+            with os.scandir(current_dir) as it:
+                entries = sorted(
+                    (entry for entry in it if not entry.name.startswith('.')),
+                    key=lambda entry: entry.name,
+                )
+        except OSError as e:
+            logger.warning(f'Failed to read directory {current_dir}: {e}')
+            continue
+
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_file() and _is_image_ext(entry.name):
+                    yield Path(entry.path)
+                elif recursive and entry.is_dir(follow_symlinks=False):
+                    subdirs.append(Path(entry.path))
+            except OSError:
+                continue
+        # Add to stack in reverse so subdirectories are visited in sorted order
+        dirs.extend(reversed(subdirs))
+
+
 def glob_paths(path_patterns: Iterable[PathOrStr]) -> list[Path]:
     """
     Given one to many glob patterns, expand all into a list of matching files
@@ -87,10 +137,13 @@ def glob_paths(path_patterns: Iterable[PathOrStr]) -> list[Path]:
 
 def is_image_path(path: Path, include_sidecars: bool = False) -> bool:
     """Determine if a path points to a valid image of a supported type"""
-    valid_exts = IMAGE_FILETYPES
-    if include_sidecars:
-        valid_exts.append('*.xmp')
-    return path.is_file() and any(fnmatch(path.suffix.lower(), ext) for ext in valid_exts)
+    return path.is_file() and (
+        _is_image_ext(path.name) or (include_sidecars and path.suffix.lower() == '.xmp')
+    )
+
+
+def _is_image_ext(filename: str) -> bool:
+    return os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS
 
 
 def uri_to_path(path_or_uri) -> Path:
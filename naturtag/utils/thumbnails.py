@@ -1,22 +1,179 @@
 """Utilities for generating and retrieving image thumbnails"""
-from io import IOBase
+import os
+from hashlib import md5
+from io import BytesIO, IOBase
 from logging import getLogger
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from typing import Optional
 
-from PIL import Image
-from PIL.ImageOps import exif_transpose, flip
+from PIL import ExifTags, Image
+from PIL.ImageOps import flip
 from PIL.ImageQt import ImageQt
-from PySide6.QtGui import QPixmap
+from PySide6.QtGui import QImage, QPixmap
 
-from naturtag.constants import EXIF_ORIENTATION_ID, SIZE_DEFAULT, Dimensions, PathOrStr
+from naturtag.constants import (
+    EXIF_ORIENTATION_ID,
+    SIZE_DEFAULT,
+    THUMBNAIL_CACHE_DIR,
+    THUMBNAIL_CACHE_MAX_SIZE,
+    Dimensions,
+    PathOrStr,
+)
+
+# Check cache size after this many new thumbnails have been written
+EVICT_INTERVAL = 100
+
+# EXIF IFD1 tags for the offset and length of an embedded JPEG thumbnail
+EXIF_THUMBNAIL_OFFSET = 0x0201
+EXIF_THUMBNAIL_LENGTH = 0x0202
+
+# Transpose methods needed to correct each EXIF orientation value
+ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
 
 logger = getLogger().getChild(__name__)
 
 
+class ThumbnailCache:
+    """Persistent cache of local image thumbnails.
+
+    Thumbnails are keyed by absolute image path, modification time, file size, and thumbnail size,
+    so any change to the original image results in a cache miss. Reading a thumbnail updates its
+    modification time, and when the cache exceeds ``max_size`` bytes, the least recently used
+    thumbnails are removed.
+    """
+
+    def __init__(
+        self, cache_dir: PathOrStr = THUMBNAIL_CACHE_DIR, max_size: int = THUMBNAIL_CACHE_MAX_SIZE
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self._lock = Lock()
+        self._n_writes = 0
+
+    def get(self, image_path: PathOrStr, target_size: Dimensions) -> Optional[Path]:
+        """Get the path to a cached thumbnail, if it exists and the image hasn't been modified"""
+        if not (cache_path := self.get_cache_path(image_path, target_size)):
+            return None
+        try:
+            os.utime(cache_path)
+        except OSError:
+            return None
+        return cache_path
+
+    def save(self, image_path: PathOrStr, target_size: Dimensions, image: Image.Image):
+        """Save a thumbnail for an image. Errors are logged and otherwise ignored."""
+        if not (cache_path := self.get_cache_path(image_path, target_size)):
+            return
+        fmt = 'JPEG' if image.mode in ('RGB', 'L') else 'PNG'
+
+        # Write to a temp file first, so other threads never read a partially written thumbnail
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with NamedTemporaryFile(dir=cache_path.parent, suffix='.tmp', delete=False) as f:
+                image.save(f, format=fmt, quality=90)
+            os.replace(f.name, cache_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f'Thumbnails: Failed to cache thumbnail for {image_path}: {e}')
+            return
+
+        with self._lock:
+            self._n_writes += 1
+            evict = self._n_writes % EVICT_INTERVAL == 1
+        if evict:
+            self.evict()
+
+    def get_cache_path(self, image_path: PathOrStr, target_size: Dimensions) -> Optional[Path]:
+        """Get the cache path for an image thumbnail, or ``None`` if the image doesn't exist"""
+        try:
+            stat = os.stat(image_path)
+        except (OSError, TypeError):
+            return None
+        key = ':'.join(
+            [
+                os.path.abspath(image_path),
+                str(stat.st_mtime_ns),
+                str(stat.st_size),
+                'x'.join(str(i) for i in target_size),
+            ]
+        )
+        key = md5(key.encode()).hexdigest()
+        return self.cache_dir / key[:2] / key
+
+    def evict(self):
+        """Remove least recently used thumbnails until the cache is under its max size"""
+        files = []
+        for path in self.cache_dir.glob('*/*'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(f[1] for f in files)
+        if total_size <= self.max_size:
+            return
+
+        n_removed = 0
+        for _, size, path in sorted(files):
+            if total_size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+            n_removed += 1
+        logger.debug(f'Thumbnails: Removed {n_removed} least recently used thumbnails from cache')
+
+    def clear(self):
+        """Remove all cached thumbnails"""
+        for path in self.cache_dir.glob('*/*'):
+            path.unlink(missing_ok=True)
+
+
+THUMBNAIL_CACHE = ThumbnailCache()
+
+
+def get_thumbnail(path: PathOrStr, target_size: Dimensions = SIZE_DEFAULT) -> Optional[QImage]:
+    """Get a thumbnail for a local image from the thumbnail cache, or generate and cache a new one.
+    This returns a ``QImage`` rather than a ``QPixmap``, so it can be safely called from worker
+    threads.
+
+    Args:
+        path: Image file path
+        target_size: Max dimensions for thumbnail
+
+    Returns:
+        Thumbnail data as an image, or ``None`` if it couldn't be generated
+    """
+    if cache_path := THUMBNAIL_CACHE.get(path, target_size):
+        image = QImage(str(cache_path))
+        if not image.isNull():
+            return image
+
+    logger.debug(f'Thumbnails: Generating {target_size} thumbnail for {path}')
+    try:
+        image = _generate_thumbnail(path, target_size)
+    except (OSError, RuntimeError) as e:
+        logger.warning(f'Thumbnails: Failed to generate thumbnail for {path}: {e}')
+        return None
+
+    THUMBNAIL_CACHE.save(path, target_size, image)
+    return ImageQt(image).copy()
+
+
 def generate_thumbnail(
     path: PathOrStr,
     target_size: Dimensions = SIZE_DEFAULT,
     default_flip: bool = True,
-) -> QPixmap:
+) -> Optional[QPixmap]:
     """Generate a thumbnail from the source image
 
     Args:
@@ -27,16 +184,8 @@ def generate_thumbnail(
         Thumbnail data as a pixmap
     """
     logger.debug(f'Thumbnails: Generating {target_size} thumbnail for {path}')
-
-    # Resize if necessary, or just copy the image to the cache if it's already thumbnail size
     try:
-        image = _get_orientated_image(path, default_flip=default_flip)
-        image = _crop_square(image)
-        if image.size[0] > target_size[0] or image.size[1] > target_size[1]:
-            image.thumbnail(target_size)
-        else:
-            logger.debug(f'Thumbnails: Image is already thumbnail size: ({image.size})')
-
+        image = _generate_thumbnail(path, target_size, default_flip=default_flip)
         return QPixmap.fromImage(ImageQt(image))
 
     # If we're unable to generate a thumbnail, just return the original image source
@@ -45,16 +194,35 @@ def generate_thumbnail(
         return None
 
 
-def _get_orientated_image(source, default_flip: bool = True) -> Image:
+def _generate_thumbnail(source, target_size: Dimensions, default_flip: bool = True) -> Image.Image:
+    # Resize if necessary, or just copy the image to the cache if it's already thumbnail size
+    image = _get_orientated_image(source, target_size=target_size, default_flip=default_flip)
+    image = _crop_square(image)
+    if image.size[0] > target_size[0] or image.size[1] > target_size[1]:
+        image.thumbnail(target_size)
+    else:
+        logger.debug(f'Thumbnails: Image is already thumbnail size: ({image.size})')
+    return image
+
+
+def _get_orientated_image(
+    source, target_size: Dimensions = None, default_flip: bool = True
+) -> Image:
     """
     Load and rotate/transpose image according to EXIF orientation, if any. If missing orientation
     and the image was fetched from iNat, it will be vertically mirrored. (?)
+
+    If a target size is given, the image may be loaded at a reduced size, but its short edge will
+    be no smaller than the target size.
     """
     image = Image.open(source)
-    exif = image.getexif()
+    orientation = image.getexif().get(int(EXIF_ORIENTATION_ID, 16))
+    if target_size:
+        image = _get_reduced_image(image, max(target_size))
 
-    if exif.get(EXIF_ORIENTATION_ID):
-        image = exif_transpose(image)
+    if orientation:
+        if method := ORIENTATION_TRANSPOSE.get(orientation):
+            image = image.transpose(method)
     # TODO: In the future there may be more cases than just local images and remote images from iNat
     elif default_flip and isinstance(source, IOBase):
         image = flip(image)
@@ -62,6 +230,53 @@ def _get_orientated_image(source, default_flip: bool = True) -> Image:
     return image
 
 
+def _get_reduced_image(image: Image.Image, min_size: int) -> Image.Image:
+    """Get the smallest available version of an image with a short edge of at least ``min_size``:
+    either an embedded EXIF thumbnail, a JPEG decoded at reduced scale, or a reduced copy of the
+    full image
+    """
+    if thumbnail := _get_embedded_thumbnail(image, min_size):
+        logger.debug(f'Thumbnails: Using embedded thumbnail ({thumbnail.size})')
+        return thumbnail
+
+    # JPEGs can be decoded directly at 1/2, 1/4, or 1/8 scale
+    if image.format == 'JPEG':
+        image.draft(image.mode, (min_size, min_size))
+        return image
+
+    # For other formats, reduce by an integer factor, leaving the rest for the final (slower) resize
+    factor = min(image.size) // (min_size * 2)
+    return image.reduce(factor) if factor > 1 else image
+
+
+def _get_embedded_thumbnail(image: Image.Image, min_size: int) -> Optional[Image.Image]:
+    """Get a JPEG thumbnail embedded in EXIF metadata, if it exists and is large enough"""
+    exif_bytes = image.info.get('exif') or b''
+    try:
+        ifd1 = image.getexif().get_ifd(ExifTags.IFD.IFD1)
+        offset, length = ifd1.get(EXIF_THUMBNAIL_OFFSET), ifd1.get(EXIF_THUMBNAIL_LENGTH)
+    except (AttributeError, KeyError):
+        return None
+    if not (offset and length):
+        return None
+
+    # Thumbnail offset is relative to the TIFF header, which may be preceded by an 'Exif' header
+    if exif_bytes.startswith(b'Exif\x00\x00'):
+        exif_bytes = exif_bytes[6:]
+    data = exif_bytes[offset : offset + length]
+    if len(data) != length:
+        return None
+
+    try:
+        thumbnail = Image.open(BytesIO(data))
+        if min(thumbnail.size) < min_size:
+            return None
+        thumbnail.load()
+    except OSError:
+        return None
+    return thumbnail
+
+
 def _crop_square(image: Image) -> Image:
     """Crop an image into a square (retaining dimension of short edge)"""
     width, height = image.size
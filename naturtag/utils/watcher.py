@@ -0,0 +1,105 @@
+"""Utilities for watching image directories for new and modified images"""
+import os
+from logging import getLogger
+from pathlib import Path
+from time import monotonic, sleep
+from typing import Iterable, Iterator, Optional
+
+from naturtag.constants import WATCH_DEBOUNCE, WATCH_INTERVAL, PathOrStr
+from naturtag.utils.image_glob import is_image_path, iter_images_from_dir, uri_to_path
+
+logger = getLogger().getChild(__name__)
+
+# (mtime in nanoseconds, size)
+FileSignature = tuple[int, int]
+
+
+class ImageWatcher:
+    """Polls one or more image paths and/or directories for new and modified images.
+
+    Changes are debounced: a batch of changed images is only returned once no further changes have
+    been seen for ``debounce`` seconds, so a burst of file copies is handled as a single batch.
+
+    Example:
+
+        >>> watcher = ImageWatcher(['~/observations'], recursive=True)
+        >>> for image_paths in watcher.watch():
+        ...     print(f'New or modified images: {image_paths}')
+
+    Args:
+        paths: Image paths and/or directories to watch
+        recursive: Recursively watch subdirectories
+        interval: Seconds between each check for changes
+        debounce: Seconds to wait after the last change before returning a batch of changes
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[PathOrStr],
+        recursive: bool = False,
+        interval: float = WATCH_INTERVAL,
+        debounce: float = WATCH_DEBOUNCE,
+    ):
+        self.paths = [uri_to_path(path) for path in paths if path]
+        self.recursive = recursive
+        self.interval = interval
+        self.debounce = debounce
+        self._files = self._scan()
+        self._pending: set[Path] = set()
+        self._last_change: float = 0
+        logger.info(f'Watching {len(self._files)} images for changes')
+
+    def watch(self) -> Iterator[list[Path]]:
+        """Check for changes until interrupted, and yield each batch of new or modified images"""
+        while True:
+            sleep(self.interval)
+            if batch := self.poll():
+                yield batch
+
+    def poll(self) -> list[Path]:
+        """Check for changes once, and return any new or modified images that are ready to be
+        processed
+        """
+        files = self._scan()
+        changed = {path for path, signature in files.items() if self._files.get(path) != signature}
+        self._files = files
+        if changed:
+            self._pending |= changed
+            self._last_change = monotonic()
+            return []
+
+        if not self._pending or monotonic() - self._last_change < self.debounce:
+            return []
+        batch = sorted(path for path in self._pending if path in self._files)
+        self._pending = set()
+        logger.debug(f'{len(batch)} new or modified images')
+        return batch
+
+    def update(self, paths: Iterable[Path]):
+        """Update the state of the given images, e.g. after they have been modified by naturtag,
+        so those changes are not reported
+        """
+        for path in paths:
+            if signature := _get_signature(path):
+                self._files[path] = signature
+            self._pending.discard(path)
+
+    def _scan(self) -> dict[Path, FileSignature]:
+        files = {}
+        for path in self.paths:
+            if path.is_dir():
+                image_paths: Iterable[Path] = iter_images_from_dir(path, recursive=self.recursive)
+            else:
+                image_paths = [path] if is_image_path(path) else []
+            for image_path in image_paths:
+                if signature := _get_signature(image_path):
+                    files[image_path] = signature
+        return files
+
+
+def _get_signature(path: Path) -> Optional[FileSignature]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
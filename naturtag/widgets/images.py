@@ -1,23 +1,34 @@
 """Generic image widgets and base classes for other page-specific widgets.
 Includes plain images, cards, scrollable lists, and fullscreen image views.
 """
+from collections import OrderedDict
 from logging import getLogger
 from pathlib import Path
 from typing import TYPE_CHECKING, Iterator, Optional, TypeAlias, Union
 
 from pyinaturalist import Photo
 from PySide6.QtCore import QSize, Qt, QThread, Signal
-from PySide6.QtGui import QBrush, QFont, QIcon, QPainter, QPixmap
+from PySide6.QtGui import QBrush, QFont, QIcon, QImage, QImageReader, QPainter, QPixmap
 from PySide6.QtWidgets import QLabel, QLayout, QScrollArea, QSizePolicy, QWidget
 
 from naturtag.app.style import fa_icon
 from naturtag.client import IMG_SESSION
-from naturtag.constants import SIZE_ICON, SIZE_ICON_SM, SIZE_SM, IntOrStr, PathOrStr
+from naturtag.constants import (
+    FULLSCREEN_PREFETCH,
+    PHOTO_SIZES,
+    SIZE_DEFAULT,
+    SIZE_ICON,
+    SIZE_ICON_SM,
+    SIZE_SM,
+    IntOrStr,
+    PathOrStr,
+)
+from naturtag.utils import THUMBNAIL_CACHE
 from naturtag.widgets import StylableWidget, VerticalLayout
 from naturtag.widgets.layouts import GridLayout, HorizontalLayout
 
 if TYPE_CHECKING:
-    from naturtag.app.threadpool import ThreadPool
+    from naturtag.app.threadpool import ThreadPool, WorkerSignals
 
     MIXIN_BASE: TypeAlias = QWidget
 else:
@@ -135,19 +146,35 @@ class PixmapLabel(QLabel):
         size: str = None,
         url: str = None,
     ) -> QPixmap:
-        """Fetch a pixmap from either a local path or remote URL.
+        """Fetch a pixmap from either a local path or remote URL"""
+        if path or photo or url:
+            self._pixmap = QPixmap.fromImage(self.get_image(path, photo, size, url))
+        return self._pixmap
+
+    def get_image(
+        self,
+        path: PathOrStr = None,
+        photo: Photo = None,
+        size: str = None,
+        url: str = None,
+    ) -> QImage:
+        """Fetch an image from either a local path or remote URL.
         This does not render the image, so it is safe to run from any thread.
         """
         if path:
-            self._pixmap = QPixmap(str(path))
+            return QImage(str(path))
         elif photo or url:
-            self._pixmap = IMG_SESSION.get_pixmap(photo, url, size)
-        return self._pixmap
+            return IMG_SESSION.get_qimage(photo, url, size)
+        return QImage()
 
     def setPixmap(self, pixmap: QPixmap):
         self._pixmap = pixmap
         super().setPixmap(self.scaledPixmap())
 
+    def set_image(self, image: QImage):
+        """Convert an image loaded from another thread to a pixmap, and render it"""
+        self.setPixmap(QPixmap.fromImage(image))
+
     def set_pixmap_async(
         self,
         threadpool: 'ThreadPool',
@@ -156,17 +183,22 @@ class PixmapLabel(QLabel):
         photo: Photo = None,
         size: str = 'medium',
         url: str = None,
+        group: str = None,
     ):
-        """Fetch a photo from a separate thread, and render it in the main thread when complete"""
+        """Fetch a photo from a separate thread, and render it in the main thread when complete.
+        Remote photos are downloaded in the background before a worker thread is used to load them.
+        """
         future = threadpool.schedule(
-            self.get_pixmap,
+            self.get_image,
             priority=priority,
+            group=group,
+            wait_for=IMG_SESSION.prefetch_image(photo, url, size) if (photo or url) else None,
             path=path,
             photo=photo,
             url=url,
             size=size,
         )
-        future.on_result.connect(self.setPixmap)
+        future.on_result.connect(self.set_image)
 
     def clear(self):
         self.setPixmap(QPixmap())
@@ -371,9 +403,10 @@ class InfoCard(StylableWidget):
 class InfoCardList(StylableWidget):
     """A scrollable list of InfoCards"""
 
-    def __init__(self, threadpool: 'ThreadPool', parent: QWidget = None):
+    def __init__(self, threadpool: 'ThreadPool', parent: QWidget = None, group: str = None):
         super().__init__(parent)
         self.threadpool = threadpool
+        self.group = group  # Optional job group for loading thumbnails
         self.root = VerticalLayout(self)
         self.root.setAlignment(Qt.AlignTop)
         self.root.setContentsMargins(0, 5, 5, 0)
@@ -395,7 +428,7 @@ class InfoCardList(StylableWidget):
             self.root.insertWidget(idx, card)
         else:
             self.root.addWidget(card)
-        card.thumbnail.set_pixmap_async(self.threadpool, url=thumbnail_url)
+        card.thumbnail.set_pixmap_async(self.threadpool, url=thumbnail_url, group=self.group)
 
     def clear(self):
         self.root.clear()
@@ -422,16 +455,25 @@ class InfoCardList(StylableWidget):
 class ImageWindow(StylableWidget):
     """Display local images in fullscreen as a separate window
 
+    Images are loaded from separate threads and scaled to screen size. While an image is loading,
+    a scaled-up thumbnail is shown instead, if available. The previous and next
+    ``FULLSCREEN_PREFETCH`` images are also loaded in the background, so they can be shown
+    immediately.
+
     Keyboard shortcuts: Escape to close window, Left and Right to cycle through images
     """
 
     on_remove = Signal(Path)  #: Request for image to be removed from list
 
-    def __init__(self):
+    def __init__(self, threadpool: 'ThreadPool'):
         super().__init__()
-        self.image_paths: list[Path] = []
+        self.threadpool = threadpool
+        self.image_paths: list[PathOrStr] = []
         self.selected_path = Path('.')
         self.setWindowTitle('Naturtag')
+        self.loaded: OrderedDict[PathOrStr, QImage] = OrderedDict()  # Images loaded near selection
+        self.loading: dict[PathOrStr, 'WorkerSignals'] = {}
+        self._selected_key: PathOrStr = None
 
         self.image = FullscreenPhoto()
         self.image.setAlignment(Qt.AlignCenter)
@@ -474,9 +516,97 @@ class ImageWindow(StylableWidget):
         self.select_image_idx(self.wrap_idx(-1))
 
     def set_pixmap_path(self, path: PathOrStr):
-        self.image.setPixmap(QPixmap(str(path)))
+        self.show_image(path)
         self.image.description = str(path)
 
+    def show_image(self, key: PathOrStr):
+        """Show an image by path or URL, if it's already loaded. Otherwise, show a placeholder
+        while it's loaded in the background. Then start loading adjacent images.
+        """
+        self._selected_key = key
+        if (image := self.loaded.get(key)) is not None:
+            self.image.setPixmap(QPixmap.fromImage(image))
+        else:
+            self.image.setPixmap(self.get_placeholder(key) or QPixmap())
+            self.load_image_async(key, QThread.HighPriority)
+        self.prefetch_adjacent()
+
+    def get_placeholder(self, key: PathOrStr) -> Optional[QPixmap]:
+        """Get a smaller version of an image that's already available: either a cached thumbnail
+        for a local image, or a smaller size of a remote image that's already been decoded
+        """
+        if isinstance(key, Path):
+            cache_path = THUMBNAIL_CACHE.get(key, SIZE_DEFAULT)
+            return QPixmap(str(cache_path)) if cache_path else None
+
+        photo = Photo(url=key)
+        for size in reversed(PHOTO_SIZES):
+            if (image := IMG_SESSION.decoded_images.get(photo.url_size(size))) is not None:
+                return QPixmap.fromImage(image)
+        return None
+
+    def prefetch_adjacent(self):
+        """Load images before and after the selected image, and discard any others"""
+        n_images = len(self.image_paths)
+        if self._selected_key not in self.image_paths:
+            return
+        idx = self.image_paths.index(self._selected_key)
+        offsets = [0]
+        for i in range(1, min(FULLSCREEN_PREFETCH, n_images // 2) + 1):
+            offsets += [i, -i]
+        keep_keys = [self.image_paths[(idx + offset) % n_images] for offset in offsets]
+
+        for key in list(self.loaded):
+            if key not in keep_keys:
+                del self.loaded[key]
+        for key, job in list(self.loading.items()):
+            if key not in keep_keys:
+                self.threadpool.cancel_job(job)
+        for key in keep_keys[1:]:
+            if key not in self.loaded:
+                self.load_image_async(key, QThread.LowPriority)
+
+    def load_image_async(self, key: PathOrStr, priority: QThread.Priority):
+        """Load an image scaled to screen size from a separate thread, unless already loading"""
+        if job := self.loading.get(key):
+            self.threadpool.set_priority(job, priority)
+            return
+
+        screen = self.screen()
+        job = self.threadpool.schedule(
+            _load_fullscreen_image,
+            priority=priority,
+            group='fullscreen',
+            wait_for=None if isinstance(key, Path) else IMG_SESSION.prefetch_image(url=key),
+            source=key,
+            size=screen.size() * screen.devicePixelRatio(),
+        )
+        self.loading[key] = job
+        job.on_result.connect(lambda image: self._on_image_loaded(key, job, image))
+        job.on_error.connect(lambda _: self._on_load_finished(key, job))
+        job.on_cancel.connect(lambda: self._on_load_finished(key, job))
+
+    def _on_image_loaded(self, key: PathOrStr, job: 'WorkerSignals', image: QImage):
+        # Ignore results from jobs that were cancelled after they started
+        if self.loading.get(key) is not job:
+            return
+        del self.loading[key]
+        self.loaded[key] = image
+        if key == self._selected_key:
+            self.image.setPixmap(QPixmap.fromImage(image))
+
+    def _on_load_finished(self, key: PathOrStr, job: 'WorkerSignals'):
+        # Only remove the job if it hasn't since been replaced by another one for the same image
+        if self.loading.get(key) is job:
+            del self.loading[key]
+
+    def closeEvent(self, event):
+        """Discard loaded images when closing the window"""
+        self.threadpool.cancel(group='fullscreen')
+        self.loaded.clear()
+        self.loading.clear()
+        super().closeEvent(event)
+
     def remove_image(self):
         """Remove the current image from the list"""
         remove_path = self.selected_path
@@ -505,3 +635,20 @@ def format_int(value: int) -> str:
         return f'{int(value/1000)}K'
     else:
         return str(value)
+
+
+def _load_fullscreen_image(source: PathOrStr, size: QSize) -> QImage:
+    """Load a local image (decoded at reduced scale, if supported by the image format) or remote
+    image, scaled down to fit the given size
+    """
+    if isinstance(source, Path):
+        reader = QImageReader(str(source))
+        image_size = reader.size()
+        if image_size.width() > size.width() or image_size.height() > size.height():
+            reader.setScaledSize(image_size.scaled(size, Qt.KeepAspectRatio))
+        return reader.read()
+
+    image = IMG_SESSION.get_qimage(url=source)
+    if image.width() > size.width() or image.height() > size.height():
+        image = image.scaled(size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return image
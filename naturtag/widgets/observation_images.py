@@ -1,15 +1,18 @@
 """Image widgets specifically for observation photos"""
 from logging import getLogger
 from string import capwords
-from typing import Iterable, Optional
+from typing import TYPE_CHECKING, Iterable, Optional
 
 from pyinaturalist import Observation, Photo
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 
 from naturtag.constants import SIZE_ICON_SM
 from naturtag.widgets.images import HoverPhoto, IconLabel, ImageWindow, InfoCard, InfoCardList
 from naturtag.widgets.layouts import HorizontalLayout
 
+if TYPE_CHECKING:
+    from naturtag.app.threadpool import ThreadPool
+
 logger = getLogger(__name__)
 
 GEOPRIVACY_ICONS = {
@@ -106,10 +109,21 @@ class ObservationInfoCard(InfoCard):
 
 
 class ObservationList(InfoCardList):
-    """A scrollable list of ObservationInfoCards"""
+    """A scrollable list of ObservationInfoCards, which requests more observations when scrolled
+    near the bottom
+    """
+
+    on_load_more = Signal()  #: Scrolled near the end of the list
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self.scroller.verticalScrollBar().valueChanged.connect(self._on_scroll)
+
+    def _on_scroll(self, value: int):
+        # Request more when within about one viewport height of the bottom
+        scrollbar = self.scroller.verticalScrollBar()
+        if value >= scrollbar.maximum() - scrollbar.pageStep():
+            self.on_load_more.emit()
 
     def add_observation(self, observation: Observation, idx: int = None) -> ObservationInfoCard:
         """Add a card immediately, and load its thumbnail from a separate thread"""
@@ -127,12 +141,14 @@ class ObservationList(InfoCardList):
             return self.add_observation(observation, idx)
         return None
 
+    def add_observations(self, observations: Iterable[Observation]) -> list[ObservationInfoCard]:
+        """Add cards to the end of the list for the specified observations"""
+        return [self.add_observation(obs) for obs in observations if obs is not None]
+
     def set_observations(self, observations: Iterable[Observation]):
         """Replace all existing cards with new ones for the specified observations"""
         self.clear()
-        for observation in observations:
-            if observation is not None:
-                self.add_observation(observation)
+        self.add_observations(observations)
 
 
 class ObservationImageWindow(ImageWindow):
@@ -140,8 +156,8 @@ class ObservationImageWindow(ImageWindow):
     Uses URLs instead of local file paths.
     """
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, threadpool: 'ThreadPool'):
+        super().__init__(threadpool)
         self.observation: Observation = None
         self.photos: list[Photo] = None
         self.selected_photo: Photo = None
@@ -171,7 +187,7 @@ class ObservationImageWindow(ImageWindow):
         self.set_photo(self.selected_photo)
 
     def set_photo(self, photo: Photo):
-        self.image.setPixmap(self.image.get_pixmap(url=photo.original_url))
+        self.show_image(photo.original_url)
 
     def remove_image(self):
         pass
@@ -97,8 +97,8 @@ class TaxonImageWindow(ImageWindow):
     Uses URLs instead of local file paths.
     """
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, threadpool: 'ThreadPool'):
+        super().__init__(threadpool)
         self.taxon: Taxon = None
         self.photos: list[Photo] = None
         self.selected_photo: Photo = None
@@ -128,7 +128,7 @@ class TaxonImageWindow(ImageWindow):
         self.set_photo(self.selected_photo)
 
     def set_photo(self, photo: Photo):
-        self.image.setPixmap(self.image.get_pixmap(url=photo.original_url))
+        self.show_image(photo.original_url)
         attribution = (
             ATTRIBUTION_STRIP_PATTERN.sub('', photo.attribution or '')
             .replace('(c)', '©')
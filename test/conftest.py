@@ -1,7 +1,21 @@
 from pathlib import Path
+from unittest.mock import patch
 
 import prettyprinter
+import pytest
+
+from naturtag.metadata.metadata_index import MetadataIndex
 
 prettyprinter.install_extras(exclude=['django'])
 
 SAMPLE_DATA_DIR = Path(__file__).parent.parent / 'assets' / 'demo_images'
+
+
+@pytest.fixture
+def metadata_index(tmp_path):
+    """A temporary metadata index, in place of the user's index"""
+    index = MetadataIndex(tmp_path / 'index.db')
+    with patch('naturtag.metadata.image_metadata.METADATA_INDEX', index), patch(
+        'naturtag.metadata.meta_metadata.METADATA_INDEX', index
+    ):
+        yield index
@@ -0,0 +1,163 @@
+import sqlite3
+from datetime import datetime
+from threading import Event, Thread
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pyinaturalist import Observation, Photo, Taxon, User, WrapperPaginator
+from pyinaturalist_convert.db import DbObservation, create_tables, save_observations, save_taxa
+
+from naturtag.client import (
+    SingleFlight,
+    _get_child_ids,
+    _get_parent_ids,
+    get_db_observations,
+    get_db_taxonomy,
+    iNatDbClient,
+)
+from naturtag.utils.db import get_session, migrate_db, save_fetched_times
+
+
+def test_single_flight__do_many():
+    """Keys already in progress in another thread should be shared instead of fetched again"""
+    single_flight = SingleFlight()
+    started, finish = Event(), Event()
+    calls = []
+
+    # The first call blocks until the second call has claimed its own keys
+    def fetch(keys):
+        calls.append(keys)
+        if len(calls) == 1:
+            started.set()
+            finish.wait(5)
+        else:
+            finish.set()
+        return {k: k * 10 for k in keys}
+
+    thread = Thread(target=single_flight.do_many, args=([1, 2, 3], fetch))
+    thread.start()
+    started.wait(5)
+    results = single_flight.do_many([2, 3, 4], fetch)
+    thread.join()
+
+    assert results == {2: 20, 3: 30, 4: 40}
+    assert calls == [[1, 2, 3], [4]]
+    assert single_flight._calls == {}
+
+
+def test_get_db_taxonomy(tmp_path):
+    """Ancestors should be found by following parent links, plus direct children"""
+    db_path = tmp_path / 'naturtag.db'
+    create_tables(db_path)
+    save_taxa(
+        [
+            Taxon(id=1, name='Animalia', rank='kingdom', parent_id=48460),
+            Taxon(id=2, name='Chordata', rank='phylum', parent_id=1),
+            Taxon(id=3, name='Aves', rank='class', parent_id=2),
+            Taxon(id=4, name='Passeriformes', rank='order', parent_id=3),
+            Taxon(id=5, name='Accipitriformes', rank='order', parent_id=3),
+            Taxon(id=6, name='Corvidae', rank='family', parent_id=4),
+            Taxon(id=7, name='Arthropoda', rank='phylum', parent_id=1),
+        ],
+        db_path,
+    )
+
+    taxa = get_db_taxonomy(db_path, [3])
+    assert sorted(taxa) == [1, 2, 3, 4, 5]
+    assert _get_parent_ids(taxa[3], taxa) == [1, 2]
+    assert _get_child_ids(taxa[3], taxa) == [5, 4]
+
+
+def test_get_db_observations__keyset_pagination(tmp_path):
+    """Pages should follow each other by (observed_on, id), with undated observations last"""
+    db_path = tmp_path / 'naturtag.db'
+    create_tables(db_path)
+    user = User(id=1, login='test_user')
+    dates = [datetime(2022, 1, 1), datetime(2022, 1, 2), datetime(2022, 1, 2), None, None]
+    save_observations(
+        [
+            Observation(id=i, observed_on=d, user=user, photos=[Photo(id=i)])
+            for i, d in enumerate(dates, start=1)
+        ],
+        db_path=db_path,
+    )
+
+    ids, after = [], None
+    while page := list(
+        get_db_observations(db_path, username='test_user', limit=2, order_by_date=True, after=after)
+    ):
+        ids.extend(obs.id for obs in page)
+        after = (page[-1].observed_on, page[-1].id)
+    assert ids == [3, 2, 1, 5, 4]
+
+
+def test_taxa_from_ids__refresh_expired(tmp_path):
+    """When refreshing, only taxa that are expired or have no fetched time should be re-fetched"""
+    db_path = tmp_path / 'naturtag.db'
+    create_tables(db_path)
+    migrate_db(db_path)
+    save_taxa([Taxon(id=i, name=f'taxon {i}', rank='species') for i in [1, 2, 3]], db_path)
+    save_fetched_times(db_path, 'taxon', [1])
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("INSERT INTO record_fetched VALUES ('taxon', 2, 0)")
+
+    controller = iNatDbClient().taxa
+    with patch('naturtag.client.DB_PATH', db_path), patch(
+        'naturtag.client.TaxonController.from_ids',
+        side_effect=lambda *ids, **kwargs: WrapperPaginator([Taxon(id=i) for i in ids]),
+    ) as mock_from_ids:
+        taxa = controller.from_ids(1, 2, 3, accept_partial=True, refresh=True).all()
+        assert sorted(mock_from_ids.call_args.args) == [2, 3]
+        assert sorted(t.id for t in taxa) == [1, 2, 3]
+
+        # Re-fetched taxa should now be fresh
+        controller.from_ids(1, 2, 3, accept_partial=True, refresh=True)
+        assert mock_from_ids.call_count == 1
+
+
+def test_sync_user_observations__resume(tmp_path):
+    """An interrupted sync should be resumable from the last saved page"""
+    db_path = tmp_path / 'naturtag.db'
+    create_tables(db_path)
+    migrate_db(db_path)
+    api_results = [
+        {
+            'id': i,
+            'user': {'id': 1, 'login': 'test_user'},
+            'photos': [{'id': i, 'url': 'https://static.inaturalist.org/photos/1/square.jpg'}],
+        }
+        for i in range(1, 6)
+    ]
+
+    def get_page(url, **params):
+        results = [obs for obs in api_results if obs['id'] > (params['id_above'] or 0)]
+        response = MagicMock()
+        response.json.return_value = {
+            'total_results': len(results),
+            'results': results[: params['per_page']],
+        }
+        return response
+
+    def interrupt_after_two_pages(id_above: int):
+        checkpoints.append(id_above)
+        if len(checkpoints) == 2:
+            raise InterruptedError
+
+    client = iNatDbClient()
+    checkpoints: list[int] = []
+    with patch('naturtag.client.DB_PATH', db_path), patch(
+        'naturtag.client.OBS_SYNC_PAGE_SIZE', 2
+    ), patch.object(client.session, 'get', side_effect=get_page) as mock_get:
+        with pytest.raises(InterruptedError):
+            client.observations.sync_user_observations(
+                'test_user', on_checkpoint=interrupt_after_two_pages
+            )
+        assert checkpoints == [2, 4]
+
+        n_saved = client.observations.sync_user_observations('test_user', id_above=checkpoints[-1])
+        assert n_saved == 1
+        assert mock_get.call_count == 3
+        assert mock_get.call_args.kwargs['id_above'] == 4
+
+    with get_session(db_path) as session:
+        assert sorted(obs.id for obs in session.query(DbObservation)) == [1, 2, 3, 4, 5]
@@ -0,0 +1,77 @@
+import sqlite3
+
+from pyinaturalist import Observation, Photo, Taxon, User
+from pyinaturalist_convert.db import create_tables
+from sqlalchemy import text
+
+from naturtag.client import get_db_observations, get_db_taxa
+from naturtag.utils.db import (
+    MAX_IDS_PER_QUERY,
+    get_engine,
+    get_fetched_times,
+    migrate_db,
+    save_fetched_times,
+    save_observations,
+    save_taxa,
+)
+
+
+def test_get_engine(tmp_path):
+    """Engines should be shared per database, with pragmas set on each pooled connection"""
+    db_path = tmp_path / 'naturtag.db'
+    engine = get_engine(db_path)
+    assert get_engine(str(db_path)) is engine
+
+    with engine.connect() as conn:
+        assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert conn.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+
+
+def test_save_observations(tmp_path):
+    """Observations and their taxa should be saved together, and optionally marked as fetched"""
+    db_path = tmp_path / 'naturtag.db'
+    create_tables(db_path)
+    migrate_db(db_path)
+    observations = [
+        Observation(
+            id=i,
+            user=User(id=1, login='test_user'),
+            taxon=Taxon(id=i * 10, name=f'taxon {i}', rank='species'),
+            photos=[Photo(id=i)],
+        )
+        for i in [1, 2]
+    ]
+    save_observations(observations, db_path, fetched=True)
+    save_observations(observations[:1], db_path)  # Existing records should be updated
+
+    assert sorted(obs.id for obs in get_db_observations(db_path)) == [1, 2]
+    assert sorted(taxon.id for taxon in get_db_taxa(db_path)) == [10, 20]
+    assert sorted(get_fetched_times(db_path, 'observation', [1, 2, 3])) == [1, 2]
+    assert get_fetched_times(db_path, 'taxon', [10, 20]) == {}
+
+    save_taxa([Taxon(id=10, name='taxon 1', rank='species')], db_path, fetched=True)
+    assert list(get_fetched_times(db_path, 'taxon', [10, 20])) == [10]
+
+
+def test_get_fetched_times__existing_db(tmp_path):
+    """A database created before the record_fetched table was added should be migrated on first use"""
+    db_path = tmp_path / 'naturtag.db'
+    create_tables(db_path)
+    with sqlite3.connect(db_path) as conn:
+        tables = {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        }
+    assert 'taxon' in tables and 'record_fetched' not in tables
+
+    assert get_fetched_times(db_path, 'taxon', [1, 2]) == {}
+    save_fetched_times(db_path, 'taxon', [1])
+    assert list(get_fetched_times(db_path, 'taxon', [1, 2])) == [1]
+
+
+def test_get_fetched_times__chunked(tmp_path):
+    """Lookups for more IDs than SQLite allows in a single query should be split up"""
+    db_path = tmp_path / 'naturtag.db'
+    migrate_db(db_path)
+    ids = list(range(MAX_IDS_PER_QUERY * 2 + 1))
+    save_fetched_times(db_path, 'taxon', ids)
+    assert sorted(get_fetched_times(db_path, 'taxon', ids)) == ids
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+from PySide6.QtGui import QImage
+
+from naturtag.client import get_expiration
+from naturtag.utils.image_cache import ImageCache, MemoryImageCache
+
+
+def test_image_cache(tmp_path):
+    cache = ImageCache(tmp_path / 'images')
+    assert cache.get('abcdef.jpg') is None
+    assert 'abcdef.jpg' not in cache
+
+    cache.save('abcdef.jpg', b'image data', 'https://example.com/abcdef.jpg')
+    assert cache.get('abcdef.jpg') == b'image data'
+    assert cache.get_path('abcdef.jpg') == tmp_path / 'images' / 'ab' / 'abcdef.jpg'
+    assert list(cache.keys()) == ['abcdef.jpg']
+    assert len(cache) == 1
+    assert cache.size == len(b'image data')
+
+    cache.delete('abcdef.jpg')
+    assert cache.get('abcdef.jpg') is None
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_image_cache__expiration(tmp_path):
+    cache = ImageCache(tmp_path / 'images')
+    cache.save('abcdef.jpg', b'image data', expire_after=60)
+    assert cache.get('abcdef.jpg', expire_after=60) == b'image data'
+
+    # Expired images should be removed on read
+    os.utime(cache.get_path('abcdef.jpg'), (0, 0))
+    assert cache.get('abcdef.jpg', expire_after=60) is None
+    assert 'abcdef.jpg' not in cache
+    assert cache.stats['expired'] == 1
+
+
+def test_image_cache__compact(tmp_path):
+    cache = ImageCache(tmp_path / 'images', max_size=20)
+    cache.save('aaaaaa.jpg', b'0123456789')
+    cache.save('bbbbbb.jpg', b'0123456789')
+    cache.save('cccccc.jpg', b'0123456789', expire_after=-1)
+
+    # The expired image should be removed, then the least recently used image
+    cache.get('aaaaaa.jpg')
+    cache.max_size = 10
+    cache.compact()
+    assert list(cache.keys()) == ['aaaaaa.jpg']
+    assert cache.stats['expired'] == 1
+    assert cache.stats['evictions'] == 1
+
+
+@pytest.mark.parametrize(
+    'url, expected',
+    [
+        ('https://inaturalist-open-data.s3.amazonaws.com/photos/1/square.jpg', None),
+        ('https://inaturalist-open-data.s3.amazonaws.com/photos/1/large.jpg', 2592000),
+        ('https://static.inaturalist.org/photos/1/original.jpeg?1234', 604800),
+    ],
+)
+def test_get_expiration(url, expected):
+    assert get_expiration(url) == expected
+
+
+def test_memory_image_cache():
+    images = [QImage(10, 10, QImage.Format_RGB32) for _ in range(3)]
+    cache = MemoryImageCache(max_size=images[0].sizeInBytes() * 2)
+    cache.set('a', images[0])
+    cache.set('b', images[1])
+    assert cache.get('a') is images[0]
+
+    # Adding a third image should remove the least recently used one
+    cache.set('c', images[2])
+    assert cache.get('b') is None
+    assert cache.get('a') is images[0]
+    assert cache.get('c') is images[2]
+    assert cache.size == cache.max_size
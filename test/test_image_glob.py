@@ -3,8 +3,13 @@ from unittest.mock import patch
 
 import pytest
 
-from naturtag.constants import APP_LOGO, ASSETS_DIR, ICONS_DIR
-from naturtag.utils.image_glob import get_valid_image_paths, uri_to_path
+from naturtag.constants import APP_LOGO, ASSETS_DIR, ICONS_DIR, IMAGE_FILETYPES
+from naturtag.utils.image_glob import (
+    get_valid_image_paths,
+    is_image_path,
+    iter_valid_image_paths,
+    uri_to_path,
+)
 
 
 @pytest.mark.parametrize(
@@ -61,3 +66,31 @@ def test_get_valid_image_paths__nonexistent():
 
 def test_get_valid_image_paths__unsupported_type():
     assert len(get_valid_image_paths([ASSETS_DIR / 'style.qss'])) == 0
+
+
+def test_get_valid_image_paths__case_insensitive(tmp_path):
+    for filename in ['img1.jpg', 'img2.JPG', 'img3.Jpeg', 'notes.txt']:
+        (tmp_path / filename).touch()
+    assert len(get_valid_image_paths([tmp_path])) == 3
+
+
+def test_iter_valid_image_paths__recursive(tmp_path):
+    for path in ['b/img3.jpg', 'a/img2.png', 'img1.jpg', '.hidden/img4.jpg']:
+        (tmp_path / path).parent.mkdir(exist_ok=True)
+        (tmp_path / path).touch()
+
+    image_paths = iter_valid_image_paths([tmp_path], recursive=True)
+    assert not isinstance(image_paths, (list, set))
+    assert [p.relative_to(tmp_path).as_posix() for p in image_paths] == [
+        'img1.jpg',
+        'a/img2.png',
+        'b/img3.jpg',
+    ]
+
+
+def test_is_image_path__sidecar(tmp_path):
+    sidecar_path = tmp_path / 'img.xmp'
+    sidecar_path.touch()
+    assert is_image_path(sidecar_path, include_sidecars=True) is True
+    assert is_image_path(sidecar_path) is False
+    assert '*.xmp' not in IMAGE_FILETYPES
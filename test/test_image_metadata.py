@@ -1,4 +1,10 @@
-from naturtag.metadata import ImageMetadata
+import shutil
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from naturtag.metadata import ImageMetadata, MetadataSession, MetaMetadata
+from naturtag.metadata.image_metadata import NEW_XMP_CONTENTS, _get_changed_tags, _read_exiv2_image
 from test.conftest import SAMPLE_DATA_DIR
 
 
@@ -23,3 +29,100 @@ def test_sidecar_path__alt():
     meta = ImageMetadata(img_path)
     assert meta.has_sidecar
     assert meta.sidecar_path.name == 'IMG20200521_141401.jpg.xmp'
+
+
+@pytest.fixture
+def image_copy(tmp_path, metadata_index):
+    """A copy of a sample image and its sidecar"""
+    for filename in ['78513963.jpg', '78513963.xmp']:
+        shutil.copy(SAMPLE_DATA_DIR / filename, tmp_path / filename)
+    return tmp_path / '78513963.jpg'
+
+
+def test_lazy_read__partial_index(image_copy):
+    """Lazy-loading IDs and coordinates should open each file once, and index the formats read"""
+    with patch(
+        'naturtag.metadata.image_metadata._read_exiv2_image', wraps=_read_exiv2_image
+    ) as mock_read:
+        meta = MetaMetadata(image_copy, lazy=True)
+        assert meta.inaturalist_ids == (202860, 49459966)
+        assert meta.has_coordinates
+        assert mock_read.call_count == 2
+
+        meta = MetaMetadata(image_copy, lazy=True)
+        assert meta.inaturalist_ids == (202860, 49459966)
+        assert meta.has_coordinates
+        assert meta._exif is None
+        assert mock_read.call_count == 2
+
+        # Remaining formats should be read on demand
+        assert meta.exif['Exif.GPSInfo.GPSLatitudeRef'] == 'N'
+        assert mock_read.call_count == 4
+
+
+def test_lazy_read__dwc_ids(tmp_path, metadata_index):
+    """IDs should be found in DwC tags, without any keywords"""
+    sidecar_path = tmp_path / 'image.xmp'
+    sidecar_path.write_text(NEW_XMP_CONTENTS.strip())
+    meta = ImageMetadata(sidecar_path)
+    meta.update({'Xmp.dwc.taxonID': '12345', 'Xmp.dwc.catalogNumber': '67890'})
+    meta.write()
+
+    assert MetaMetadata(sidecar_path, lazy=True).inaturalist_ids == (12345, 67890)
+    assert MetaMetadata(sidecar_path).inaturalist_ids == (12345, 67890)
+
+
+def test_write__unchanged(image_copy):
+    """Writing the same tags again, from either the same or a new instance, should be a no-op"""
+    keywords = ['inat:taxon_id=3', 'taxonomy:class=Aves', 'Birds']
+    meta = MetaMetadata(image_copy)
+    meta.update_keywords(keywords)
+    meta.update({'Exif.Image.ImageDescription': 'Bird'})
+    assert meta.write() is True
+    assert meta.write() is False
+
+    meta = MetaMetadata(image_copy)
+    meta.update_keywords(keywords)
+    meta.update({'Exif.Image.ImageDescription': 'Bird'})
+    assert meta.write() is False
+
+
+@pytest.mark.parametrize(
+    'old_value, new_value, changed',
+    [
+        ('1', 1, False),
+        (['1', '2'], [1, 2], False),
+        (None, [], False),
+        (None, [''], False),
+        ([], None, False),
+        ('1', '2', True),
+        (['1'], ['1', '2'], True),
+        (None, '1', True),
+    ],
+)
+def test_get_changed_tags(old_value, new_value, changed):
+    old_tags = {'Iptc.Application2.Keywords': old_value} if old_value is not None else {}
+    new_tags = {'Iptc.Application2.Keywords': new_value}
+    assert bool(_get_changed_tags(old_tags, new_tags, 'iptc')) is changed
+
+
+@patch('naturtag.metadata.image_metadata._read_exiv2_image')
+def test_metadata_session__max_open(mock_read):
+    """When max_open is reached, the least recently used images should be closed"""
+    images = {path: MagicMock() for path in ['a.jpg', 'b.jpg', 'c.jpg', 'd.jpg']}
+    mock_read.side_effect = lambda path: images[path]
+
+    with MetadataSession(max_open=2) as session:
+        session.open('a.jpg')
+        session.open('b.jpg')
+        assert session.open('a.jpg') is images['a.jpg']
+        session.open('c.jpg')
+        session.open('d.jpg')
+
+        assert mock_read.call_count == 4
+        assert images['b.jpg'].close.call_count == 1
+        assert images['a.jpg'].close.call_count == 1
+        assert not images['c.jpg'].close.called
+        assert not images['d.jpg'].close.called
+
+    assert all(img.close.call_count == 1 for img in images.values())
@@ -0,0 +1,110 @@
+import shutil
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from pyinaturalist import Observation, Taxon
+
+from naturtag.metadata import MetaMetadata
+from naturtag.metadata.inat_metadata import (
+    _build_inat_metadata,
+    _get_id_keywords,
+    iter_tag_images,
+    refresh_metadata,
+)
+from naturtag.settings import Settings
+from test.conftest import SAMPLE_DATA_DIR
+
+TAXON = Taxon(
+    id=3,
+    name='Aves',
+    rank='class',
+    preferred_common_name='Birds',
+    ancestors=[
+        Taxon(id=1, name='Animalia', rank='kingdom', preferred_common_name='Animals'),
+        Taxon(id=2, name='Chordata', rank='phylum', preferred_common_name='Chordates'),
+    ],
+)
+
+
+@pytest.fixture
+def image_paths(tmp_path, metadata_index):
+    """Copies of a sample image, with a corrupted image in between"""
+    paths = []
+    for i in range(3):
+        path = tmp_path / f'image_{i}.jpg'
+        shutil.copy(SAMPLE_DATA_DIR / '78513963.jpg', path)
+        paths.append(path)
+    corrupted_path = tmp_path / 'corrupted.jpg'
+    corrupted_path.write_bytes(b'not an image')
+    paths.insert(1, corrupted_path)
+    return paths
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_iter_tag_images(image_paths, jobs):
+    """Results should be yielded in input order, and a failed file should not stop the run"""
+    inat_metadata = _build_inat_metadata(None, TAXON, taxon_id=TAXON.id)
+    results = list(iter_tag_images(image_paths, inat_metadata, Settings(), jobs=jobs))
+
+    assert [path for path, _ in results] == image_paths
+    assert isinstance(results[1][1], Exception)
+    for _, metadata in results[:1] + results[2:]:
+        assert isinstance(metadata, MetaMetadata)
+        assert metadata.taxon_id == TAXON.id
+
+
+def test_iter_tag_images__written(image_paths):
+    inat_metadata = _build_inat_metadata(None, TAXON, taxon_id=TAXON.id)
+    list(iter_tag_images(image_paths, inat_metadata, Settings()))
+
+    metadata = MetaMetadata(image_paths[-1])
+    assert metadata.taxon_id == TAXON.id
+    assert metadata.keyword_meta.kv_keywords['taxonomy:class'] == 'Aves'
+
+
+@patch.object(MetaMetadata, 'write')
+@patch('pyinaturalist_convert.dwc.get_taxa_by_id', return_value={'results': [{'ancestors': []}]})
+@patch('naturtag.metadata.inat_metadata.INAT_CLIENT')
+def test_refresh_metadata(mock_client, mock_get_taxa_by_id, mock_write, tmp_path, metadata_index):
+    """Records should be fetched once per unique ID, and applied to every image that shares it"""
+    synonym = Taxon(
+        id=4, name='Aves', rank='class', preferred_common_name='Birds', ancestors=TAXON.ancestors
+    )
+    inactive_taxon = Taxon(id=5, name='Avia', rank='class', is_active=False)
+    inactive_taxon.current_synonymous_taxon_ids = [4]
+    observation = Observation(
+        id=100,
+        taxon=TAXON,
+        observed_on=datetime(2022, 1, 1),
+        created_at=datetime(2022, 1, 1),
+        updated_at=datetime(2022, 1, 1),
+    )
+    mock_client.observations.from_ids.return_value.all.return_value = [observation]
+    mock_client.taxa.from_ids.return_value.all.side_effect = [[TAXON, inactive_taxon], [synonym]]
+
+    def get_metadata(name, observation_id=None, taxon_id=None):
+        metadata = MetaMetadata(tmp_path / name)
+        metadata.update_keywords(_get_id_keywords(observation_id, taxon_id))
+        return metadata
+
+    metadata_objs = [
+        get_metadata('obs_1.jpg', observation_id=100, taxon_id=1),
+        get_metadata('taxon_3.jpg', taxon_id=3),
+        get_metadata('obs_2.jpg', observation_id=100),
+        get_metadata('taxon_5.jpg', taxon_id=5),
+        get_metadata('untagged.jpg'),
+    ]
+    results = {m.image_path.name: m for m in refresh_metadata(metadata_objs, Settings())}
+
+    mock_client.observations.from_ids.assert_called_once_with(100, refresh=True)
+    taxa_calls = mock_client.taxa.from_ids.call_args_list
+    assert [set(call.args) for call in taxa_calls] == [{3, 5}, {4}]
+    assert mock_write.call_count == 4
+
+    assert results.keys() == {'obs_1.jpg', 'obs_2.jpg', 'taxon_3.jpg', 'taxon_5.jpg'}
+    assert results['obs_1.jpg'].inaturalist_ids == (3, 100)
+    assert results['obs_2.jpg'].inaturalist_ids == (3, 100)
+    assert results['taxon_3.jpg'].inaturalist_ids == (3, None)
+    # Inactive taxa should be tagged with the taxonomy of their replacement
+    assert results['taxon_5.jpg'].keyword_meta.kv_keywords['taxonomy:class'] == 'Aves'
@@ -1 +1,17 @@
-# TODO
+import pytest
+
+from naturtag.metadata.meta_metadata import get_inaturalist_ids
+
+
+@pytest.mark.parametrize(
+    'metadata, expected_ids',
+    [
+        ({'taxonid': '3', 'catalognumber': '100'}, (3, 100)),
+        ({'catalognumber': 'ABC-100'}, (None, None)),
+        ({'catalognumber': 'ABC-100', 'dwc:catalognumber': '100'}, (None, 100)),
+        ({'taxonid': '', 'dwc:taxonid': '3'}, (3, None)),
+    ],
+)
+def test_get_inaturalist_ids(metadata, expected_ids):
+    """Non-numeric values (e.g., catalog numbers from other sources) should be skipped"""
+    assert get_inaturalist_ids(metadata) == expected_ids
@@ -0,0 +1,92 @@
+import os
+from threading import Thread
+from unittest.mock import patch
+
+import pytest
+
+from naturtag.metadata.metadata_index import IndexRecord, MetadataIndex
+
+RECORD = IndexRecord(
+    image_tags={'exif': {'Exif.Image.Make': 'Camera'}},
+    sidecar_tags={'xmp': {'Xmp.dwc.taxonID': '3'}},
+    taxon_id=3,
+    has_sidecar=True,
+)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return MetadataIndex(tmp_path / 'index.db')
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    image_path = tmp_path / 'image.jpg'
+    image_path.write_bytes(b'image data')
+    return image_path
+
+
+def test_get__hit(index, image_path):
+    index.save(image_path, RECORD)
+    record = index.get(image_path)
+    assert record == RECORD
+    assert record.exif == {'Exif.Image.Make': 'Camera'}
+    assert record.xmp == {'Xmp.dwc.taxonID': '3'}
+    assert record.formats == ['exif']
+    assert record.is_complete is False
+
+
+def test_get__miss(index, image_path):
+    assert index.get(image_path) is None
+    assert index.get(image_path.parent / 'nonexistent.jpg') is None
+
+
+def test_get__modified_mtime(index, image_path):
+    index.save(image_path, RECORD)
+    mtime = image_path.stat().st_mtime_ns
+    os.utime(image_path, ns=(mtime + 10**9, mtime + 10**9))
+    assert index.get(image_path) is None
+
+
+def test_get__modified_size(index, image_path):
+    """A change in size should invalidate the record, even if mtime is unchanged"""
+    index.save(image_path, RECORD)
+    mtime = image_path.stat().st_mtime_ns
+    image_path.write_bytes(b'new image data')
+    os.utime(image_path, ns=(mtime, mtime))
+    assert index.get(image_path) is None
+
+
+def test_get__modified_sidecar(index, image_path):
+    sidecar_path = image_path.with_suffix('.xmp')
+    sidecar_path.write_text('sidecar data')
+    index.save(image_path, RECORD, sidecar_path)
+    assert index.get(image_path, sidecar_path) == RECORD
+
+    mtime = sidecar_path.stat().st_mtime_ns
+    os.utime(sidecar_path, ns=(mtime + 10**9, mtime + 10**9))
+    assert index.get(image_path, sidecar_path) is None
+
+
+def test_delete(index, image_path):
+    index.save(image_path, RECORD)
+    index.delete(image_path)
+    assert index.get(image_path) is None
+
+
+def test_connection__per_thread(index):
+    connections = []
+    thread = Thread(target=lambda: connections.append(index.connection))
+    thread.start()
+    thread.join()
+    assert index.connection is index.connection
+    assert connections[0] is not index.connection
+
+
+def test_connection__per_process(index, image_path):
+    """A connection inherited from a parent process should not be reused after a fork"""
+    index.save(image_path, RECORD)
+    connection = index.connection
+    with patch('naturtag.metadata.metadata_index.os.getpid', return_value=os.getpid() + 1):
+        assert index.connection is not connection
+        assert index.get(image_path) == RECORD
@@ -0,0 +1,54 @@
+import os
+
+from PIL import Image
+
+from naturtag.utils.thumbnails import ThumbnailCache, _get_orientated_image
+from test.conftest import SAMPLE_DATA_DIR
+
+SAMPLE_IMAGE = SAMPLE_DATA_DIR / '78513963.jpg'
+
+
+def test_thumbnail_cache(tmp_path):
+    image_path = tmp_path / 'image.jpg'
+    image_path.write_bytes(SAMPLE_IMAGE.read_bytes())
+    cache = ThumbnailCache(tmp_path / 'thumbnails')
+    assert cache.get(image_path, (250, 250)) is None
+
+    cache.save(image_path, (250, 250), Image.new('RGB', (250, 250)))
+    cache_path = cache.get(image_path, (250, 250))
+    assert cache_path and Image.open(cache_path).size == (250, 250)
+    assert cache.get(image_path, (75, 75)) is None
+
+    # Modifying the original image should invalidate its thumbnail
+    os.utime(image_path, ns=(0, 0))
+    assert cache.get(image_path, (250, 250)) is None
+
+
+def test_thumbnail_cache__evict(tmp_path):
+    image_paths = [tmp_path / f'{i}.jpg' for i in range(3)]
+    for path in image_paths:
+        path.write_bytes(SAMPLE_IMAGE.read_bytes())
+    cache = ThumbnailCache(tmp_path / 'thumbnails')
+    for path in image_paths:
+        cache.save(path, (250, 250), Image.effect_noise((250, 250), 100))
+
+    # Mark the first thumbnail as least recently used, and limit the cache to 2 thumbnails
+    cache_paths = [cache.get_cache_path(path, (250, 250)) for path in image_paths]
+    os.utime(cache_paths[0], (0, 0))
+    cache.max_size = sum(p.stat().st_size for p in cache_paths[1:])
+    cache.evict()
+
+    assert cache.get(image_paths[0], (250, 250)) is None
+    assert cache.get(image_paths[1], (250, 250)) is not None
+    assert cache.get(image_paths[2], (250, 250)) is not None
+
+
+def test_get_orientated_image__reduced(tmp_path):
+    """A large JPEG should be decoded at reduced scale, and rotated according to EXIF orientation"""
+    image_path = tmp_path / 'image.jpg'
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new('RGB', (2000, 1000)).save(image_path, exif=exif)
+
+    image = _get_orientated_image(image_path, target_size=(250, 250))
+    assert image.size == (250, 500)
@@ -0,0 +1,26 @@
+from time import sleep
+
+from naturtag.utils.watcher import ImageWatcher
+
+
+def test_poll__debounce(tmp_path):
+    (tmp_path / 'img1.jpg').write_bytes(b'1')
+    watcher = ImageWatcher([tmp_path], debounce=0.1)
+    assert watcher.poll() == []
+
+    # Changes should be batched until there have been no new changes during the debounce period
+    (tmp_path / 'img2.jpg').write_bytes(b'2')
+    (tmp_path / 'notes.txt').write_bytes(b'')
+    assert watcher.poll() == []
+    (tmp_path / 'img1.jpg').write_bytes(b'11')
+    assert watcher.poll() == []
+    sleep(0.15)
+    assert watcher.poll() == [tmp_path / 'img1.jpg', tmp_path / 'img2.jpg']
+    assert watcher.poll() == []
+
+
+def test_update(tmp_path):
+    watcher = ImageWatcher([tmp_path], debounce=0)
+    (tmp_path / 'img1.jpg').write_bytes(b'1')
+    watcher.update([tmp_path / 'img1.jpg'])
+    assert watcher.poll() == []